@@ -8,8 +8,11 @@ from typing import Optional, List, Dict, Any
 
 import pandas as pd
 
-from app.db import engine  # uses POSTGRES_DSN from config :contentReference[oaicite:1]{index=1}
+from app import metrics, profiling
+from app.config import settings
+from app.db import get_engine  # uses POSTGRES_DSN from config :contentReference[oaicite:1]{index=1}
 from app.detector import compute_signal  # backfill uses the same rules :contentReference[oaicite:2]{index=2}
+from app.storage_pg import term_names, geo_names
 
 from sqlalchemy import text
 
@@ -18,6 +21,56 @@ def _iso(d: date) -> str:
     return d.isoformat()
 
 
+def scan_series_events(
+    s: pd.Series,
+    term: str,
+    geo: str,
+    report_start: date,
+    only_severities: List[str],
+) -> List[Dict[str, Any]]:
+    """
+    One series (date-indexed) → events whose as_of date falls in the reporting window.
+    Pure compute (no DB) so it can be benchmarked on synthetic data.
+    """
+    events: List[Dict[str, Any]] = []
+
+    # Slide "as_of" day by day:
+    # Use each date as if it were "today" by passing s up to that point.
+    idx = s.index.to_list()
+    for j in range(20, len(idx)):  # 0-based; j=20 means 21st point
+        as_of_ts = idx[j]
+        as_of_date = as_of_ts.date()
+
+        # Only keep events in reporting range (but still compute using warmup history)
+        if as_of_date < report_start:
+            continue
+
+        window = s.loc[:as_of_ts]
+        sig = compute_signal(window, term=term, geo=geo)
+        if sig is None:
+            continue
+
+        if sig.severity not in only_severities:
+            continue
+
+        events.append({
+            "as_of_date": as_of_date.isoformat(),
+            "term": sig.term,
+            "geo": sig.geo,
+            "severity": sig.severity,
+            "wow_change": float(sig.wow_change),
+            "z_score": float(sig.z_score),
+            "slope_7d": float(sig.slope_7d),
+            "latest": float(sig.latest),
+            # evidence from compute_signal :contentReference[oaicite:5]{index=5}
+            "last7_avg": float(sig.evidence.get("last7_avg", 0.0)),
+            "prev7_avg": float(sig.evidence.get("prev7_avg", 0.0)),
+            "mu": float(sig.evidence.get("mu", 0.0)),
+            "sigma": float(sig.evidence.get("sigma", 0.0)),
+        })
+    return events
+
+
 def backfill_events(
     months: int = 3,
     warmup_days: int = 70,
@@ -42,12 +95,13 @@ def backfill_events(
     pull_start = report_start - timedelta(days=warmup_days)
 
     q = text("""
-        SELECT term, geo, date::date AS date, value::float8 AS value
-        FROM trend_series
+        SELECT term_id, geo_id, date::date AS date, value::float8 AS value
+        FROM trend_series_all  -- hot partitions + unpacked cold months
         WHERE date >= :start_date
-        ORDER BY term, geo, date ASC;
+        ORDER BY term_id, geo_id, date ASC;
     """)
-    df = pd.read_sql(q, engine, params={"start_date": _iso(pull_start)})
+    with metrics.stage("series_load"):
+        df = pd.read_sql(q, get_engine(), params={"start_date": _iso(pull_start)})
 
     if df.empty:
         return pd.DataFrame(columns=[
@@ -59,51 +113,24 @@ def backfill_events(
     # Ensure correct dtypes
     df["date"] = pd.to_datetime(df["date"]).dt.date
 
-    events: List[Dict[str, Any]] = []
-
-    for (term, geo), g in df.groupby(["term", "geo"], sort=False):
-        g = g.sort_values("date")
-        # Build series indexed by date
-        s = pd.Series(g["value"].to_numpy(), index=pd.to_datetime(g["date"]), dtype=float)
-
-        # Need enough history for compute_signal() (>=21 points) :contentReference[oaicite:4]{index=4}
-        if len(s) < 21:
-            continue
+    # int key -> name (cached dictionary lookup, once per distinct key)
+    tn = term_names(df["term_id"].unique().tolist())
+    gn = geo_names(df["geo_id"].unique().tolist())
 
-        # Slide "as_of" day by day:
-        # Use each date as if it were "today" by passing s up to that point.
-        idx = s.index.to_list()
-        for j in range(20, len(idx)):  # 0-based; j=20 means 21st point
-            as_of_ts = idx[j]
-            as_of_date = as_of_ts.date()
+    events: List[Dict[str, Any]] = []
 
-            # Only keep events in reporting range (but still compute using warmup history)
-            if as_of_date < report_start:
-                continue
+    with metrics.stage("scan"):
+        for (term_id, geo_id), g in df.groupby(["term_id", "geo_id"], sort=False):
+            term, geo = tn.get(term_id, ""), gn.get(geo_id, "")
+            g = g.sort_values("date")
+            # Build series indexed by date
+            s = pd.Series(g["value"].to_numpy(), index=pd.to_datetime(g["date"]), dtype=float)
 
-            window = s.loc[:as_of_ts]
-            sig = compute_signal(window, term=term, geo=geo)
-            if sig is None:
+            # Need enough history for compute_signal() (>=21 points) :contentReference[oaicite:4]{index=4}
+            if len(s) < 21:
                 continue
 
-            if sig.severity not in only_severities:
-                continue
-
-            events.append({
-                "as_of_date": as_of_date.isoformat(),
-                "term": sig.term,
-                "geo": sig.geo,
-                "severity": sig.severity,
-                "wow_change": float(sig.wow_change),
-                "z_score": float(sig.z_score),
-                "slope_7d": float(sig.slope_7d),
-                "latest": float(sig.latest),
-                # evidence from compute_signal :contentReference[oaicite:5]{index=5}
-                "last7_avg": float(sig.evidence.get("last7_avg", 0.0)),
-                "prev7_avg": float(sig.evidence.get("prev7_avg", 0.0)),
-                "mu": float(sig.evidence.get("mu", 0.0)),
-                "sigma": float(sig.evidence.get("sigma", 0.0)),
-            })
+            events.extend(scan_series_events(s, term, geo, report_start, only_severities))
 
     out = pd.DataFrame(events)
     if out.empty:
@@ -125,18 +152,20 @@ def main():
     parser.add_argument("--out", type=str, default="backfill_events_last3m.csv", help="Output CSV path.")
     parser.add_argument("--severity", type=str, default="RISING,BREAKOUT",
                         help="Comma-separated severities to keep (default: RISING,BREAKOUT)")
+    profiling.add_argument(parser)
     args = parser.parse_args()
 
-    severities = [s.strip().upper() for s in args.severity.split(",") if s.strip()]
-    df = backfill_events(months=args.months, warmup_days=args.warmup_days, only_severities=severities)
+    with profiling.profiled(args.profile, "backfill", settings.profile_dir, settings.profile_top):
+        severities = [s.strip().upper() for s in args.severity.split(",") if s.strip()]
+        df = backfill_events(months=args.months, warmup_days=args.warmup_days, only_severities=severities)
 
-    if df.empty:
-        print("No events found in the window.")
-        return
+        if df.empty:
+            print("No events found in the window.")
+            return
 
-    df.to_csv(args.out, index=False, encoding="utf-8")
-    print(f"Saved {len(df)} events → {args.out}")
-    print(df.head(20).to_string(index=False))
+        df.to_csv(args.out, index=False, encoding="utf-8")
+        print(f"Saved {len(df)} events → {args.out}")
+        print(df.head(20).to_string(index=False))
 
 
 if __name__ == "__main__":
@@ -8,6 +8,10 @@ class Settings(BaseModel):
     slack_webhook_url: str = os.getenv("SLACK_WEBHOOK_URL", "")
     slack_channel_daily: str = os.getenv("SLACK_CHANNEL_DAILY", "#kb-trends-daily")
     slack_channel_alert: str = os.getenv("SLACK_CHANNEL_ALERT", "#kb-trends-alert")
+    # 1회 dispatch에서 보내는 alert 최대 수 / 429 재시도 (Retry-After는 이 값(초)까지만 따름)
+    slack_alert_limit: int = int(os.getenv("SLACK_ALERT_LIMIT", "20"))
+    slack_max_retries: int = int(os.getenv("SLACK_MAX_RETRIES", "3"))
+    slack_retry_after_max: float = float(os.getenv("SLACK_RETRY_AFTER_MAX", "30"))
 
     postgres_dsn: str = os.getenv("POSTGRES_DSN", "")
 
@@ -18,4 +22,44 @@ class Settings(BaseModel):
 
     google_trends_api_key: str = os.getenv("GOOGLE_TRENDS_API_KEY", "")
 
+    # retention (개월). hourly는 daily rollup이 소비한 뒤 일 집계로 compaction, series는 0이면 보관
+    retention_hourly_months: int = int(os.getenv("RETENTION_HOURLY_MONTHS", "3"))
+    retention_series_months: int = int(os.getenv("RETENTION_SERIES_MONTHS", "0"))
+    partition_months_ahead: int = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+    # 이보다 오래된 trend_series 월은 real[] 1행으로 압축 (0 = 압축 안 함)
+    cold_series_months: int = int(os.getenv("COLD_SERIES_MONTHS", "4"))
+
+    # hourly 스냅샷 delta: z가 이만큼 오르면 Z_JUMP, HOURLY_DELTA_ALERTS=1이면 alert 채널로 요약 전송
+    delta_z_jump: float = float(os.getenv("DELTA_Z_JUMP", "1.0"))
+    hourly_delta_alerts: bool = os.getenv("HOURLY_DELTA_ALERTS", "0") == "1"
+
+    # serve (상주 스케줄러). 시각은 KST 'HH:MM', 콤마로 여러 개. 빈 값이면 해당 잡 끔
+    serve_run_at: str = os.getenv("SERVE_RUN_AT", "")
+    serve_daily_at: str = os.getenv("SERVE_DAILY_AT", "23:55")
+    serve_maintain_at: str = os.getenv("SERVE_MAINTAIN_AT", "04:30")
+    serve_slack_minutes: int = int(os.getenv("SERVE_SLACK_MINUTES", "15"))
+
+    # run --queue / worker: unit당 term 수, lease(초, heartbeat는 1/3마다), 최대 시도, 빈 큐 polling 간격
+    queue_batch_terms: int = int(os.getenv("QUEUE_BATCH_TERMS", "30"))
+    queue_lease_sec: int = int(os.getenv("QUEUE_LEASE_SEC", "300"))
+    queue_max_attempts: int = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+    queue_poll_sec: float = float(os.getenv("QUEUE_POLL_SEC", "5"))
+
+    # node_exporter textfile collector 디렉터리 (빈 값이면 run_metrics 테이블에만 기록)
+    metrics_textfile_dir: str = os.getenv("METRICS_TEXTFILE_DIR", "")
+
+    # SQL 프로파일러 (--profile-sql 또는 QUERY_PROFILE=1). 느린 SELECT는 EXPLAIN ANALYZE 1회 샘플
+    query_profile: bool = os.getenv("QUERY_PROFILE", "0") == "1"
+    slow_query_ms: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    # JSON report 디렉터리 (기본 logs/sql). serve/worker/listen은 QUERY_PROFILE_EVERY_SEC마다 + SIGUSR1에 덮어씀
+    query_profile_dir: str = os.getenv("QUERY_PROFILE_DIR", "logs/sql")
+    query_profile_every_sec: float = float(os.getenv("QUERY_PROFILE_EVERY_SEC", "900"))
+
+    # trace export 디렉터리 (값이 있으면 항상 켜짐, --trace만 주면 logs/traces)
+    trace_dir: str = os.getenv("TRACE_DIR", "")
+
+    # --profile cpu|mem 출력 디렉터리 / 리포트 top-N
+    profile_dir: str = os.getenv("PROFILE_DIR", "logs/profiles")
+    profile_top: int = int(os.getenv("PROFILE_TOP", "25"))
+
 settings = Settings()
@@ -1,123 +1,113 @@
 from __future__ import annotations
+import zlib
+from contextlib import contextmanager
+from typing import Iterator, List
 from sqlalchemy import create_engine, text
 from app.config import settings
-from sqlalchemy import text
-
-engine = create_engine(settings.postgres_dsn, pool_pre_ping=True)
-
-def init_schema():
-    ddl = """
-    CREATE TABLE IF NOT EXISTS trend_series (
-      term TEXT NOT NULL,
-      geo  TEXT NOT NULL,
-      date DATE NOT NULL,
-      value DOUBLE PRECISION NOT NULL,
-      source TEXT NOT NULL DEFAULT 'google_trends',
-      collected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-      PRIMARY KEY (term, geo, date)
-    );
-
-    CREATE TABLE IF NOT EXISTS trend_features (
-      term TEXT NOT NULL,
-      geo  TEXT NOT NULL,
-      as_of_date DATE NOT NULL,
-      wow_change DOUBLE PRECISION NOT NULL,
-      z_score DOUBLE PRECISION NOT NULL,
-      slope_7d DOUBLE PRECISION NOT NULL,
-      latest DOUBLE PRECISION NOT NULL,
-      computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-      PRIMARY KEY (term, geo, as_of_date)
-    );
-
-    CREATE TABLE IF NOT EXISTS alerts (
-      id BIGSERIAL PRIMARY KEY,
-      term TEXT NOT NULL,
-      geo  TEXT NOT NULL,
-      severity TEXT NOT NULL,
-      fired_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-      slack_channel TEXT,
-      slack_ts TEXT,
-      status TEXT NOT NULL DEFAULT 'new',
-      cooldown_until TIMESTAMPTZ
-    );
-
-    CREATE INDEX IF NOT EXISTS idx_alerts_lookup
-      ON alerts(term, geo, severity, fired_at DESC);
-
-    CREATE INDEX IF NOT EXISTS idx_series_term_geo_date
-      ON trend_series(term, geo, date DESC);
-
-    CREATE INDEX IF NOT EXISTS idx_features_term_geo_date
-      ON trend_features(term, geo, as_of_date DESC);
-
-    CREATE TABLE IF NOT EXISTS discovered_terms (
-      term TEXT NOT NULL,
-      geo  TEXT NOT NULL,
-      source_term TEXT,
-      kind TEXT NOT NULL DEFAULT 'related_queries',  -- related_queries / related_topics
-      rank INT,
-      score DOUBLE PRECISION,
-      first_seen TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-      last_seen  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-      status TEXT NOT NULL DEFAULT 'new',            -- new / approved / rejected
-      PRIMARY KEY (term, geo)
-    );
-
-    CREATE INDEX IF NOT EXISTS idx_discovered_status
-      ON discovered_terms(status);
-
-    CREATE INDEX IF NOT EXISTS idx_discovered_geo
-      ON discovered_terms(geo);
-
-    CREATE INDEX IF NOT EXISTS idx_discovered_last_seen
-      ON discovered_terms(last_seen DESC);
-    
-    ALTER TABLE discovered_terms
-      ADD COLUMN IF NOT EXISTS approved_at TIMESTAMPTZ;
+from app.migrations import MIGRATIONS, SCHEMA_VERSION
 
+_engine = None
+
+# migrate 동시 실행 방지용 advisory lock key (임의 상수)
+_MIGRATE_LOCK_KEY = 7_400_127
+
+_schema_checked = False
+
+
+def get_engine():
     """
-    with engine.begin() as conn:
-        conn.execute(text(ddl))
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS hourly_snapshots (
-          id BIGSERIAL PRIMARY KEY,
-          snapshot_at TIMESTAMPTZ NOT NULL,
-          geo_count INT NOT NULL,
-          term_count INT NOT NULL,
-          timeframe TEXT NOT NULL,
-          created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-          UNIQUE (snapshot_at)
-        );
-        """))
+    첫 DB 접근 시점에 engine 생성 (import 시점 X → --help 등 DB 안 쓰는 경로는 비용 0)
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(settings.postgres_dsn, pool_pre_ping=True)
+    return _engine
 
-        conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS hourly_snapshot_features (
-          snapshot_id BIGINT NOT NULL REFERENCES hourly_snapshots(id) ON DELETE CASCADE,
-          term TEXT NOT NULL,
-          geo TEXT NOT NULL,
-          wow_change DOUBLE PRECISION NOT NULL,
-          z_score DOUBLE PRECISION NOT NULL,
-          slope_7d DOUBLE PRECISION NOT NULL,
-          latest DOUBLE PRECISION NOT NULL,
-          severity TEXT NOT NULL,
-          PRIMARY KEY (snapshot_id, term, geo)
-        );
-        """))
 
-        conn.execute(text("""
-        CREATE INDEX IF NOT EXISTS idx_hsf_term_geo
-          ON hourly_snapshot_features(term, geo);
-        """))
-        conn.execute(text("""
-        CREATE INDEX IF NOT EXISTS idx_hsf_severity
-          ON hourly_snapshot_features(severity);
-        """))
+def dispose_engine():
+    """
+    serve 종료 시 풀 정리
+    """
+    global _engine
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
 
+
+@contextmanager
+def try_advisory_lock(name: str) -> Iterator[bool]:
+    """
+    이름 기반 session advisory lock (non-blocking). 잡는 동안 풀 커넥션 1개를 점유
+    - 다른 프로세스/호스트가 이미 잡고 있으면 False
+    """
+    key = zlib.crc32(name.encode("utf-8"))
+    with get_engine().connect() as conn:
+        got = bool(conn.execute(text("SELECT pg_try_advisory_lock(:k);"), {"k": key}).scalar())
+        conn.commit()
+        try:
+            yield got
+        finally:
+            if got:
+                conn.execute(text("SELECT pg_advisory_unlock(:k);"), {"k": key})
+                conn.commit()
+
+
+def get_schema_version() -> int:
+    """
+    schema_version 테이블이 없으면 0
+    """
+    with get_engine().connect() as conn:
+        exists = conn.execute(text("SELECT to_regclass('public.schema_version') IS NOT NULL;")).scalar()
+        if not exists:
+            return 0
+        return int(conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version;")).scalar() or 0)
+
+
+def check_schema():
+    """
+    ✅ 엔트리포인트 시작 시 1회: 버전 조회만 함 (DDL 실행 X)
+    DB가 코드보다 뒤처져 있으면 migrate 안내와 함께 실패
+    """
+    global _schema_checked
+    if _schema_checked:
+        return
+
+    current = get_schema_version()
+    if current < SCHEMA_VERSION:
+        raise RuntimeError(
+            f"DB schema is at v{current}, code expects v{SCHEMA_VERSION}. "
+            f"Run: python -m app.main migrate"
+        )
+    _schema_checked = True
+
+
+def migrate() -> List[int]:
+    """
+    pending migration을 버전 순서대로 적용. 적용한 버전 목록 반환
+    migration 1개 = 트랜잭션 1개 (실패하면 그 버전만 롤백되고 중단)
+    """
+    with get_engine().begin() as conn:
         conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS daily_rollups (
-          report_date DATE PRIMARY KEY,
-          payload_json JSONB NOT NULL,
-          created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-          updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        CREATE TABLE IF NOT EXISTS schema_version (
+          version INT PRIMARY KEY,
+          name TEXT NOT NULL,
+          applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
         );
         """))
+
+    applied: List[int] = []
+    for version, name, ddl in MIGRATIONS:
+        with get_engine().begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(:k);"), {"k": _MIGRATE_LOCK_KEY})
+            done = conn.execute(
+                text("SELECT 1 FROM schema_version WHERE version=:v;"), {"v": version}
+            ).first()
+            if done:
+                continue
+            conn.execute(text(ddl))
+            conn.execute(
+                text("INSERT INTO schema_version(version, name) VALUES (:v, :n);"),
+                {"v": version, "n": name},
+            )
+        applied.append(version)
+    return applied
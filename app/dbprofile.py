@@ -0,0 +1,234 @@
+from __future__ import annotations
+import json
+import os
+import re
+import signal
+import sys
+import time
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# ✅ opt-in (--profile-sql / QUERY_PROFILE=1): Engine 클래스에 cursor 이벤트를 걸어서
+# statement별 latency 히스토그램 + 느린 SELECT는 EXPLAIN (ANALYZE, BUFFERS) 1회 샘플
+# engine은 lazy 생성이라 클래스 단위로 등록 (get_engine() 전에 켜도 됨)
+
+BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+_WS_RE = re.compile(r"\s+")
+# 다시 실행하면 부작용이 있는 문장은 EXPLAIN ANALYZE 하지 않음
+_WRITE_RE = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|CREATE|DROP|ALTER|TRUNCATE|NOTIFY|LISTEN"
+    r"|pg_notify|nextval|setval|pg_advisory\w*|pg_try_advisory\w*)\b",
+    re.I,
+)
+
+
+@dataclass
+class QueryStat:
+    sql: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    slow: int = 0
+    rows: int = 0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(BUCKETS_MS) + 1))
+    explain: Optional[str] = None
+
+    def observe(self, ms: float, rowcount: int, slow: bool):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.slow += int(slow)
+        self.rows += max(rowcount, 0)
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+
+    def quantile_ms(self, q: float) -> float:
+        """
+        히스토그램 상한값 기준 근사 분위수
+        """
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target and n:
+                return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+_stats: Dict[str, QueryStat] = {}
+_lock = threading.Lock()
+_enabled = False
+_threshold_ms = 200.0
+_started_at: Optional[datetime] = None
+
+
+def normalize_sql(statement: str) -> str:
+    return _WS_RE.sub(" ", statement).strip()
+
+
+def _is_read_only(sql: str) -> bool:
+    head = sql.lstrip("( ").split(" ", 1)[0].upper()
+    return head in ("SELECT", "WITH") and not _WRITE_RE.search(sql)
+
+
+# 시작 시각은 statement의 ExecutionContext에 붙임 (커넥션 단위 stack이면 실패한 statement 값이 풀 커넥션에 남음)
+# context가 없는 실행(드묾)은 측정하지 않음
+def _before(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._qprof_t0 = time.perf_counter()
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    t0 = getattr(context, "_qprof_t0", None)
+    if t0 is None:
+        return
+    ms = (time.perf_counter() - t0) * 1000.0
+    sql = normalize_sql(statement)
+    slow = ms >= _threshold_ms
+
+    with _lock:
+        st = _stats.get(sql)
+        if st is None:
+            st = _stats[sql] = QueryStat(sql=sql)
+        st.observe(ms, getattr(cursor, "rowcount", 0) or 0, slow)
+        need_explain = slow and st.explain is None and not executemany and _is_read_only(sql)
+        if need_explain:
+            st.explain = ""  # 다른 스레드가 중복으로 돌리지 않게 먼저 표시
+
+    if need_explain:
+        plan = _explain(cursor, statement, parameters)
+        with _lock:
+            st.explain = plan
+
+
+def _explain(cursor, statement, parameters) -> str:
+    """
+    같은 DBAPI 커넥션/트랜잭션에서 다시 실행 (raw cursor → SQLAlchemy 이벤트 재진입 없음)
+    savepoint 안에서 돌려서 EXPLAIN이 실패해도 원래 트랜잭션은 그대로
+    """
+    try:
+        cur = cursor.connection.cursor()
+    except Exception as e:
+        return f"(explain failed: {e})"
+    try:
+        cur.execute("SAVEPOINT qprof_explain")
+        try:
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+            plan = "\n".join(r[0] for r in cur.fetchall())
+            cur.execute("RELEASE SAVEPOINT qprof_explain")
+            return plan
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT qprof_explain")
+            return f"(explain failed: {e})"
+    except Exception as e:
+        return f"(explain failed: {e})"
+    finally:
+        cur.close()
+
+
+def enable(threshold_ms: float = 200.0):
+    global _enabled, _threshold_ms, _started_at
+    _threshold_ms = threshold_ms
+    if _enabled:
+        return
+    event.listen(Engine, "before_cursor_execute", _before)
+    event.listen(Engine, "after_cursor_execute", _after)
+    _enabled = True
+    _started_at = datetime.now(timezone.utc)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def ranked(limit: int = 20) -> List[QueryStat]:
+    with _lock:
+        stats = list(_stats.values())
+    return sorted(stats, key=lambda s: s.total_ms, reverse=True)[:limit]
+
+
+def report(command: str, out_dir: str = "", limit: int = 20, latest: bool = False) -> Optional[str]:
+    """
+    총 소요시간 순 상위 statement를 stderr에 출력, out_dir이 있으면 JSON으로 저장 (경로 반환)
+    latest=True(상주 프로세스 중간 dump)면 stderr 출력 없이 sql_<command>_latest.json을 덮어씀 (시작 이후 누적)
+    """
+    if not _enabled:
+        return None
+    top = ranked(limit)
+    if not latest:
+        _print_top(top)
+
+    if not out_dir:
+        return None
+    os.makedirs(out_dir, exist_ok=True)
+    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(out_dir, f"sql_{command}_{'latest' if latest else ts}.json")
+    payload: Dict[str, Any] = {
+        "command": command,
+        "started_at": _started_at.isoformat() if _started_at else None,
+        "written_at": datetime.now(timezone.utc).isoformat(),
+        "threshold_ms": _threshold_ms,
+        "buckets_ms": BUCKETS_MS,
+        "statements": [{
+            "rank": i,
+            "sql": st.sql,
+            "count": st.count,
+            "total_ms": round(st.total_ms, 3),
+            "mean_ms": round(st.total_ms / st.count, 3) if st.count else 0.0,
+            "p50_ms": st.quantile_ms(0.5),
+            "p95_ms": st.quantile_ms(0.95),
+            "max_ms": round(st.max_ms, 3),
+            "slow": st.slow,
+            "rows": st.rows,
+            "histogram": st.buckets,
+            "explain": st.explain or None,
+        } for i, st in enumerate(top, 1)],
+    }
+    # 읽는 쪽이 쓰다 만 파일을 보지 않게 임시 파일 → rename
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def _print_top(top: List[QueryStat]):
+    print(f"[sql] top {len(top)} statements by total time (slow ≥ {_threshold_ms:.0f} ms)", file=sys.stderr)
+    for i, st in enumerate(top, 1):
+        print(
+            f"[sql] {i:>2}. total {st.total_ms:9.1f} ms  n={st.count:<5} "
+            f"p50≈{st.quantile_ms(0.5):.0f} p95≈{st.quantile_ms(0.95):.0f} max {st.max_ms:.1f} ms  "
+            f"slow={st.slow}  {st.sql[:120]}",
+            file=sys.stderr,
+        )
+
+
+def start_dumper(command: str, out_dir: str, every_sec: float) -> Optional[threading.Event]:
+    """
+    상주 프로세스(serve/worker/listen)용: every_sec마다, 그리고 SIGUSR1을 받으면 report(latest=True)
+    signal handler는 Event만 set (handler 안에서 _lock을 잡으면 _after 중인 메인 스레드와 deadlock)
+    """
+    if not _enabled or not out_dir:
+        return None
+    wake = threading.Event()
+
+    def loop():
+        while True:
+            wake.wait(every_sec if every_sec > 0 else None)
+            wake.clear()
+            try:
+                path = report(command, out_dir, latest=True)
+                print(f"[sql] report: {path}", file=sys.stderr, flush=True)
+            except Exception as e:
+                print(f"[sql] report failed: {e}", file=sys.stderr, flush=True)
+
+    threading.Thread(target=loop, name="sql-profile-dump", daemon=True).start()
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, lambda *_: wake.set())
+    return wake
@@ -6,7 +6,8 @@ import yaml
 from typing import Dict, Any, List
 from datetime import datetime
 
-from app.db import init_schema
+from app import metrics, profiling
+from app.db import check_schema
 from app.config import settings
 from app.trends_provider import PyTrendsProvider
 from app.storage_pg import upsert_discovered_terms
@@ -94,38 +95,42 @@ def main():
     parser.add_argument("--max-per-term", type=int, default=10)
     parser.add_argument("--seed-limit", type=int, default=30, help="limit #seed terms per group to reduce load")
     parser.add_argument("--geos", type=str, default="", help="comma separated geos override (e.g. US,JP)")
+    profiling.add_argument(parser)
     args = parser.parse_args()
 
-    init_schema()
-
-    cfg = load_seeds()
-    timeframe = cfg["timeframe"]
-
-    # seeds.yaml의 모든 그룹 키워드 합치기
-    all_terms: List[str] = []
-    for _, arr in cfg["seed_groups"].items():
-        all_terms.extend(arr)
-
-    # 너무 많은 seed로 related_queries 호출하면 부담되므로 MVP는 제한 추천
-    all_terms = all_terms[: args.seed_limit]
-
-    geos = cfg["geos"]
-    if args.geos.strip():
-        geos = [x.strip() for x in args.geos.split(",") if x.strip()]
-
-    total = 0
-    for geo in geos:
-        rows = discover_related_queries(
-            terms=all_terms,
-            geo=geo,
-            timeframe=timeframe,
-            max_per_term=args.max_per_term,
-        )
-        upsert_discovered_terms(rows)
-        total += len(rows)
-        print(f"[{geo}] discovered rows: {len(rows)}")
-
-    print(f"done. total discovered rows: {total}")
+    with profiling.profiled(args.profile, "discover", settings.profile_dir, settings.profile_top):
+        check_schema()
+
+        cfg = load_seeds()
+        timeframe = cfg["timeframe"]
+
+        # seeds.yaml의 모든 그룹 키워드 합치기
+        all_terms: List[str] = []
+        for _, arr in cfg["seed_groups"].items():
+            all_terms.extend(arr)
+
+        # 너무 많은 seed로 related_queries 호출하면 부담되므로 MVP는 제한 추천
+        all_terms = all_terms[: args.seed_limit]
+
+        geos = cfg["geos"]
+        if args.geos.strip():
+            geos = [x.strip() for x in args.geos.split(",") if x.strip()]
+
+        total = 0
+        for geo in geos:
+            with metrics.stage("discover_fetch"):
+                rows = discover_related_queries(
+                    terms=all_terms,
+                    geo=geo,
+                    timeframe=timeframe,
+                    max_per_term=args.max_per_term,
+                )
+            with metrics.stage("discover_upsert"):
+                upsert_discovered_terms(rows)
+            total += len(rows)
+            print(f"[{geo}] discovered rows: {len(rows)}")
+
+        print(f"done. total discovered rows: {total}")
 
 
 if __name__ == "__main__":
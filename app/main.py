@@ -1,27 +1,99 @@
 from __future__ import annotations
+import time
+
+_T_MODULE_START = time.perf_counter()
+
 import sys
-import yaml
-from datetime import datetime, timezone, timedelta
-from tqdm import tqdm
+import json
+import select
+import signal
+import argparse
 import warnings
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime, timezone, timedelta
+
+import requests
 
+from app import metrics, profiling, tracing
 from app.config import settings
-from app.trends_provider import PyTrendsProvider
-from app.detector import compute_signal
 from app.insights import make_insight
 from app.slack_notifier import blocks_for_alert, send_alert, send_daily_summary
-from app.db import init_schema
+from app.db import get_engine, check_schema, migrate, dispose_engine, try_advisory_lock
 from app.storage_pg import (
-    upsert_trend_series, upsert_feature,
+    upsert_trend_series, upsert_features, FEATURES_CHANNEL,
     fired_recently, log_alert, was_rising_last_week,
     get_top_features,
-    upsert_hourly_snapshot, insert_hourly_snapshot_features,
-    get_previous_snapshot_id, get_snapshot_feature_map, get_snapshot_top_features,
+    upsert_hourly_snapshot, insert_hourly_snapshot_features, apply_snapshot_to_daily_state,
+    snapshot_content_hash, find_snapshot_source,
+    get_snapshot_top_features, compute_snapshot_deltas, get_snapshot_deltas,
     compute_daily_rollup, upsert_daily_rollup,
+    compute_daily_rollups, upsert_daily_rollups, rebuild_daily_state,
     get_approved_terms,
     get_candidates_for_slack,   # ✅ 추가
+    ensure_future_partitions, apply_retention, pack_cold_series,
+    enqueue_work_units, claim_work_unit, heartbeat_work_unit, finish_work_unit, work_queue_status,
+    insert_run_metrics, bump_data_version,
 )
 
+# ✅ pandas/numpy/pytrends/tqdm/yaml은 여기서 import하지 않음
+#    (run/hourly처럼 실제로 쓰는 커맨드 안에서만 lazy import → slack/daily 기동 비용 절감)
+
+# --timing: (phase, seconds). serve처럼 오래 떠 있는 프로세스에서도 커지지 않게 최근 것만 보관
+TIMINGS: deque[tuple[str, float]] = deque(
+    [("import app.main", time.perf_counter() - _T_MODULE_START)], maxlen=512
+)
+
+
+@contextmanager
+def timed(phase: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        TIMINGS.append((phase, time.perf_counter() - t0))
+
+
+def print_timings():
+    total = time.perf_counter() - _T_MODULE_START
+    for phase, sec in TIMINGS:
+        print(f"[timing] {phase:<28} {sec * 1000:9.1f} ms", file=sys.stderr)
+    print(f"[timing] {'total':<28} {total * 1000:9.1f} ms", file=sys.stderr)
+
+
+def flush_metrics(m: metrics.RunMetrics):
+    """
+    run_metrics 테이블 + (설정 시) Prometheus textfile. 실패해도 커맨드 결과에는 영향 X
+    """
+    try:
+        insert_run_metrics(m)
+    except Exception as e:
+        print(f"[metrics] run_metrics insert failed: {e}", file=sys.stderr)
+    if settings.metrics_textfile_dir:
+        try:
+            metrics.write_textfile(m, settings.metrics_textfile_dir)
+        except OSError as e:
+            print(f"[metrics] textfile write failed: {e}", file=sys.stderr)
+
+
+# --trace / TRACE_DIR: 켜져 있으면 measured() 범위마다 trace 파일 1개
+TRACE_DIR = ""
+
+
+@contextmanager
+def measured(command: str):
+    """
+    커맨드/잡 1회: run_metrics 기록 + (옵션) trace export
+    """
+    m = None
+    try:
+        with (tracing.trace(command, TRACE_DIR) if TRACE_DIR else nullcontext()), metrics.run(command) as m:
+            yield m
+    finally:
+        if m is not None:
+            flush_metrics(m)
+
+
 warnings.filterwarnings("ignore", category=FutureWarning, module="pytrends")
 
 KST = timezone(timedelta(hours=9))
@@ -34,42 +106,41 @@ def kst_hour_floor(dt: datetime) -> datetime:
 
 
 def load_seeds(path: str = "app/seeds.yaml"):
+    import yaml
+
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
 
-def get_provider():
-    return PyTrendsProvider(hl=settings.pytrends_hl, tz=settings.pytrends_tz)
+_provider = None
 
 
-def run():
+def get_provider():
     """
-    ✅ DB 저장 전용 (Slack 발송 X)
-    - trend_series 저장
-    - trend_features 저장 (severity/evidence 포함)
-    - daily summary는 그대로 보냄(요약 채널)
+    프로세스당 1개 (serve에서는 Google 세션/쿠키를 잡 사이에 재사용)
     """
-    init_schema()
-
-    cfg = load_seeds()
-    geos = cfg["geos"]
-    timeframe = cfg["timeframe"]
+    global _provider
+    if _provider is None:
+        from app.trends_provider import PyTrendsProvider
 
-    terms: list[str] = []
-    for _, arr in cfg["seed_groups"].items():
-        terms.extend(arr)
+        _provider = PyTrendsProvider(hl=settings.pytrends_hl, tz=settings.pytrends_tz)
+    return _provider
 
-    # ✅ 승인된 후보도 합치기 (중복 제거)
-    terms = list(dict.fromkeys(terms + get_approved_terms(limit=500)))
 
-    provider = get_provider()
+def process_geo(provider, geo: str, terms: list[str], timeframe: str, today: str) -> dict:
+    """
+    geo 1개(또는 그 안의 term 배치 1개) 수집 → trend_series / trend_features 저장
+    반환: {"fired": {severity: n}, "signals": n}
+    """
+    from app.detector import compute_signal
 
-    fired = {k: 0 for k in SEVERITIES}
-    total_signals = 0
-    today = datetime.now(KST).date().isoformat()
+    with tracing.span("geo", geo=geo, terms=len(terms)) as geo_span:
+        fired = {k: 0 for k in SEVERITIES}
+        total_signals = 0
 
-    for geo in tqdm(geos, desc="🌍 GEO 처리 중", unit="geo"):
-        results = provider.interest_over_time(terms=terms, geo=geo, timeframe=timeframe)
+        with metrics.stage("fetch") as sp:
+            results = provider.interest_over_time(terms=terms, geo=geo, timeframe=timeframe)
+            sp.set(series=len(results))
 
         # (1) 원천 시계열 저장
         rows = []
@@ -78,34 +149,109 @@ def run():
             for idx, val in s.items():
                 rows.append((r.term, r.geo, idx.strftime("%Y-%m-%d"), float(val), "google_trends"))
         if rows:
-            upsert_trend_series(rows)
+            with metrics.stage("series_upsert") as sp:
+                upsert_trend_series(rows)
+                sp.set(rows=len(rows))
+        metrics.inc("series_rows", len(rows))
 
         # (2) 탐지 + 피처 저장 (Slack 발송 X)
-        for r in results:
-            sig = compute_signal(r.series, term=r.term, geo=r.geo)
-            if not sig:
-                continue
-
-            total_signals += 1
-
-            # Breakout 품질: 최근 14일 내 Rising 이상 이력이 없으면 Breakout을 Rising으로 낮춤
-            severity = sig.severity
-            if severity == "BREAKOUT" and not was_rising_last_week(sig.term, sig.geo, today):
-                severity = "RISING"
-
-            upsert_feature(
-                term=sig.term,
-                geo=sig.geo,
-                as_of_date=today,
-                wow=sig.wow_change,
-                z=sig.z_score,
-                slope=sig.slope_7d,
-                latest=sig.latest,
-                severity=sig.severity,          # ✅ 추가
-                evidence=sig.evidence,          # ✅ 추가 (없으면 제거 가능)
-            )
+        # geo 단위로 한 번에 커밋 → 커밋 시점에 NOTIFY (listen dispatcher가 바로 평가)
+        feature_rows = []
+        with metrics.stage("detect") as sp:
+            sp.set(series=len(results))
+            for r in results:
+                sig = compute_signal(r.series, term=r.term, geo=r.geo)
+                if not sig:
+                    continue
+
+                total_signals += 1
+
+                # Breakout 품질: 최근 14일 내 Rising 이상 이력이 없으면 Breakout을 Rising으로 낮춤
+                severity = sig.severity
+                if severity == "BREAKOUT" and not was_rising_last_week(sig.term, sig.geo, today):
+                    severity = "RISING"
+
+                feature_rows.append({
+                    "term": sig.term,
+                    "geo": sig.geo,
+                    "as_of_date": today,
+                    "wow": sig.wow_change,
+                    "z": sig.z_score,
+                    "slope": sig.slope_7d,
+                    "latest": sig.latest,
+                    "severity": sig.severity,          # ✅ 추가
+                    "evidence": sig.evidence,          # ✅ 추가 (없으면 제거 가능)
+                })
+
+                fired[severity] = fired.get(severity, 0) + 1
+
+        with metrics.stage("feature_upsert") as sp:
+            upsert_features(feature_rows, notify=True)
+            sp.set(rows=len(feature_rows))
+        if rows or feature_rows:
+            bump_data_version(f"run {geo}")
+        metrics.inc("signals", total_signals)
+        geo_span.set(signals=total_signals)
+    return {"fired": fired, "signals": total_signals}
+
+
+def load_run_terms(cfg: dict) -> list[str]:
+    terms: list[str] = []
+    for _, arr in cfg["seed_groups"].items():
+        terms.extend(arr)
+
+    # ✅ 승인된 후보도 합치기 (중복 제거)
+    return list(dict.fromkeys(terms + get_approved_terms(limit=500)))
 
-            fired[severity] = fired.get(severity, 0) + 1
+
+def run(queue: bool = False):
+    """
+    ✅ DB 저장 전용 (Slack 발송 X)
+    - trend_series 저장
+    - trend_features 저장 (severity/evidence 포함)
+    - daily summary는 그대로 보냄(요약 채널)
+    - queue=True: (geo, term 배치) unit을 work_units에 넣고 이 프로세스도 워커로 참여,
+      다른 호스트의 `worker`들과 나눠 처리한 뒤 전부 끝나면 요약 전송
+    """
+    with timed("check_schema"):
+        check_schema()
+
+    with timed("import pipeline"):
+        from tqdm import tqdm
+
+    cfg = load_seeds()
+    geos = cfg["geos"]
+    timeframe = cfg["timeframe"]
+    terms = load_run_terms(cfg)
+
+    fired = {k: 0 for k in SEVERITIES}
+    total_signals = 0
+    today = datetime.now(KST).date().isoformat()
+
+    if queue:
+        size = max(1, settings.queue_batch_terms)
+        units = [
+            (geo, i // size, terms[i:i + size])
+            for geo in geos
+            for i in range(0, len(terms), size)
+        ]
+        n = enqueue_work_units(today, timeframe, units)
+        print(f"enqueued {n} work units ({len(geos)} geos x {len(terms)} terms)")
+        run_worker(drain=True)
+        status = wait_for_queue(today)
+        for res in status["results"]:
+            total_signals += int(res.get("signals", 0))
+            for k, v in res.get("fired", {}).items():
+                fired[k] = fired.get(k, 0) + int(v)
+    else:
+        with timed("provider init"):
+            provider = get_provider()
+
+        for geo in tqdm(geos, desc="🌍 GEO 처리 중", unit="geo"):
+            res = process_geo(provider, geo, terms, timeframe, today)
+            total_signals += res["signals"]
+            for k, v in res["fired"].items():
+                fired[k] = fired.get(k, 0) + v
 
     # ✅ TOP 조회 (요약용)
     top = get_top_features(
@@ -146,7 +292,8 @@ def run():
 
 
 def run_hourly():
-    init_schema()
+    with timed("check_schema"):
+        check_schema()
 
     cfg = load_seeds()
     geos = cfg["geos"]
@@ -161,13 +308,6 @@ def run_hourly():
     today = now_kst.date().isoformat()
     snap_at = kst_hour_floor(now_kst).isoformat()
 
-    sid = upsert_hourly_snapshot(
-        snapshot_at_iso=snap_at,
-        geo_count=len(geos),
-        term_count=len(terms),
-        timeframe=timeframe,
-    )
-
     top = get_top_features(
         as_of_date=today,
         limit=10,
@@ -189,19 +329,53 @@ def run_hourly():
             "severity": sev,
         })
 
-    insert_hourly_snapshot_features(sid, hrows)
+    # ✅ 직전 스냅샷(같은 날)과 내용이 같으면 행을 다시 쓰지 않고 참조만
+    content_hash = snapshot_content_hash(hrows)
+    source_sid = find_snapshot_source(snap_at, content_hash)
+    sid = upsert_hourly_snapshot(
+        snapshot_at_iso=snap_at,
+        geo_count=len(geos),
+        term_count=len(terms),
+        timeframe=timeframe,
+        content_hash=content_hash,
+        source_snapshot_id=source_sid,
+    )
+    if source_sid is None:
+        with metrics.stage("snapshot_insert"):
+            insert_hourly_snapshot_features(sid, hrows)
+    else:
+        metrics.inc("snapshot_reused")
+    # ✅ daily 집계 상태 누적 → run_daily는 읽기만
+    with metrics.stage("rollup"):
+        apply_snapshot_to_daily_state(sid)
 
-    # (선택) hourly 변화 감지 알림은 "DB only slack 발송" 정책이면 여기서 보내지 않는 게 깔끔함.
-    # 필요하면 send_slack_from_db()를 더 자주 돌려서 해결 가능.
+    # ✅ 직전 스냅샷 대비 변화는 DB에서 계산해서 snapshot_deltas에 저장
+    with metrics.stage("deltas"):
+        n_deltas = compute_snapshot_deltas(sid, z_jump=settings.delta_z_jump)
+    bump_data_version("hourly")
+    metrics.inc("snapshot_deltas", n_deltas)
+    if settings.hourly_delta_alerts and n_deltas:
+        send_hourly_deltas(sid, snap_at)
 
 
-def run_daily(report_date: str | None = None):
-    init_schema()
-    if report_date is None:
-        report_date = datetime.now(KST).date().isoformat()
+def send_hourly_deltas(snapshot_id: int, snap_at: str):
+    """
+    진입/severity 상승/z 급등만 모아서 alert 채널에 한 메시지로 전송
+    """
+    deltas = get_snapshot_deltas(snapshot_id, kinds=["ENTERED", "UPGRADED", "Z_JUMP"])
+    if not deltas:
+        return
+    lines = [f"⏱ Hourly 변화 ({snap_at})"]
+    for d in deltas:
+        z_from = "-" if d["z_from"] is None else f"{d['z_from']:.2f}"
+        lines.append(
+            f"- {d['kind']} | {d['geo']} | {d['term']} "
+            f"({d['severity_from'] or '-'} → {d['severity_to']}, z {z_from} → {d['z_to']:.2f})"
+        )
+    send_daily_summary(settings.slack_webhook_url, settings.slack_channel_alert, "\n".join(lines))
 
-    roll = compute_daily_rollup(report_date=report_date, min_support=2, limit=10)
 
+def daily_summary_text(roll: dict) -> str:
     lines = []
     lines.append(f"📌 Daily 글로벌 K-beauty 트렌드 종합 ({roll['report_date']})")
     lines.append(f"- 기준: hourly 스냅샷 집계 (support≥{roll['min_support']})")
@@ -219,10 +393,51 @@ def run_daily(report_date: str | None = None):
                 f"(max z {r['max_z']:.2f}, median WoW {wow_pct:+.0f}%, support {r['support']})\n"
                 f"  · 기대 포인트: {card.expectation}"
             )
+    return "\n".join(lines)
+
+
+def run_daily(report_date: str | None = None, slack: bool = True):
+    with timed("check_schema"):
+        check_schema()
+    if report_date is None:
+        report_date = datetime.now(KST).date().isoformat()
 
-    text = "\n".join(lines)
+    with metrics.stage("rollup"):
+        roll = compute_daily_rollup(report_date=report_date, min_support=2, limit=10)
+
+    text = daily_summary_text(roll)
     upsert_daily_rollup(report_date, {"text": text, **roll})
-    send_daily_summary(settings.slack_webhook_url, settings.slack_channel_daily, text)
+    if slack:
+        send_daily_summary(settings.slack_webhook_url, settings.slack_channel_daily, text)
+
+
+def run_daily_range(date_from: str, date_to: str, slack: bool = True, rebuild_state: bool = False):
+    """
+    daily_rollups 일괄 재생성: 범위 전체를 쿼리 1번으로 계산 → 한 트랜잭션으로 upsert
+    - rebuild_state: 먼저 hsf에서 daily_rollup_state도 다시 만듦 (집계 규칙 변경/누락 복구)
+    - slack: 날짜별 요약도 전송 (재생성 시엔 --no-slack 권장)
+    """
+    with timed("check_schema"):
+        check_schema()
+    if date_from > date_to:
+        raise SystemExit(f"--from {date_from} is after --to {date_to}")
+
+    if rebuild_state:
+        with timed("rebuild state"):
+            rebuild_daily_state(date.fromisoformat(date_from), date.fromisoformat(date_to))
+    with timed("compute rollups"), metrics.stage("rollup"):
+        rolls = compute_daily_rollups(date_from, date_to, min_support=2, limit=10)
+
+    payloads = {}
+    for d, roll in rolls.items():
+        payloads[d] = {"text": daily_summary_text(roll), **roll}
+    with timed("upsert rollups"):
+        upsert_daily_rollups(payloads)
+
+    if slack:
+        for d, p in payloads.items():
+            send_daily_summary(settings.slack_webhook_url, settings.slack_channel_daily, p["text"])
+    print(f"daily rollups: {len(payloads)} days ({date_from} ~ {date_to})")
 
 
 def send_slack_from_db(as_of_date: str | None = None):
@@ -231,18 +446,29 @@ def send_slack_from_db(as_of_date: str | None = None):
     - trend_features에서 후보 조회
     - cooldown은 alerts 테이블로 제어
     """
-    init_schema()
+    with timed("check_schema"):
+        check_schema()
 
     if as_of_date is None:
         as_of_date = datetime.now(KST).date().isoformat()
 
+    dispatch_alerts(as_of_date)
+
+
+def dispatch_alerts(as_of_date: str, pairs: list[tuple[str, str]] | None = None):
+    """
+    후보 조회 → cooldown 체크 → Slack 발송 → alerts 기록
+    pairs가 주어지면 해당 (term, geo)만 평가 (listen dispatcher용)
+    """
     severities = ["BREAKOUT", "RISING", "EMERGING"]  # WATCH는 summary로만
-    candidates = get_candidates_for_slack(
-        as_of_date=as_of_date,
-        severities=severities,
-        limit=20,
-        min_latest=2.0,
-    )
+    with metrics.stage("candidates"):
+        candidates = get_candidates_for_slack(
+            as_of_date=as_of_date,
+            severities=severities,
+            limit=settings.slack_alert_limit,
+            min_latest=2.0,
+            pairs=pairs,
+        )
 
     for c in candidates:
         sev = c["severity"]
@@ -270,33 +496,362 @@ def send_slack_from_db(as_of_date: str | None = None):
             },
         )
 
-        send_alert(settings.slack_webhook_url, settings.slack_channel_alert, blocks)
+        try:
+            send_alert(settings.slack_webhook_url, settings.slack_channel_alert, blocks)
+        except requests.RequestException as e:
+            # 기록 안 함 → 다음 dispatch에서 다시 후보가 됨. 나머지 alert는 계속 보냄
+            print(f"[slack] send failed ({sev} {geo} {term}): {e}", file=sys.stderr)
+            metrics.inc("slack_errors")
+            continue
         log_alert(term, geo, sev, slack_channel=settings.slack_channel_alert, cooldown_hours=cooldown)
+        metrics.inc("alerts_sent")
+
+
+def _dispatch_safely(as_of_date: str, pairs=None):
+    # dispatch 하나가 실패해도 (DB 에러 등) dispatcher는 계속
+    try:
+        dispatch_alerts(as_of_date, pairs=pairs)
+    except Exception:
+        import traceback
+        print(f"[listen] dispatch failed for {as_of_date}:\n{traceback.format_exc()}", file=sys.stderr)
+
+
+def _parse_notify(payload: str) -> tuple[str, str, list] | None:
+    """
+    NOTIFY payload → (as_of_date, geo, terms). 다른 발신자/깨진 payload면 None
+    """
+    try:
+        msg = json.loads(payload)
+    except ValueError:
+        return None
+    if not isinstance(msg, dict):
+        return None
+    as_of_date, geo, terms = msg.get("as_of_date"), msg.get("geo"), msg.get("terms") or []
+    if not isinstance(as_of_date, str) or not isinstance(geo, str) or not isinstance(terms, list):
+        return None
+    return as_of_date, geo, [t for t in terms if isinstance(t, str)]
+
+
+def listen_and_dispatch(debounce_sec: float = 2.0, poll_timeout: float = 60.0, reconnect_sec: float = 5.0):
+    """
+    ✅ 상주 dispatcher: LISTEN trend_features_committed
+    - run()이 geo별 feature를 커밋하면 NOTIFY가 옴 → 방금 바뀐 (term, geo)만 즉시 평가/발송
+    - debounce_sec 동안 들어온 알림은 묶어서 한 번에 처리 (geo가 연달아 커밋되는 경우)
+    - (재)연결할 때마다 오늘 날짜 전체를 한 번 평가해서, 꺼져/끊겨 있던 동안의 커밋도 놓치지 않음 (cooldown으로 중복 방지)
+    - 연결이 끊기면 reconnect_sec 뒤 재연결 + LISTEN 재등록
+    """
+    import psycopg2
+    from sqlalchemy.exc import OperationalError as SAOperationalError
+
+    check_schema()
+
+    while True:
+        raw = None
+        try:
+            raw = get_engine().raw_connection()
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {FEATURES_CHANNEL};")
+            print(f"listening on '{FEATURES_CHANNEL}' ...")
+            # LISTEN 등록 후 catch-up → 그 사이 커밋은 NOTIFY로도 들어옴
+            _dispatch_safely(datetime.now(KST).date().isoformat())
+
+            while True:
+                if select.select([conn], [], [], poll_timeout) == ([], [], []):
+                    continue
+
+                pending: dict[str, set[tuple[str, str]]] = {}
+                deadline = time.monotonic() + debounce_sec
+                while True:
+                    conn.poll()
+                    while conn.notifies:
+                        n = conn.notifies.pop(0)
+                        parsed = _parse_notify(n.payload)
+                        if parsed is None:
+                            print(f"[listen] skip malformed payload: {n.payload[:200]!r}", file=sys.stderr)
+                            continue
+                        as_of_date, geo, terms = parsed
+                        pending.setdefault(as_of_date, set()).update((t, geo) for t in terms)
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    select.select([conn], [], [], remaining)
+
+                for as_of_date, pairs in pending.items():
+                    print(f"[{as_of_date}] dispatch {len(pairs)} changed (term, geo)")
+                    _dispatch_safely(as_of_date, pairs=sorted(pairs))
+        except (psycopg2.OperationalError, psycopg2.InterfaceError, SAOperationalError, OSError) as e:
+            print(f"[listen] connection lost ({e}); reconnecting in {reconnect_sec:.0f}s", file=sys.stderr)
+        finally:
+            if raw is not None:
+                try:
+                    raw.invalidate()
+                except Exception:
+                    pass
+        time.sleep(reconnect_sec)
+
+
+def run_worker(drain: bool = False, worker_id: str | None = None):
+    """
+    ✅ work_units 워커 (여러 프로세스/호스트에서 동시에 실행 가능)
+    - claim: FOR UPDATE SKIP LOCKED + lease
+    - 처리 중에는 lease_sec/3마다 heartbeat로 연장 → 워커가 죽으면 lease 만료 후 다른 워커가 가져감
+    - drain=True: 잡을 게 없으면 종료 (기본은 계속 polling, SIGTERM 시 현재 unit 끝내고 종료)
+    """
+    import os
+    import socket
+    import threading
+    import traceback
+
+    with timed("check_schema"):
+        check_schema()
+
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    lease_sec = settings.queue_lease_sec
+    stop = threading.Event()
+    if not drain and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    with timed("provider init"):
+        provider = get_provider()
+
+    done = 0
+    while not stop.is_set():
+        unit = claim_work_unit(worker_id, lease_sec, settings.queue_max_attempts)
+        if unit is None:
+            if drain:
+                break
+            stop.wait(settings.queue_poll_sec)
+            continue
+
+        beat_stop = threading.Event()
+
+        def heartbeat(unit_id=unit["id"]):
+            while not beat_stop.wait(lease_sec / 3):
+                if not heartbeat_work_unit(unit_id, worker_id, lease_sec):
+                    print(f"[worker] lost lease on unit {unit_id}", flush=True)
+                    return
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+        try:
+            # run --queue 안에서는 그 run에 합산, 단독 worker면 unit마다 기록
+            with measured("worker") if metrics.current() is None else nullcontext():
+                res = process_geo(provider, unit["geo"], unit["terms"], unit["timeframe"], unit["run_date"])
+            finish_work_unit(unit["id"], worker_id, result=res)
+            done += 1
+        except Exception:
+            finish_work_unit(unit["id"], worker_id, error=traceback.format_exc(),
+                             max_attempts=settings.queue_max_attempts)
+            print(f"[worker] unit {unit['id']} ({unit['geo']}) failed (attempt {unit['attempts']})", flush=True)
+        finally:
+            beat_stop.set()
+            beat.join()
+
+    if done or not drain:
+        print(f"[worker] {worker_id}: {done} units done", flush=True)
+
+
+def wait_for_queue(run_date: str) -> dict:
+    """
+    다른 워커가 잡고 있는 unit까지 끝날 때까지 대기 (lease 만료 unit은 이 프로세스가 다시 처리)
+    """
+    while True:
+        status = work_queue_status(run_date, settings.queue_max_attempts)
+        pending = status["counts"].get("queued", 0) + status["counts"].get("leased", 0)
+        if not pending:
+            break
+        time.sleep(settings.queue_poll_sec)
+        run_worker(drain=True)
+
+    failed = status["counts"].get("failed", 0)
+    if failed:
+        print(f"⚠️ {failed} work units failed for {run_date} (see work_units.error)")
+    return status
+
+
+def run_migrate():
+    applied = migrate()
+    if applied:
+        print(f"applied migrations: {', '.join(f'v{v}' for v in applied)}")
+    else:
+        print("schema is up to date.")
 
 
-def _usage():
-    return (
-        "Usage:\n"
-        "  python -m app.main run\n"
-        "  python -m app.main hourly\n"
-        "  python -m app.main daily\n"
-        "  python -m app.main slack\n"
-        "  python -m app.main slack YYYY-MM-DD\n"
+def run_maintain():
+    """
+    ✅ 파티션/보관 관리 (하루 1번 정도)
+    - 앞으로 N개월 파티션 미리 생성
+    - 오래된 trend_series 파티션 → trend_series_packed (real[])로 압축
+    - 오래된 hourly 스냅샷 파티션: daily rollup 소비 확인 → 일 집계로 compaction → DROP
+    - (옵션) 오래된 trend_series 파티션 DROP
+    """
+    with timed("check_schema"):
+        check_schema()
+
+    ensure_future_partitions(settings.partition_months_ahead)
+    for part, n in pack_cold_series(settings.cold_series_months):
+        print(f"packed {part} -> {n} rows in trend_series_packed, dropped")
+    report = apply_retention(
+        hourly_months=settings.retention_hourly_months,
+        series_months=settings.retention_series_months,
     )
+    for part, n in report["compacted"]:
+        print(f"compacted {part} -> {n} daily rows, dropped")
+    for part in report["skipped"]:
+        print(f"skipped {part} (daily rollup missing for some days)")
+    for part in report["dropped"]:
+        print(f"dropped {part}")
+    if report["dropped"]:
+        bump_data_version("maintain")
+
+
+def run_serve():
+    """
+    ✅ 상주 스케줄러: cron 대신 프로세스 1개가 hourly/daily/slack/maintain(+run)을 돌림
+    - import/check_schema/DB 풀/provider 세션은 프로세스 시작 시 1번만
+    - 같은 잡 중복 실행 방지: 프로세스 안에서는 스레드 상태, 여러 인스턴스 사이에서는 advisory lock
+    - SIGTERM/SIGINT: 새 잡은 시작하지 않고 돌고 있는 잡이 끝나면 종료
+    """
+    from app.scheduler import Scheduler, daily_at, every_minutes, hourly_at
+
+    with timed("check_schema"):
+        check_schema()
+
+    def wrap(job):
+        with try_advisory_lock(f"kbtrends:job:{job.name}") as got:
+            if not got:
+                print(f"[serve] {job.name}: running elsewhere, skipping", flush=True)
+                return
+            with measured(job.name):
+                job.fn()
+
+    sched = Scheduler(wrap=wrap)
+    sched.add("hourly", run_hourly, hourly_at(0))
+    sched.add("daily", run_daily, daily_at(settings.serve_daily_at))
+    if settings.serve_slack_minutes > 0:
+        sched.add("slack", send_slack_from_db, every_minutes(settings.serve_slack_minutes))
+    if settings.serve_maintain_at:
+        sched.add("maintain", run_maintain, daily_at(settings.serve_maintain_at))
+    if settings.serve_run_at:
+        sched.add("run", run, daily_at(settings.serve_run_at))
+
+    signal.signal(signal.SIGTERM, sched.stop)
+    signal.signal(signal.SIGINT, sched.stop)
+    try:
+        sched.run_forever()
+    finally:
+        for name, st in sched.stats().items():
+            print(f"[serve] {name}: runs={st['runs']} skipped={st['skipped']}", flush=True)
+        dispose_engine()
+
+
+def _common_parser(suppress: bool = False) -> argparse.ArgumentParser:
+    """
+    공통 플래그. 서브커맨드용(suppress=True)은 default=SUPPRESS로 만들어서
+    `--timing slack`처럼 앞에 준 값을 서브파서 기본값이 덮어쓰지 않게 함
+    """
+    flag = argparse.SUPPRESS if suppress else False
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--timing", action="store_true", default=flag,
+                        help="print import/startup/command phase timings to stderr")
+    common.add_argument("--trace", action="store_true", default=flag,
+                        help="export per-run spans (OTLP/JSON) to TRACE_DIR (default logs/traces)")
+    common.add_argument("--profile-sql", action="store_true", default=flag,
+                        help="per-statement latency report (+ EXPLAIN ANALYZE for slow SELECTs): stderr + JSON in "
+                             "QUERY_PROFILE_DIR (default logs/sql) at exit; serve/worker/listen also rewrite "
+                             "sql_<cmd>_latest.json every QUERY_PROFILE_EVERY_SEC (default 900) and on SIGUSR1")
+    profiling.add_argument(common, default=argparse.SUPPRESS if suppress else None)
+    return common
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.main", parents=[_common_parser()])
+    common = _common_parser(suppress=True)
+    sub = parser.add_subparsers(dest="cmd")
+
+    sub.add_parser("migrate", parents=[common], help="apply pending schema migrations")
+    p_run = sub.add_parser("run", parents=[common], help="collect + detect + store features (default)")
+    p_run.add_argument("--queue", action="store_true",
+                       help="enqueue (geo, term batch) units and process them together with `worker`s")
+
+    p_worker = sub.add_parser("worker", parents=[common], help="claim and process queued collection units")
+    p_worker.add_argument("--drain", action="store_true", help="exit when the queue is empty")
+    sub.add_parser("hourly", parents=[common], help="hourly snapshot of top features")
+
+    p_daily = sub.add_parser("daily", parents=[common], help="daily rollup + summary")
+    p_daily.add_argument("--date", default=None, help="YYYY-MM-DD (default: today KST)")
+    p_daily.add_argument("--from", dest="date_from", default=None, help="range start YYYY-MM-DD (with --to)")
+    p_daily.add_argument("--to", dest="date_to", default=None, help="range end YYYY-MM-DD, inclusive")
+    p_daily.add_argument("--no-slack", action="store_true", help="store rollups only, skip Slack summary")
+    p_daily.add_argument("--rebuild-state", action="store_true",
+                         help="recompute daily_rollup_state from hourly features first (range mode)")
+
+    p_slack = sub.add_parser("slack", parents=[common], help="send alerts from trend_features")
+    p_slack.add_argument("date", nargs="?", default=None, help="YYYY-MM-DD (default: today KST)")
+
+    sub.add_parser("listen", parents=[common], help="LISTEN/NOTIFY alert dispatcher")
+    sub.add_parser("maintain", parents=[common], help="create future partitions + apply retention")
+    sub.add_parser("serve", parents=[common], help="long-running scheduler (hourly/daily/slack/maintain)")
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    args = build_parser().parse_args(argv)
+    cmd = args.cmd or "run"
+
+    # 상주 커맨드는 잡/unit 단위로 따로 기록, migrate는 테이블이 없을 수 있어서 제외
+    unmeasured = {"migrate", "serve", "worker", "listen"}
+    global TRACE_DIR
+    if args.trace or settings.trace_dir:
+        TRACE_DIR = settings.trace_dir or "logs/traces"
+    profile_sql = args.profile_sql or settings.query_profile
+    if profile_sql:
+        from app import dbprofile
+
+        dbprofile.enable(settings.slow_query_ms)
+        if cmd in ("serve", "worker", "listen"):
+            dbprofile.start_dumper(cmd, settings.query_profile_dir, settings.query_profile_every_sec)
+    try:
+        with profiling.profiled(args.profile, cmd, settings.profile_dir, settings.profile_top), \
+                timed(f"command {cmd}"), (nullcontext() if cmd in unmeasured else measured(cmd)):
+            if cmd == "migrate":
+                run_migrate()
+            elif cmd == "run":
+                run(queue=getattr(args, "queue", False))
+            elif cmd == "worker":
+                run_worker(drain=args.drain)
+            elif cmd == "hourly":
+                run_hourly()
+            elif cmd == "daily":
+                if args.date_from or args.date_to:
+                    run_daily_range(
+                        args.date_from or args.date_to,
+                        args.date_to or args.date_from,
+                        slack=not args.no_slack,
+                        rebuild_state=args.rebuild_state,
+                    )
+                else:
+                    run_daily(args.date, slack=not args.no_slack)
+            elif cmd == "slack":
+                send_slack_from_db(args.date)
+            elif cmd == "listen":
+                listen_and_dispatch()
+            elif cmd == "maintain":
+                run_maintain()
+            elif cmd == "serve":
+                run_serve()
+    finally:
+        if args.timing:
+            print_timings()
+        if profile_sql:
+            path = dbprofile.report(cmd, settings.query_profile_dir)
+            if path:
+                print(f"[sql] report: {path}", file=sys.stderr)
 
 
 if __name__ == "__main__":
-    cmd = sys.argv[1] if len(sys.argv) > 1 else "run"
-
-    if cmd == "run":
-        run()
-    elif cmd == "hourly":
-        run_hourly()
-    elif cmd == "daily":
-        run_daily()
-    elif cmd == "slack":
-        date_arg = sys.argv[2] if len(sys.argv) > 2 else None
-        send_slack_from_db(date_arg)
-    else:
-        print(_usage())
-        raise SystemExit(2)
+    main()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+import os
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+from app import profiling, tracing
+
+# ✅ stdlib만 사용 (provider/slack_notifier에서 import해도 기동 비용 없음)
+# 커맨드/잡 실행 1번 = RunMetrics 1개. contextvar라서 serve 스레드별 잡이 섞이지 않음
+
+
+@dataclass
+class StageStat:
+    seconds: float = 0.0
+    calls: int = 0
+    errors: int = 0
+
+
+@dataclass
+class RunMetrics:
+    command: str
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    ok: bool = True
+    stages: Dict[str, StageStat] = field(default_factory=dict)
+    counters: Dict[str, float] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add_stage(self, name: str, seconds: float, error: bool = False):
+        with self._lock:
+            st = self.stages.setdefault(name, StageStat())
+            st.seconds += seconds
+            st.calls += 1
+            st.errors += int(error)
+
+    def inc(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+
+_current: contextvars.ContextVar[Optional[RunMetrics]] = contextvars.ContextVar("run_metrics", default=None)
+
+
+def current() -> Optional[RunMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def run(command: str) -> Iterator[RunMetrics]:
+    """
+    커맨드/잡 1회 측정 범위. 끝나면 finished_at/ok 채움 (저장은 호출 측에서 flush)
+    """
+    m = RunMetrics(command=command)
+    token = _current.set(m)
+    try:
+        yield m
+    except BaseException:
+        m.ok = False
+        raise
+    finally:
+        m.finished_at = datetime.now(timezone.utc)
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    구간 시간/호출 수/에러 수 누적 + 같은 이름의 trace span (+ --profile mem이면 구간 peak).
+    run() 밖이면 시간 측정은 안 함
+    yield: 현재 span (속성 추가용, trace 밖이면 no-op)
+    """
+    with tracing.span(name) as sp, profiling.mem_stage(name):
+        m = _current.get()
+        if m is None:
+            yield sp
+            return
+        t0 = time.perf_counter()
+        error = False
+        try:
+            yield sp
+        except BaseException:
+            error = True
+            raise
+        finally:
+            m.add_stage(name, time.perf_counter() - t0, error)
+
+
+def inc(name: str, value: float = 1):
+    m = _current.get()
+    if m is not None:
+        m.inc(name, value)
+
+
+# ---------------------------
+# PROMETHEUS TEXTFILE (node_exporter textfile collector)
+# ---------------------------
+def _label(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(m: RunMetrics) -> str:
+    cmd = _label(m.command)
+    total = ((m.finished_at or datetime.now(timezone.utc)) - m.started_at).total_seconds()
+    lines = [
+        "# HELP kbtrends_run_duration_seconds Wall time of the last run.",
+        "# TYPE kbtrends_run_duration_seconds gauge",
+        f'kbtrends_run_duration_seconds{{command="{cmd}"}} {total:.6f}',
+        "# HELP kbtrends_run_success 1 if the last run finished without error.",
+        "# TYPE kbtrends_run_success gauge",
+        f'kbtrends_run_success{{command="{cmd}"}} {int(m.ok)}',
+        "# HELP kbtrends_run_last_timestamp_seconds Unix time the last run finished.",
+        "# TYPE kbtrends_run_last_timestamp_seconds gauge",
+        f'kbtrends_run_last_timestamp_seconds{{command="{cmd}"}} {(m.finished_at or m.started_at).timestamp():.3f}',
+        "# HELP kbtrends_stage_seconds Time spent per pipeline stage in the last run.",
+        "# TYPE kbtrends_stage_seconds gauge",
+    ]
+    for name, st in sorted(m.stages.items()):
+        lines.append(f'kbtrends_stage_seconds{{command="{cmd}",stage="{_label(name)}"}} {st.seconds:.6f}')
+    lines += ["# HELP kbtrends_stage_calls Calls per pipeline stage in the last run.",
+              "# TYPE kbtrends_stage_calls gauge"]
+    for name, st in sorted(m.stages.items()):
+        lines.append(f'kbtrends_stage_calls{{command="{cmd}",stage="{_label(name)}"}} {st.calls}')
+    lines += ["# HELP kbtrends_stage_errors Errors per pipeline stage in the last run.",
+              "# TYPE kbtrends_stage_errors gauge"]
+    for name, st in sorted(m.stages.items()):
+        lines.append(f'kbtrends_stage_errors{{command="{cmd}",stage="{_label(name)}"}} {st.errors}')
+    lines += ["# HELP kbtrends_counter Counters (requests, 429s, rows, ...) from the last run.",
+              "# TYPE kbtrends_counter gauge"]
+    for name, v in sorted(m.counters.items()):
+        lines.append(f'kbtrends_counter{{command="{cmd}",name="{_label(name)}"}} {v:g}')
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(m: RunMetrics, directory: str):
+    """
+    <directory>/kbtrends_<command>.prom 에 원자적으로 기록 (tmp → rename)
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"kbtrends_{m.command}.prom")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus(m))
+    os.replace(tmp, path)
@@ -0,0 +1,721 @@
+# app/migrations.py
+from __future__ import annotations
+from typing import List, Tuple
+
+# (version, name, ddl)
+# ✅ 순서대로 한 번씩만 적용됨 (schema_version 테이블에 기록)
+# ✅ 이미 배포된 항목은 수정하지 말고 맨 뒤에 새 버전을 추가할 것
+MIGRATIONS: List[Tuple[int, str, str]] = [
+    (1, "baseline", """
+    CREATE TABLE IF NOT EXISTS trend_series (
+      term TEXT NOT NULL,
+      geo  TEXT NOT NULL,
+      date DATE NOT NULL,
+      value DOUBLE PRECISION NOT NULL,
+      source TEXT NOT NULL DEFAULT 'google_trends',
+      collected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      PRIMARY KEY (term, geo, date)
+    );
+
+    CREATE TABLE IF NOT EXISTS trend_features (
+      term TEXT NOT NULL,
+      geo  TEXT NOT NULL,
+      as_of_date DATE NOT NULL,
+      wow_change DOUBLE PRECISION NOT NULL,
+      z_score DOUBLE PRECISION NOT NULL,
+      slope_7d DOUBLE PRECISION NOT NULL,
+      latest DOUBLE PRECISION NOT NULL,
+      computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      PRIMARY KEY (term, geo, as_of_date)
+    );
+
+    CREATE TABLE IF NOT EXISTS alerts (
+      id BIGSERIAL PRIMARY KEY,
+      term TEXT NOT NULL,
+      geo  TEXT NOT NULL,
+      severity TEXT NOT NULL,
+      fired_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      slack_channel TEXT,
+      slack_ts TEXT,
+      status TEXT NOT NULL DEFAULT 'new',
+      cooldown_until TIMESTAMPTZ
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_alerts_lookup
+      ON alerts(term, geo, severity, fired_at DESC);
+
+    CREATE INDEX IF NOT EXISTS idx_series_term_geo_date
+      ON trend_series(term, geo, date DESC);
+
+    CREATE INDEX IF NOT EXISTS idx_features_term_geo_date
+      ON trend_features(term, geo, as_of_date DESC);
+
+    CREATE TABLE IF NOT EXISTS discovered_terms (
+      term TEXT NOT NULL,
+      geo  TEXT NOT NULL,
+      source_term TEXT,
+      kind TEXT NOT NULL DEFAULT 'related_queries',  -- related_queries / related_topics
+      rank INT,
+      score DOUBLE PRECISION,
+      first_seen TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      last_seen  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      status TEXT NOT NULL DEFAULT 'new',            -- new / approved / rejected
+      PRIMARY KEY (term, geo)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_discovered_status
+      ON discovered_terms(status);
+
+    CREATE INDEX IF NOT EXISTS idx_discovered_geo
+      ON discovered_terms(geo);
+
+    CREATE INDEX IF NOT EXISTS idx_discovered_last_seen
+      ON discovered_terms(last_seen DESC);
+
+    ALTER TABLE discovered_terms
+      ADD COLUMN IF NOT EXISTS approved_at TIMESTAMPTZ;
+
+    CREATE TABLE IF NOT EXISTS hourly_snapshots (
+      id BIGSERIAL PRIMARY KEY,
+      snapshot_at TIMESTAMPTZ NOT NULL,
+      geo_count INT NOT NULL,
+      term_count INT NOT NULL,
+      timeframe TEXT NOT NULL,
+      created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      UNIQUE (snapshot_at)
+    );
+
+    CREATE TABLE IF NOT EXISTS hourly_snapshot_features (
+      snapshot_id BIGINT NOT NULL REFERENCES hourly_snapshots(id) ON DELETE CASCADE,
+      term TEXT NOT NULL,
+      geo TEXT NOT NULL,
+      wow_change DOUBLE PRECISION NOT NULL,
+      z_score DOUBLE PRECISION NOT NULL,
+      slope_7d DOUBLE PRECISION NOT NULL,
+      latest DOUBLE PRECISION NOT NULL,
+      severity TEXT NOT NULL,
+      PRIMARY KEY (snapshot_id, term, geo)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_hsf_term_geo
+      ON hourly_snapshot_features(term, geo);
+
+    CREATE INDEX IF NOT EXISTS idx_hsf_severity
+      ON hourly_snapshot_features(severity);
+
+    CREATE TABLE IF NOT EXISTS daily_rollups (
+      report_date DATE PRIMARY KEY,
+      payload_json JSONB NOT NULL,
+      created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """),
+
+    # upsert_feature / get_candidates_for_slack가 쓰는 컬럼 (기존 DDL에 빠져 있었음)
+    (2, "trend_features_severity_evidence", """
+    ALTER TABLE trend_features
+      ADD COLUMN IF NOT EXISTS severity TEXT;
+
+    ALTER TABLE trend_features
+      ADD COLUMN IF NOT EXISTS evidence_json JSONB NOT NULL DEFAULT '{}'::jsonb;
+
+    CREATE INDEX IF NOT EXISTS idx_features_date_severity
+      ON trend_features(as_of_date, severity);
+    """),
+
+    # term/geo 사전 + 팩트 테이블 int 키 전환
+    # - terms.term은 canonical(app.terms.normalize_term과 같은 규칙: trim + 공백 정리 + 소문자)
+    # - 정규화 후 같은 키로 겹치는 기존 행은 1개만 남김 (ON CONFLICT DO NOTHING)
+    (3, "term_geo_dictionary", """
+    CREATE OR REPLACE FUNCTION normalize_term(t TEXT) RETURNS TEXT
+      LANGUAGE sql IMMUTABLE STRICT
+      AS $$ SELECT lower(regexp_replace(btrim(t), '\\s+', ' ', 'g')) $$;
+
+    CREATE TABLE IF NOT EXISTS terms (
+      id SERIAL PRIMARY KEY,
+      term TEXT NOT NULL UNIQUE
+    );
+
+    CREATE TABLE IF NOT EXISTS geos (
+      id SMALLSERIAL PRIMARY KEY,
+      geo TEXT NOT NULL UNIQUE
+    );
+
+    INSERT INTO terms(term)
+    SELECT DISTINCT normalize_term(term) FROM (
+      SELECT term FROM trend_series
+      UNION SELECT term FROM trend_features
+      UNION SELECT term FROM alerts
+      UNION SELECT term FROM hourly_snapshot_features
+      UNION SELECT term FROM discovered_terms
+    ) x
+    WHERE normalize_term(term) <> ''
+    ON CONFLICT (term) DO NOTHING;
+
+    INSERT INTO geos(geo)
+    SELECT DISTINCT upper(btrim(geo)) FROM (
+      SELECT geo FROM trend_series
+      UNION SELECT geo FROM trend_features
+      UNION SELECT geo FROM alerts
+      UNION SELECT geo FROM hourly_snapshot_features
+      UNION SELECT geo FROM discovered_terms
+    ) x
+    WHERE btrim(geo) <> ''
+    ON CONFLICT (geo) DO NOTHING;
+
+    -- trend_series
+    CREATE TABLE trend_series_new (
+      term_id INT NOT NULL REFERENCES terms(id),
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      date DATE NOT NULL,
+      value DOUBLE PRECISION NOT NULL,
+      source TEXT NOT NULL DEFAULT 'google_trends',
+      collected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      PRIMARY KEY (term_id, geo_id, date)
+    );
+    INSERT INTO trend_series_new(term_id, geo_id, date, value, source, collected_at)
+    SELECT t.id, g.id, s.date, s.value, s.source, s.collected_at
+    FROM trend_series s
+    JOIN terms t ON t.term = normalize_term(s.term)
+    JOIN geos g ON g.geo = upper(btrim(s.geo))
+    ON CONFLICT DO NOTHING;
+    DROP TABLE trend_series;
+    ALTER TABLE trend_series_new RENAME TO trend_series;
+
+    -- trend_features
+    CREATE TABLE trend_features_new (
+      term_id INT NOT NULL REFERENCES terms(id),
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      as_of_date DATE NOT NULL,
+      wow_change DOUBLE PRECISION NOT NULL,
+      z_score DOUBLE PRECISION NOT NULL,
+      slope_7d DOUBLE PRECISION NOT NULL,
+      latest DOUBLE PRECISION NOT NULL,
+      severity TEXT,
+      evidence_json JSONB NOT NULL DEFAULT '{}'::jsonb,
+      computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      PRIMARY KEY (term_id, geo_id, as_of_date)
+    );
+    INSERT INTO trend_features_new(
+      term_id, geo_id, as_of_date, wow_change, z_score, slope_7d, latest, severity, evidence_json, computed_at
+    )
+    SELECT t.id, g.id, f.as_of_date, f.wow_change, f.z_score, f.slope_7d, f.latest,
+           f.severity, f.evidence_json, f.computed_at
+    FROM trend_features f
+    JOIN terms t ON t.term = normalize_term(f.term)
+    JOIN geos g ON g.geo = upper(btrim(f.geo))
+    ON CONFLICT DO NOTHING;
+    DROP TABLE trend_features;
+    ALTER TABLE trend_features_new RENAME TO trend_features;
+    CREATE INDEX IF NOT EXISTS idx_features_date_severity
+      ON trend_features(as_of_date, severity);
+
+    -- alerts
+    CREATE TABLE alerts_new (
+      id BIGSERIAL PRIMARY KEY,
+      term_id INT NOT NULL REFERENCES terms(id),
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      severity TEXT NOT NULL,
+      fired_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      slack_channel TEXT,
+      slack_ts TEXT,
+      status TEXT NOT NULL DEFAULT 'new',
+      cooldown_until TIMESTAMPTZ
+    );
+    INSERT INTO alerts_new(term_id, geo_id, severity, fired_at, slack_channel, slack_ts, status, cooldown_until)
+    SELECT t.id, g.id, a.severity, a.fired_at, a.slack_channel, a.slack_ts, a.status, a.cooldown_until
+    FROM alerts a
+    JOIN terms t ON t.term = normalize_term(a.term)
+    JOIN geos g ON g.geo = upper(btrim(a.geo))
+    ORDER BY a.id;
+    DROP TABLE alerts;
+    ALTER TABLE alerts_new RENAME TO alerts;
+    ALTER SEQUENCE alerts_new_id_seq RENAME TO alerts_id_seq;
+    CREATE INDEX IF NOT EXISTS idx_alerts_lookup
+      ON alerts(term_id, geo_id, severity, fired_at DESC);
+
+    -- hourly_snapshot_features
+    CREATE TABLE hourly_snapshot_features_new (
+      snapshot_id BIGINT NOT NULL REFERENCES hourly_snapshots(id) ON DELETE CASCADE,
+      term_id INT NOT NULL REFERENCES terms(id),
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      wow_change DOUBLE PRECISION NOT NULL,
+      z_score DOUBLE PRECISION NOT NULL,
+      slope_7d DOUBLE PRECISION NOT NULL,
+      latest DOUBLE PRECISION NOT NULL,
+      severity TEXT NOT NULL,
+      PRIMARY KEY (snapshot_id, term_id, geo_id)
+    );
+    INSERT INTO hourly_snapshot_features_new(
+      snapshot_id, term_id, geo_id, wow_change, z_score, slope_7d, latest, severity
+    )
+    SELECT h.snapshot_id, t.id, g.id, h.wow_change, h.z_score, h.slope_7d, h.latest, h.severity
+    FROM hourly_snapshot_features h
+    JOIN terms t ON t.term = normalize_term(h.term)
+    JOIN geos g ON g.geo = upper(btrim(h.geo))
+    ON CONFLICT DO NOTHING;
+    DROP TABLE hourly_snapshot_features;
+    ALTER TABLE hourly_snapshot_features_new RENAME TO hourly_snapshot_features;
+    CREATE INDEX IF NOT EXISTS idx_hsf_term_geo
+      ON hourly_snapshot_features(term_id, geo_id);
+    CREATE INDEX IF NOT EXISTS idx_hsf_severity
+      ON hourly_snapshot_features(severity);
+
+    -- discovered_terms
+    CREATE TABLE discovered_terms_new (
+      term_id INT NOT NULL REFERENCES terms(id),
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      source_term TEXT,
+      kind TEXT NOT NULL DEFAULT 'related_queries',
+      rank INT,
+      score DOUBLE PRECISION,
+      first_seen TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      last_seen  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      status TEXT NOT NULL DEFAULT 'new',
+      approved_at TIMESTAMPTZ,
+      PRIMARY KEY (term_id, geo_id)
+    );
+    INSERT INTO discovered_terms_new(
+      term_id, geo_id, source_term, kind, rank, score, first_seen, last_seen, status, approved_at
+    )
+    SELECT t.id, g.id, d.source_term, d.kind, d.rank, d.score, d.first_seen, d.last_seen, d.status, d.approved_at
+    FROM discovered_terms d
+    JOIN terms t ON t.term = normalize_term(d.term)
+    JOIN geos g ON g.geo = upper(btrim(d.geo))
+    ON CONFLICT DO NOTHING;
+    DROP TABLE discovered_terms;
+    ALTER TABLE discovered_terms_new RENAME TO discovered_terms;
+    CREATE INDEX IF NOT EXISTS idx_discovered_status
+      ON discovered_terms(status);
+    CREATE INDEX IF NOT EXISTS idx_discovered_geo
+      ON discovered_terms(geo_id);
+    CREATE INDEX IF NOT EXISTS idx_discovered_last_seen
+      ON discovered_terms(last_seen DESC);
+    """),
+
+    # trend_series / hourly_snapshot_features 월 단위 RANGE 파티셔닝
+    # - 파티션 이름: <parent>_yYYYYmMM
+    # - hourly_snapshot_features는 KST 월 경계(+09) → KST 하루가 두 파티션에 걸치지 않음 (일 단위 compaction 용이)
+    # - 미래 파티션은 ensure_month_partition()으로 생성 (maintain 커맨드 + 쓰기 경로에서 on-demand)
+    (4, "monthly_partitions", """
+    CREATE OR REPLACE FUNCTION ensure_month_partition(parent TEXT, month_start DATE, tz TEXT DEFAULT '+00')
+      RETURNS TEXT
+      LANGUAGE plpgsql
+      AS $$
+    DECLARE
+      m DATE DEFAULT date_trunc('month', month_start)::date;
+      part TEXT DEFAULT parent || '_y' || to_char(m, 'YYYY') || 'm' || to_char(m, 'MM');
+    BEGIN
+      IF to_regclass(part) IS NULL THEN
+        EXECUTE format(
+          'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+          part, parent,
+          to_char(m, 'YYYY-MM-DD') || ' 00:00:00' || tz,
+          to_char((m + INTERVAL '1 month')::date, 'YYYY-MM-DD') || ' 00:00:00' || tz
+        );
+      END IF;
+      RETURN part;
+    END
+    $$;
+
+    -- trend_series
+    ALTER TABLE trend_series RENAME TO trend_series_old;
+    CREATE TABLE trend_series (
+      term_id INT NOT NULL REFERENCES terms(id),
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      date DATE NOT NULL,
+      value DOUBLE PRECISION NOT NULL,
+      source TEXT NOT NULL DEFAULT 'google_trends',
+      collected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      PRIMARY KEY (term_id, geo_id, date)
+    ) PARTITION BY RANGE (date);
+
+    SELECT ensure_month_partition('trend_series', m::date)
+    FROM generate_series(
+      date_trunc('month', COALESCE((SELECT MIN(date) FROM trend_series_old), CURRENT_DATE)),
+      date_trunc('month', CURRENT_DATE) + INTERVAL '3 months',
+      INTERVAL '1 month'
+    ) AS m;
+
+    INSERT INTO trend_series(term_id, geo_id, date, value, source, collected_at)
+    SELECT term_id, geo_id, date, value, source, collected_at FROM trend_series_old;
+    DROP TABLE trend_series_old;
+
+    -- hourly_snapshot_features (+ snapshot_at 비정규화: 파티션 키)
+    ALTER TABLE hourly_snapshot_features RENAME TO hourly_snapshot_features_old;
+    DROP INDEX IF EXISTS idx_hsf_term_geo;
+    DROP INDEX IF EXISTS idx_hsf_severity;
+    CREATE TABLE hourly_snapshot_features (
+      snapshot_id BIGINT NOT NULL REFERENCES hourly_snapshots(id) ON DELETE CASCADE,
+      snapshot_at TIMESTAMPTZ NOT NULL,
+      term_id INT NOT NULL REFERENCES terms(id),
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      wow_change DOUBLE PRECISION NOT NULL,
+      z_score DOUBLE PRECISION NOT NULL,
+      slope_7d DOUBLE PRECISION NOT NULL,
+      latest DOUBLE PRECISION NOT NULL,
+      severity TEXT NOT NULL,
+      PRIMARY KEY (snapshot_id, term_id, geo_id, snapshot_at)
+    ) PARTITION BY RANGE (snapshot_at);
+
+    SELECT ensure_month_partition('hourly_snapshot_features', m::date, '+09')
+    FROM generate_series(
+      date_trunc('month', COALESCE(
+        (SELECT MIN(snapshot_at) AT TIME ZONE 'Asia/Seoul' FROM hourly_snapshots), NOW() AT TIME ZONE 'Asia/Seoul'
+      )),
+      date_trunc('month', NOW() AT TIME ZONE 'Asia/Seoul') + INTERVAL '3 months',
+      INTERVAL '1 month'
+    ) AS m;
+
+    INSERT INTO hourly_snapshot_features(
+      snapshot_id, snapshot_at, term_id, geo_id, wow_change, z_score, slope_7d, latest, severity
+    )
+    SELECT h.snapshot_id, hs.snapshot_at, h.term_id, h.geo_id,
+           h.wow_change, h.z_score, h.slope_7d, h.latest, h.severity
+    FROM hourly_snapshot_features_old h
+    JOIN hourly_snapshots hs ON hs.id = h.snapshot_id;
+    DROP TABLE hourly_snapshot_features_old;
+
+    CREATE INDEX IF NOT EXISTS idx_hsf_term_geo
+      ON hourly_snapshot_features(term_id, geo_id);
+    CREATE INDEX IF NOT EXISTS idx_hsf_severity
+      ON hourly_snapshot_features(severity);
+
+    -- retention으로 지운 hourly 스냅샷의 일 단위 집계 (daily rollup이 소비한 뒤에만 compaction)
+    CREATE TABLE IF NOT EXISTS hourly_snapshot_daily (
+      report_date DATE NOT NULL,
+      term_id INT NOT NULL REFERENCES terms(id),
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      support INT NOT NULL,
+      max_z DOUBLE PRECISION NOT NULL,
+      median_wow DOUBLE PRECISION NOT NULL,
+      median_slope DOUBLE PRECISION NOT NULL,
+      max_latest DOUBLE PRECISION NOT NULL,
+      breakout_hits INT NOT NULL,
+      rising_hits INT NOT NULL,
+      emerging_hits INT NOT NULL,
+      PRIMARY KEY (report_date, term_id, geo_id)
+    );
+    """),
+
+    # 오래된 trend_series 월 파티션 → (term, geo, 월) 1행 real[]로 압축 보관
+    # - vals[i] = start_date + (i-1)일의 값 (빠진 날은 NULL)
+    # - 읽기는 trend_series_all 뷰 (hot + unpack). 같은 날짜가 hot에 있으면 hot 우선
+    (5, "trend_series_packed", """
+    CREATE TABLE IF NOT EXISTS trend_series_packed (
+      term_id INT NOT NULL REFERENCES terms(id),
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      month DATE NOT NULL,
+      start_date DATE NOT NULL,
+      vals REAL[] NOT NULL,
+      source TEXT NOT NULL DEFAULT 'google_trends',
+      collected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      PRIMARY KEY (term_id, geo_id, month)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_series_packed_month
+      ON trend_series_packed(month);
+
+    CREATE OR REPLACE VIEW trend_series_all AS
+      SELECT term_id, geo_id, date, value, source, collected_at
+      FROM trend_series
+      UNION ALL
+      SELECT p.term_id, p.geo_id, (p.start_date + (u.i - 1)::int) AS date,
+             u.v::float8 AS value, p.source, p.collected_at
+      FROM trend_series_packed p
+      CROSS JOIN LATERAL unnest(p.vals) WITH ORDINALITY AS u(v, i)
+      WHERE u.v IS NOT NULL
+        AND NOT EXISTS (
+          SELECT 1 FROM trend_series h
+          WHERE h.term_id = p.term_id
+            AND h.geo_id = p.geo_id
+            AND h.date = p.start_date + (u.i - 1)::int
+        );
+    """),
+
+    # hourly가 끝날 때마다 (KST 날짜, term, geo) 누적 상태를 갱신 → daily는 이 테이블만 읽음
+    # - 하루 최대 24개 샘플이라 wow/slope는 원본 배열을 그대로 보관 (배열 concat으로 병합, 중앙값 정확)
+    # - hourly_snapshots.rolled_up: 이미 반영된 스냅샷 재적용 방지
+    (6, "daily_rollup_state", """
+    ALTER TABLE hourly_snapshots ADD COLUMN IF NOT EXISTS rolled_up BOOLEAN NOT NULL DEFAULT FALSE;
+
+    CREATE TABLE IF NOT EXISTS daily_rollup_state (
+      report_date DATE NOT NULL,
+      term_id INT NOT NULL REFERENCES terms(id),
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      support INT NOT NULL,
+      max_z DOUBLE PRECISION NOT NULL,
+      max_latest DOUBLE PRECISION NOT NULL,
+      breakout_hits INT NOT NULL,
+      rising_hits INT NOT NULL,
+      emerging_hits INT NOT NULL,
+      wow_samples DOUBLE PRECISION[] NOT NULL,
+      slope_samples DOUBLE PRECISION[] NOT NULL,
+      updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      PRIMARY KEY (report_date, term_id, geo_id)
+    );
+
+    INSERT INTO daily_rollup_state(
+      report_date, term_id, geo_id, support, max_z, max_latest,
+      breakout_hits, rising_hits, emerging_hits, wow_samples, slope_samples
+    )
+    SELECT
+      (snapshot_at AT TIME ZONE 'Asia/Seoul')::date, term_id, geo_id,
+      COUNT(*), MAX(z_score), MAX(latest),
+      SUM(CASE WHEN severity='BREAKOUT' THEN 1 ELSE 0 END),
+      SUM(CASE WHEN severity='RISING' THEN 1 ELSE 0 END),
+      SUM(CASE WHEN severity='EMERGING' THEN 1 ELSE 0 END),
+      array_agg(wow_change), array_agg(slope_7d)
+    FROM hourly_snapshot_features
+    GROUP BY 1, 2, 3
+    ON CONFLICT (report_date, term_id, geo_id) DO NOTHING;
+
+    UPDATE hourly_snapshots SET rolled_up = TRUE;
+    """),
+
+    # hourly 스냅샷 content-addressing: feature 행 해시가 직전(같은 KST 날짜) 스냅샷과 같으면
+    # 행을 다시 쓰지 않고 source_snapshot_id로 그 행을 참조. 집계는 참조 시간 수만큼 가중
+    (7, "hourly_snapshot_content_hash", """
+    ALTER TABLE hourly_snapshots ADD COLUMN IF NOT EXISTS content_hash TEXT;
+    ALTER TABLE hourly_snapshots ADD COLUMN IF NOT EXISTS source_snapshot_id BIGINT;
+
+    CREATE INDEX IF NOT EXISTS idx_hourly_snapshots_source
+      ON hourly_snapshots(source_snapshot_id) WHERE source_snapshot_id IS NOT NULL;
+    """),
+
+    # 연속 hourly 스냅샷 차이 (DB 안에서 한 번에 계산해서 저장)
+    # kind: ENTERED(top-K 진입) / EXITED(이탈) / UPGRADED(severity 상승) / Z_JUMP(z 급등)
+    (8, "snapshot_deltas", """
+    CREATE OR REPLACE FUNCTION severity_rank(s TEXT) RETURNS INT
+      LANGUAGE sql IMMUTABLE AS $$
+        SELECT CASE s
+          WHEN 'BREAKOUT' THEN 4
+          WHEN 'RISING' THEN 3
+          WHEN 'EMERGING' THEN 2
+          WHEN 'WATCH' THEN 1
+          ELSE 0
+        END
+      $$;
+
+    CREATE TABLE IF NOT EXISTS snapshot_deltas (
+      snapshot_id BIGINT NOT NULL REFERENCES hourly_snapshots(id) ON DELETE CASCADE,
+      prev_snapshot_id BIGINT NOT NULL,
+      term_id INT NOT NULL REFERENCES terms(id),
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      kind TEXT NOT NULL,
+      severity_from TEXT,
+      severity_to TEXT,
+      z_from DOUBLE PRECISION,
+      z_to DOUBLE PRECISION,
+      created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      PRIMARY KEY (snapshot_id, term_id, geo_id, kind)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_snapshot_deltas_kind
+      ON snapshot_deltas(kind, created_at DESC);
+    """),
+
+    # 수집 작업 큐: (geo, term 배치) 단위. 워커들이 SKIP LOCKED로 lease를 잡고 heartbeat로 연장
+    # lease가 만료되면(워커 사망) 다른 워커가 다시 가져감
+    (9, "work_units", """
+    CREATE TABLE IF NOT EXISTS work_units (
+      id BIGSERIAL PRIMARY KEY,
+      run_date DATE NOT NULL,
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      batch_no INT NOT NULL,
+      terms TEXT[] NOT NULL,
+      timeframe TEXT NOT NULL,
+      status TEXT NOT NULL DEFAULT 'queued',
+      attempts INT NOT NULL DEFAULT 0,
+      lease_owner TEXT,
+      lease_expires_at TIMESTAMPTZ,
+      result_json JSONB,
+      error TEXT,
+      enqueued_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      finished_at TIMESTAMPTZ,
+      UNIQUE (run_date, geo_id, batch_no)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_work_units_claim
+      ON work_units(id) WHERE status IN ('queued', 'leased');
+    """),
+
+    # 커맨드/잡 실행별 stage 시간·호출·에러 + counter (kind: run / stage / counter)
+    (10, "run_metrics", """
+    CREATE TABLE IF NOT EXISTS run_metrics (
+      run_id TEXT NOT NULL,
+      command TEXT NOT NULL,
+      started_at TIMESTAMPTZ NOT NULL,
+      finished_at TIMESTAMPTZ,
+      ok BOOLEAN NOT NULL,
+      kind TEXT NOT NULL,
+      name TEXT NOT NULL,
+      seconds DOUBLE PRECISION,
+      calls INT,
+      errors INT,
+      value DOUBLE PRECISION,
+      PRIMARY KEY (run_id, kind, name)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_run_metrics_command
+      ON run_metrics(command, started_at DESC);
+    """),
+    # 대시보드 요약용 (as_of_date, geo, severity)별 feature 수. trend_features 쓰기 시 statement trigger로 갱신
+    # (upsert 문장 하나마다 INSERT/UPDATE 트리거가 transition table로 한 번씩 → upsert_features는 배치를
+    #  unnest INSERT 1문장으로 보내서 배치 크기와 무관하게 트리거 문장 1~2개. executemany면 행마다 발동)
+    (11, "feature_day_stats", """
+    CREATE TABLE IF NOT EXISTS feature_day_stats (
+      as_of_date DATE NOT NULL,
+      geo_id SMALLINT NOT NULL REFERENCES geos(id),
+      severity TEXT NOT NULL,
+      n INT NOT NULL DEFAULT 0,
+      PRIMARY KEY (as_of_date, geo_id, severity)
+    );
+
+    CREATE OR REPLACE FUNCTION feature_day_stats_apply() RETURNS trigger
+      LANGUAGE plpgsql AS $$
+      BEGIN
+        IF TG_OP = 'INSERT' THEN
+          INSERT INTO feature_day_stats AS s (as_of_date, geo_id, severity, n)
+          SELECT as_of_date, geo_id, COALESCE(severity, 'NONE'), COUNT(*)
+          FROM new_rows
+          GROUP BY 1, 2, 3
+          ORDER BY 1, 2, 3
+          ON CONFLICT (as_of_date, geo_id, severity) DO UPDATE SET n = s.n + EXCLUDED.n;
+        ELSIF TG_OP = 'UPDATE' THEN
+          INSERT INTO feature_day_stats AS s (as_of_date, geo_id, severity, n)
+          SELECT as_of_date, geo_id, sev, SUM(d)
+          FROM (
+            SELECT as_of_date, geo_id, COALESCE(severity, 'NONE') AS sev, -1 AS d FROM old_rows
+            UNION ALL
+            SELECT as_of_date, geo_id, COALESCE(severity, 'NONE') AS sev, 1 AS d FROM new_rows
+          ) x
+          GROUP BY 1, 2, 3
+          HAVING SUM(d) <> 0
+          ORDER BY 1, 2, 3
+          ON CONFLICT (as_of_date, geo_id, severity) DO UPDATE SET n = s.n + EXCLUDED.n;
+        ELSE
+          UPDATE feature_day_stats s
+          SET n = s.n - o.cnt
+          FROM (
+            SELECT as_of_date, geo_id, COALESCE(severity, 'NONE') AS sev, COUNT(*) AS cnt
+            FROM old_rows
+            GROUP BY 1, 2, 3
+          ) o
+          WHERE s.as_of_date = o.as_of_date AND s.geo_id = o.geo_id AND s.severity = o.sev;
+        END IF;
+        RETURN NULL;
+      END
+      $$;
+
+    DROP TRIGGER IF EXISTS trg_feature_day_stats_ins ON trend_features;
+    CREATE TRIGGER trg_feature_day_stats_ins AFTER INSERT ON trend_features
+      REFERENCING NEW TABLE AS new_rows
+      FOR EACH STATEMENT EXECUTE FUNCTION feature_day_stats_apply();
+    DROP TRIGGER IF EXISTS trg_feature_day_stats_upd ON trend_features;
+    CREATE TRIGGER trg_feature_day_stats_upd AFTER UPDATE ON trend_features
+      REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+      FOR EACH STATEMENT EXECUTE FUNCTION feature_day_stats_apply();
+    DROP TRIGGER IF EXISTS trg_feature_day_stats_del ON trend_features;
+    CREATE TRIGGER trg_feature_day_stats_del AFTER DELETE ON trend_features
+      REFERENCING OLD TABLE AS old_rows
+      FOR EACH STATEMENT EXECUTE FUNCTION feature_day_stats_apply();
+
+    -- 기존 행 (트리거 생성으로 trend_features 쓰기가 잠긴 같은 트랜잭션 안에서)
+    DELETE FROM feature_day_stats;
+    INSERT INTO feature_day_stats(as_of_date, geo_id, severity, n)
+    SELECT as_of_date, geo_id, COALESCE(severity, 'NONE'), COUNT(*)
+    FROM trend_features
+    GROUP BY 1, 2, 3;
+    """),
+    # 데이터 버전: 파이프라인이 trend_series/trend_features 커밋 후 +1 → dashboard 캐시 key에 포함
+    (12, "data_version", """
+    CREATE TABLE IF NOT EXISTS data_version (
+      id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+      version BIGINT NOT NULL DEFAULT 0,
+      reason TEXT,
+      bumped_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    INSERT INTO data_version(id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+    """),
+    # dashboard 검색/페이지네이션
+    # - terms: 부분 일치(LIKE '%q%')는 trigram GIN, 자동완성 접두어(LIKE 'q%')는 text_pattern_ops btree
+    # - trend_features: trends keyset 정렬 key (정렬 컬럼 + PK 나머지)와 같은 순서의 btree
+    (13, "term_search_keyset", """
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    CREATE INDEX IF NOT EXISTS terms_term_trgm_idx ON terms USING gin (term gin_trgm_ops);
+    CREATE INDEX IF NOT EXISTS terms_term_prefix_idx ON terms (term text_pattern_ops);
+
+    CREATE INDEX IF NOT EXISTS trend_features_date_key_idx
+      ON trend_features(as_of_date, term_id, geo_id);
+    CREATE INDEX IF NOT EXISTS trend_features_z_key_idx
+      ON trend_features(z_score, term_id, geo_id, as_of_date);
+    CREATE INDEX IF NOT EXISTS trend_features_wow_key_idx
+      ON trend_features(wow_change, term_id, geo_id, as_of_date);
+    """),
+    # daily_rollup_state 샘플 가중치: 같은 source 스냅샷을 참조한 시간 수만큼 값을 반복 저장하지 않고
+    # (값, source 스냅샷 id, 가중치=시간 수)로 → 중앙값은 가중치만큼 펼쳐 계산 (top 행만)
+    # 기존 행은 이미 값이 시간 수만큼 반복돼 있으므로 가중치 1, source id 0(모름)
+    (14, "daily_rollup_state_weights", """
+    ALTER TABLE daily_rollup_state
+      ADD COLUMN IF NOT EXISTS sample_sids BIGINT[],
+      ADD COLUMN IF NOT EXISTS sample_weights INT[];
+    UPDATE daily_rollup_state
+    SET sample_sids = array_fill(CAST(0 AS BIGINT), ARRAY[cardinality(wow_samples)]),
+        sample_weights = array_fill(1, ARRAY[cardinality(wow_samples)])
+    WHERE sample_weights IS NULL;
+    ALTER TABLE daily_rollup_state
+      ALTER COLUMN sample_sids SET NOT NULL,
+      ALTER COLUMN sample_weights SET NOT NULL;
+    """),
+    # feature_day_stats: UPDATE(severity 변경)/DELETE로 0이 된 집계 행은 트리거가 같은 문장에서 바로 지움
+    # (migration 11 함수 교체, 트리거는 그대로)
+    (15, "feature_day_stats_prune", """
+    CREATE OR REPLACE FUNCTION feature_day_stats_apply() RETURNS trigger
+      LANGUAGE plpgsql AS $$
+      BEGIN
+        IF TG_OP = 'INSERT' THEN
+          INSERT INTO feature_day_stats AS s (as_of_date, geo_id, severity, n)
+          SELECT as_of_date, geo_id, COALESCE(severity, 'NONE'), COUNT(*)
+          FROM new_rows
+          GROUP BY 1, 2, 3
+          ORDER BY 1, 2, 3
+          ON CONFLICT (as_of_date, geo_id, severity) DO UPDATE SET n = s.n + EXCLUDED.n;
+          RETURN NULL;
+        ELSIF TG_OP = 'UPDATE' THEN
+          INSERT INTO feature_day_stats AS s (as_of_date, geo_id, severity, n)
+          SELECT as_of_date, geo_id, sev, SUM(d)
+          FROM (
+            SELECT as_of_date, geo_id, COALESCE(severity, 'NONE') AS sev, -1 AS d FROM old_rows
+            UNION ALL
+            SELECT as_of_date, geo_id, COALESCE(severity, 'NONE') AS sev, 1 AS d FROM new_rows
+          ) x
+          GROUP BY 1, 2, 3
+          HAVING SUM(d) <> 0
+          ORDER BY 1, 2, 3
+          ON CONFLICT (as_of_date, geo_id, severity) DO UPDATE SET n = s.n + EXCLUDED.n;
+        ELSE
+          UPDATE feature_day_stats s
+          SET n = s.n - o.cnt
+          FROM (
+            SELECT as_of_date, geo_id, COALESCE(severity, 'NONE') AS sev, COUNT(*) AS cnt
+            FROM old_rows
+            GROUP BY 1, 2, 3
+          ) o
+          WHERE s.as_of_date = o.as_of_date AND s.geo_id = o.geo_id AND s.severity = o.sev;
+        END IF;
+
+        -- 줄어든 key(old_rows)만 확인해서 0 이하가 된 행 삭제
+        DELETE FROM feature_day_stats s
+        USING (SELECT DISTINCT as_of_date, geo_id, COALESCE(severity, 'NONE') AS sev FROM old_rows) o
+        WHERE s.as_of_date = o.as_of_date AND s.geo_id = o.geo_id AND s.severity = o.sev
+          AND s.n <= 0;
+        RETURN NULL;
+      END
+      $$;
+
+    DELETE FROM feature_day_stats WHERE n <= 0;
+    """),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
@@ -0,0 +1,272 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# ✅ 모든 CLI 공통 --profile cpu|mem (코드 수정 없이 실제 워크로드에서 진단)
+# cpu: cProfile → .pstats + collapsed stack(.folded, flamegraph.pl / speedscope / inferno 입력)
+# mem: tracemalloc → 할당 위치 top-N + metrics.stage 구간별 peak
+# stdlib만 사용 (metrics.stage가 import해도 기동 비용 없음), 꺼져 있으면 stage 훅은 no-op
+
+MODES = ("cpu", "mem")
+
+# collapsed stack 재구성: 너무 깊거나 작은 경로는 잘라냄
+_MAX_DEPTH = 64
+_MIN_SEC = 1e-4
+
+
+def add_argument(parser: argparse.ArgumentParser, default: Any = None):
+    parser.add_argument("--profile", choices=MODES, default=default,
+                        help="cpu: cProfile pstats + collapsed stacks, mem: tracemalloc top-N + per-stage peak "
+                             "(written to PROFILE_DIR, default logs/profiles)")
+
+
+# ---------------------------
+# MEM: stage별 peak (metrics.stage 훅)
+# ---------------------------
+@dataclass
+class MemStat:
+    calls: int = 0
+    peak: int = 0   # 구간 중 최대 traced 메모리 (프로세스 전체 기준)
+    net: int = 0    # 구간 종료 - 시작 (누적)
+
+
+_mem_stats: Dict[str, MemStat] = {}
+_mem_lock = threading.Lock()
+_mem_on = False
+_local = threading.local()
+# top-N 대상: 끝나는 시점에 살아 있는 메모리가 가장 컸던 stage 경계의 snapshot
+# (명령 종료 시점에는 대부분 해제돼서 top-N이 비어 보임)
+_mem_snap: Optional[tracemalloc.Snapshot] = None
+_mem_snap_at: Tuple[str, int] = ("", 0)
+
+
+def _frames() -> List[List[Any]]:
+    st = getattr(_local, "stack", None)
+    if st is None:
+        st = _local.stack = []
+    return st
+
+
+@contextmanager
+def mem_stage(name: str) -> Iterator[None]:
+    """
+    구간 peak 측정. reset_peak()를 쓰므로 바깥 구간의 peak는 스택에 보관했다가 합침
+    (tracemalloc은 프로세스 전역 → serve처럼 스레드가 겹치면 peak은 겹친 구간 전체 기준)
+    """
+    if not _mem_on or not tracemalloc.is_tracing():
+        yield
+        return
+    stack = _frames()
+    start, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1][1] = max(stack[-1][1], peak)
+    tracemalloc.reset_peak()
+    frame = [name, start]
+    stack.append(frame)
+    try:
+        yield
+    finally:
+        end, peak = tracemalloc.get_traced_memory()
+        frame[1] = max(frame[1], peak)
+        stack.pop()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], frame[1])
+        with _mem_lock:
+            ms = _mem_stats.setdefault(name, MemStat())
+            ms.calls += 1
+            ms.peak = max(ms.peak, frame[1])
+            ms.net += end - start
+        _maybe_snapshot(name, end)
+
+
+def _maybe_snapshot(name: str, live: int):
+    global _mem_snap, _mem_snap_at
+    if live <= _mem_snap_at[1]:
+        return
+    snap = tracemalloc.take_snapshot()
+    with _mem_lock:
+        if live > _mem_snap_at[1]:
+            _mem_snap, _mem_snap_at = snap, (name, live)
+
+
+def _mb(n: int) -> float:
+    return round(n / (1024 * 1024), 2)
+
+
+def _mem_report(command: str, out_dir: str, top: int, peak: int) -> str:
+    with _mem_lock:
+        snap, (snap_stage, snap_live) = _mem_snap, _mem_snap_at
+    snap = (snap or tracemalloc.take_snapshot()).filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ])
+    lines = snap.statistics("lineno")[:top]
+    with _mem_lock:
+        stages = sorted(_mem_stats.items(), key=lambda kv: -kv[1].peak)
+
+    print(f"[profile] mem peak {_mb(peak):.1f} MB", file=sys.stderr)
+    for name, ms in stages:
+        print(f"[profile]   stage {name:<24} peak {_mb(ms.peak):8.1f} MB  net {_mb(ms.net):+8.1f} MB  calls {ms.calls}",
+              file=sys.stderr)
+    print(f"[profile]   top allocations live at end of stage {snap_stage!r} ({_mb(snap_live):.1f} MB)",
+          file=sys.stderr)
+    for i, st in enumerate(lines[:10], 1):
+        fr = st.traceback[0]
+        print(f"[profile]   {i:>2}. {_mb(st.size):8.2f} MB  n={st.count:<8} {fr.filename}:{fr.lineno}", file=sys.stderr)
+
+    path = _out_path(out_dir, "mem", command, "json")
+    payload = {
+        "command": command,
+        "peak_mb": _mb(peak),
+        "top_at_stage": snap_stage,
+        "top_at_live_mb": _mb(snap_live),
+        "stages": [{"stage": name, "calls": ms.calls, "peak_mb": _mb(ms.peak), "net_mb": _mb(ms.net)}
+                   for name, ms in stages],
+        "top": [{
+            "rank": i,
+            "file": st.traceback[0].filename,
+            "line": st.traceback[0].lineno,
+            "size_mb": _mb(st.size),
+            "count": st.count,
+        } for i, st in enumerate(lines, 1)],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    return path
+
+
+# ---------------------------
+# CPU: pstats + collapsed stacks
+# ---------------------------
+Func = Tuple[str, int, str]
+
+
+def _label(f: Func) -> str:
+    filename, lineno, name = f
+    if filename == "~":
+        s = name  # <built-in method ...>
+    else:
+        s = f"{name} ({os.path.basename(filename)}:{lineno})"
+    return s.replace(";", ",").replace("\n", " ")
+
+
+def collapsed_stacks(stats) -> Dict[str, float]:
+    """
+    pstats(호출자→피호출자 간선만 있음)에서 root부터 내려가며 stack별 self time(초) 근사
+    - 자식 g의 시간은 간선 f→g의 cumtime 비율로 현재 경로에 배분 (gprof 방식)
+    - 재귀(경로에 이미 있는 함수)와 _MIN_SEC 미만 경로는 생략
+    """
+    st = stats.stats  # func -> (cc, nc, tt, ct, callers{caller: (cc, nc, tt, ct)})
+    children: Dict[Func, List[Func]] = {}
+    for f, v in st.items():
+        for c in v[4]:
+            children.setdefault(c, []).append(f)
+    roots = [f for f, v in st.items() if not v[4]]
+    out: Dict[str, float] = {}
+
+    def walk(f: Func, path: Tuple[str, ...], scale: float, seen: frozenset):
+        key = path + (_label(f),)
+        own = st[f][2] * scale
+        if own > 0:
+            k = ";".join(key)
+            out[k] = out.get(k, 0.0) + own
+        if len(key) >= _MAX_DEPTH:
+            return
+        for g in children.get(f, ()):
+            if g in seen:
+                continue
+            g_ct = st[g][3]
+            edge = st[g][4].get(f)
+            if not edge or g_ct <= 0:
+                continue
+            s = scale * edge[3] / g_ct
+            if s * g_ct < _MIN_SEC:
+                continue
+            walk(g, key, s, seen | {g})
+
+    for r in roots:
+        walk(r, (), 1.0, frozenset([r]))
+    return out
+
+
+def _cpu_report(command: str, out_dir: str, top: int, prof) -> Tuple[str, str]:
+    import pstats
+
+    path = _out_path(out_dir, "cpu", command, "pstats")
+    prof.dump_stats(path)
+
+    stats = pstats.Stats(path)
+    folded = path[: -len(".pstats")] + ".folded"
+    with open(folded, "w", encoding="utf-8") as f:
+        for stack, sec in sorted(collapsed_stacks(stats).items()):
+            us = int(round(sec * 1e6))
+            if us > 0:
+                f.write(f"{stack} {us}\n")
+
+    print(f"[profile] cpu top {top} by cumulative time", file=sys.stderr)
+    stats.stream = sys.stderr
+    stats.sort_stats("cumulative").print_stats(top)
+    return path, folded
+
+
+def _out_path(out_dir: str, mode: str, command: str, ext: str) -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return os.path.join(out_dir, f"{mode}_{command}_{ts}_{os.getpid()}.{ext}")
+
+
+@contextmanager
+def profiled(mode: Optional[str], command: str, out_dir: str = "", top: int = 25) -> Iterator[None]:
+    """
+    mode None이면 아무것도 안 함. 끝나면(에러여도) 리포트 파일 경로를 stderr에 출력
+    """
+    global _mem_on, _mem_snap, _mem_snap_at
+    if not mode:
+        yield
+        return
+    if mode not in MODES:
+        raise ValueError(f"unknown profile mode: {mode}")
+    out_dir = out_dir or "logs/profiles"
+
+    if mode == "cpu":
+        import cProfile
+
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            path, folded = _cpu_report(command, out_dir, top, prof)
+            print(f"[profile] pstats: {path}\n[profile] collapsed: {folded}", file=sys.stderr)
+        return
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(1)
+    with _mem_lock:
+        _mem_stats.clear()
+        _mem_snap, _mem_snap_at = None, ("", 0)
+    _mem_on = True
+    try:
+        with mem_stage(command):
+            yield
+    finally:
+        _mem_on = False
+        _, peak = tracemalloc.get_traced_memory()
+        with _mem_lock:
+            peak = max(peak, _mem_stats[command].peak if command in _mem_stats else 0)
+        path = _mem_report(command, out_dir, top, peak)
+        if started:
+            tracemalloc.stop()
+        print(f"[profile] mem report: {path}", file=sys.stderr)
@@ -7,7 +7,11 @@ from typing import Dict, Any, List, Tuple
 import yaml
 from sqlalchemy import text
 
-from app.db import engine, init_schema
+from app import profiling
+from app.config import settings
+from app.db import get_engine, check_schema
+from app.terms import normalize_term
+from app.storage_pg import resolve_term_ids, term_names
 
 
 def load_seeds(path: str) -> Dict[str, Any]:
@@ -20,11 +24,6 @@ def dump_seeds(path: str, data: Dict[str, Any]) -> None:
         yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
 
 
-def normalize_term(t: str) -> str:
-    # "겹치지 않게"를 좀 더 강하게: 공백 정리 + 소문자
-    return " ".join(t.strip().lower().split())
-
-
 def existing_seed_terms(cfg: Dict[str, Any]) -> Tuple[List[str], set]:
     seed_groups = cfg.get("seed_groups", {}) or {}
     all_terms: List[str] = []
@@ -41,34 +40,38 @@ def existing_seed_terms(cfg: Dict[str, Any]) -> Tuple[List[str], set]:
 def fetch_top_new(limit: int = 20) -> List[str]:
     q = text("""
       SELECT
-        term,
-        COUNT(DISTINCT geo) AS geo_cnt,
+        term_id,
+        COUNT(DISTINCT geo_id) AS geo_cnt,
         MAX(score) AS max_score,
         MAX(last_seen) AS last_seen
       FROM discovered_terms
       WHERE status='new'
-      GROUP BY term
+      GROUP BY term_id
       ORDER BY geo_cnt DESC, max_score DESC, last_seen DESC
       LIMIT :limit;
     """)
-    with engine.begin() as conn:
+    with get_engine().begin() as conn:
         rows = conn.execute(q, {"limit": limit}).fetchall()
 
-    # rows: (term, geo_cnt, max_score, last_seen)
-    return [r[0] for r in rows]
+    # rows: (term_id, geo_cnt, max_score, last_seen)
+    names = term_names(r[0] for r in rows)
+    return [names[r[0]] for r in rows if r[0] in names]
 
 
 def mark_approved(terms: List[str]) -> int:
     if not terms:
         return 0
+    ids = list(set(resolve_term_ids(terms, create=False).values()))
+    if not ids:
+        return 0
     q = text("""
       UPDATE discovered_terms
       SET status='approved',
           approved_at = COALESCE(approved_at, NOW())
-      WHERE status='new' AND term = ANY(:terms);
+      WHERE status='new' AND term_id = ANY(:ids);
     """)
-    with engine.begin() as conn:
-        res = conn.execute(q, {"terms": terms})
+    with get_engine().begin() as conn:
+        res = conn.execute(q, {"ids": ids})
     return res.rowcount or 0
 
 
@@ -81,46 +84,48 @@ def main():
     parser.add_argument("--limit", type=int, default=20, help="Top N discovered terms to consider")
     parser.add_argument("--group", default="discovered_auto", help="seed_groups key to append into")
     parser.add_argument("--approve", action="store_true", help="Also mark promoted terms as approved in DB")
+    profiling.add_argument(parser)
     args = parser.parse_args()
 
-    init_schema()
+    with profiling.profiled(args.profile, "promote_seeds", settings.profile_dir, settings.profile_top):
+        check_schema()
 
-    cfg = load_seeds(args.seeds)
-    cfg.setdefault("seed_groups", {})
-    cfg["seed_groups"].setdefault(args.group, [])
+        cfg = load_seeds(args.seeds)
+        cfg.setdefault("seed_groups", {})
+        cfg["seed_groups"].setdefault(args.group, [])
 
-    _, existing_norm = existing_seed_terms(cfg)
+        _, existing_norm = existing_seed_terms(cfg)
 
-    # TOP N 가져오기
-    top_terms = fetch_top_new(limit=args.limit)
+        # TOP N 가져오기
+        top_terms = fetch_top_new(limit=args.limit)
 
-    # TOP N 내부 중복 제거 + seeds 중복 제거
-    promoted: List[str] = []
-    seen_norm = set(existing_norm)
+        # TOP N 내부 중복 제거 + seeds 중복 제거
+        promoted: List[str] = []
+        seen_norm = set(existing_norm)
 
-    for t in top_terms:
-        nt = normalize_term(t)
-        if nt in seen_norm:
-            continue
-        seen_norm.add(nt)
-        promoted.append(t)
+        for t in top_terms:
+            nt = normalize_term(t)
+            if nt in seen_norm:
+                continue
+            seen_norm.add(nt)
+            promoted.append(t)
 
-    if not promoted:
-        print("No new unique terms to promote (all overlapped with existing seeds).")
-        return
+        if not promoted:
+            print("No new unique terms to promote (all overlapped with existing seeds).")
+            return
 
-    # seeds.yaml에 추가
-    cfg["seed_groups"][args.group].extend(promoted)
-    dump_seeds(args.seeds, cfg)
+        # seeds.yaml에 추가
+        cfg["seed_groups"][args.group].extend(promoted)
+        dump_seeds(args.seeds, cfg)
 
-    print(f"Promoted {len(promoted)} terms into seed_groups.{args.group} in {args.seeds}")
-    for t in promoted:
-        print(f" - {t}")
+        print(f"Promoted {len(promoted)} terms into seed_groups.{args.group} in {args.seeds}")
+        for t in promoted:
+            print(f" - {t}")
 
-    # (선택) DB에서도 approved로 승급
-    if args.approve:
-        n = mark_approved(promoted)
-        print(f"DB approved updated rows: {n}")
+        # (선택) DB에서도 approved로 승급
+        if args.approve:
+            n = mark_approved(promoted)
+            print(f"DB approved updated rows: {n}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+from __future__ import annotations
+import threading
+import traceback
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+KST = timezone(timedelta(hours=9))
+
+
+# ---------------------------
+# SCHEDULES: now(KST) → 다음 실행 시각
+# ---------------------------
+def every_minutes(n: int) -> Callable[[datetime], datetime]:
+    def _next(now: datetime) -> datetime:
+        base = now.replace(second=0, microsecond=0)
+        return base + timedelta(minutes=n - base.minute % n)
+    return _next
+
+
+def hourly_at(minute: int = 0) -> Callable[[datetime], datetime]:
+    def _next(now: datetime) -> datetime:
+        due = now.replace(minute=minute, second=0, microsecond=0)
+        return due if due > now else due + timedelta(hours=1)
+    return _next
+
+
+def daily_at(hhmm: str) -> Callable[[datetime], datetime]:
+    """
+    hhmm: 'HH:MM' (KST). 콤마로 여러 개 가능: '09:00,21:00'
+    """
+    times = [tuple(int(x) for x in t.strip().split(":")) for t in hhmm.split(",") if t.strip()]
+
+    def _next(now: datetime) -> datetime:
+        cands = []
+        for h, m in times:
+            due = now.replace(hour=h, minute=m, second=0, microsecond=0)
+            cands.append(due if due > now else due + timedelta(days=1))
+        return min(cands)
+    return _next
+
+
+@dataclass
+class Job:
+    name: str
+    fn: Callable[[], None]
+    schedule: Callable[[datetime], datetime]
+    due: Optional[datetime] = None
+    thread: Optional[threading.Thread] = None
+    runs: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class Scheduler:
+    """
+    한 프로세스 안에서 잡을 시각에 맞춰 스레드로 실행
+    - 같은 잡이 아직 돌고 있으면 이번 회차는 건너뜀 (중복 실행 X)
+    - stop()이 불리면 새 잡은 시작하지 않고, 돌고 있는 잡은 끝날 때까지 기다림
+    - wrap: 잡 실행을 감쌀 함수 (advisory lock, 로그 등)
+    """
+    jobs: List[Job] = field(default_factory=list)
+    wrap: Optional[Callable[[Job], None]] = None
+    _stop: threading.Event = field(default_factory=threading.Event)
+
+    def add(self, name: str, fn: Callable[[], None], schedule: Callable[[datetime], datetime]):
+        self.jobs.append(Job(name=name, fn=fn, schedule=schedule))
+
+    def stop(self, *_):
+        self._stop.set()
+
+    def _start(self, job: Job):
+        if job.thread is not None and job.thread.is_alive():
+            job.skipped += 1
+            print(f"[serve] {job.name}: previous run still in progress, skipping", flush=True)
+            return
+        job.runs += 1
+        job.thread = threading.Thread(target=self._run_job, args=(job,), name=f"job-{job.name}", daemon=True)
+        job.thread.start()
+
+    def _run_job(self, job: Job):
+        t0 = time.perf_counter()
+        try:
+            if self.wrap is not None:
+                self.wrap(job)
+            else:
+                job.fn()
+        except Exception:
+            print(f"[serve] {job.name} failed:\n{traceback.format_exc()}", flush=True)
+        finally:
+            print(f"[serve] {job.name} done in {(time.perf_counter() - t0) * 1000:.0f} ms", flush=True)
+
+    def run_forever(self, shutdown_timeout: float = 600.0):
+        now = datetime.now(KST)
+        for job in self.jobs:
+            job.due = job.schedule(now)
+            print(f"[serve] {job.name}: next at {job.due.isoformat()}", flush=True)
+
+        while not self._stop.is_set():
+            now = datetime.now(KST)
+            for job in self.jobs:
+                if now >= job.due:
+                    self._start(job)
+                    job.due = job.schedule(now)
+            wait = min(j.due for j in self.jobs) - datetime.now(KST)
+            self._stop.wait(max(0.0, min(wait.total_seconds(), 60.0)))
+
+        print("[serve] stopping: waiting for running jobs", flush=True)
+        deadline = time.monotonic() + shutdown_timeout
+        for job in self.jobs:
+            if job.thread is not None and job.thread.is_alive():
+                job.thread.join(max(0.0, deadline - time.monotonic()))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {j.name: {"runs": j.runs, "skipped": j.skipped} for j in self.jobs}
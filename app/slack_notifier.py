@@ -1,12 +1,41 @@
 from __future__ import annotations
+import time
 import requests
 from typing import Dict, Any, List, Optional
 
+from app import metrics
+from app.config import settings
+
+
+def _retry_after(r: requests.Response) -> float:
+    try:
+        sec = float(r.headers.get("Retry-After", "1"))
+    except ValueError:
+        sec = 1.0
+    return min(max(sec, 0.0), settings.slack_retry_after_max)
+
+
 def post_webhook(webhook_url: str, payload: Dict[str, Any]) -> None:
+    """
+    429면 Retry-After만큼 쉬고 SLACK_MAX_RETRIES번까지 재시도 (그 외 에러는 바로 raise)
+    """
     if not webhook_url:
         raise RuntimeError("SLACK_WEBHOOK_URL is empty.")
-    r = requests.post(webhook_url, json=payload, timeout=15)
-    r.raise_for_status()
+    with metrics.stage("slack_send") as sp:
+        sp.set(channel=str(payload.get("channel", "")))
+        attempt = 0
+        while True:
+            r = requests.post(webhook_url, json=payload, timeout=15)
+            if r.status_code != 429 or attempt >= settings.slack_max_retries:
+                break
+            wait = _retry_after(r)
+            metrics.inc("slack_429")
+            metrics.inc("slack_retry_sleep_seconds", wait)
+            attempt += 1
+            time.sleep(wait)
+        sp.set(status=r.status_code, attempts=attempt + 1)
+        r.raise_for_status()
+    metrics.inc("slack_messages")
 
 def _sev_meta(severity: str) -> Dict[str, str]:
     # EMERGING 추가 + 기본 문구
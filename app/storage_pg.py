@@ -1,11 +1,136 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from typing import Iterable, Tuple, List, Dict, Any, Optional
+import re
+import sys
 from sqlalchemy import text
-from app.db import engine
+from sqlalchemy.exc import IntegrityError
+from app.db import get_engine
+from app.terms import normalize_term, normalize_geo
+import hashlib
 import json
 
 
+# ---------------------------
+# TERM / GEO DICTIONARY
+# ---------------------------
+# 팩트 테이블은 term_id/geo_id(int)만 저장 → 이름 <-> id는 여기 캐시를 통해서만 변환
+# 사전 행은 삭제/변경되지 않으므로 한 번 본 매핑은 프로세스 끝까지 유효 (miss만 DB 조회)
+_term_ids: Dict[str, int] = {}
+_term_names: Dict[int, str] = {}
+_geo_ids: Dict[str, int] = {}
+_geo_names: Dict[int, str] = {}
+
+
+def resolve_term_ids(terms: Iterable[str], create: bool = True) -> Dict[str, int]:
+    """
+    term(원문) -> terms.id  (canonical = normalize_term 기준)
+    create=False면 사전에 없는 term은 결과에서 빠짐 (조회 전용 경로에서 사전 오염 방지)
+    """
+    canon = {t: normalize_term(t) for t in terms}
+    missing = sorted({c for c in canon.values() if c and c not in _term_ids})
+    if missing:
+        with get_engine().begin() as conn:
+            if create:
+                conn.execute(text("""
+                  INSERT INTO terms(term)
+                  SELECT unnest(CAST(:names AS text[]))
+                  ON CONFLICT (term) DO NOTHING;
+                """), {"names": missing})
+            rows = conn.execute(
+                text("SELECT id, term FROM terms WHERE term = ANY(:names);"), {"names": missing}
+            ).fetchall()
+        for r in rows:
+            _term_ids[r[1]] = int(r[0])
+            _term_names[int(r[0])] = r[1]
+    return {t: _term_ids[c] for t, c in canon.items() if c in _term_ids}
+
+
+def resolve_geo_ids(geos: Iterable[str], create: bool = True) -> Dict[str, int]:
+    """
+    geo(원문) -> geos.id  (canonical = 대문자)
+    """
+    canon = {g: normalize_geo(g) for g in geos}
+    missing = sorted({c for c in canon.values() if c and c not in _geo_ids})
+    if missing:
+        with get_engine().begin() as conn:
+            if create:
+                conn.execute(text("""
+                  INSERT INTO geos(geo)
+                  SELECT unnest(CAST(:names AS text[]))
+                  ON CONFLICT (geo) DO NOTHING;
+                """), {"names": missing})
+            rows = conn.execute(
+                text("SELECT id, geo FROM geos WHERE geo = ANY(:names);"), {"names": missing}
+            ).fetchall()
+        for r in rows:
+            _geo_ids[r[1]] = int(r[0])
+            _geo_names[int(r[0])] = r[1]
+    return {g: _geo_ids[c] for g, c in canon.items() if c in _geo_ids}
+
+
+def _skip_unresolved(rows: list, tids: Dict[str, int], gids: Dict[str, int], key, what: str) -> list:
+    """
+    정규화하면 비는 term/geo(공백 등)는 사전에 못 넣어 id가 없음 → 그 행만 건너뛰고 로그 (배치 전체를 KeyError로 죽이지 않음)
+    key(row) -> (term, geo). geo만 보는 곳은 term 자리에 None
+    """
+    kept = [r for r in rows if (key(r)[0] is None or key(r)[0] in tids) and key(r)[1] in gids]
+    if len(kept) != len(rows):
+        print(f"[storage] {what}: skipped {len(rows) - len(kept)} row(s) with blank term/geo", file=sys.stderr)
+    return kept
+
+
+def term_names(ids: Iterable[int]) -> Dict[int, str]:
+    ids = {int(i) for i in ids}
+    missing = sorted(i for i in ids if i not in _term_names)
+    if missing:
+        with get_engine().begin() as conn:
+            rows = conn.execute(
+                text("SELECT id, term FROM terms WHERE id = ANY(:ids);"), {"ids": missing}
+            ).fetchall()
+        for r in rows:
+            _term_ids[r[1]] = int(r[0])
+            _term_names[int(r[0])] = r[1]
+    return {i: _term_names[i] for i in ids if i in _term_names}
+
+
+def geo_names(ids: Iterable[int]) -> Dict[int, str]:
+    ids = {int(i) for i in ids}
+    if any(i not in _geo_names for i in ids):
+        # geos는 수십 행 → miss가 나면 통째로 로드
+        with get_engine().begin() as conn:
+            rows = conn.execute(text("SELECT id, geo FROM geos;")).fetchall()
+        for r in rows:
+            _geo_ids[r[1]] = int(r[0])
+            _geo_names[int(r[0])] = r[1]
+    return {i: _geo_names[i] for i in ids if i in _geo_names}
+
+
+def _pair_ids(term: str, geo: str, create: bool = False) -> Optional[Tuple[int, int]]:
+    tid = resolve_term_ids([term], create=create).get(term)
+    gid = resolve_geo_ids([geo], create=create).get(geo)
+    if tid is None or gid is None:
+        return None
+    return tid, gid
+
+
+def _feature_rows_with_names(rows) -> List[Dict[str, Any]]:
+    """
+    rows: (term_id, geo_id, wow_change, z_score, slope_7d, latest, severity, ...)
+    """
+    tn = term_names(r[0] for r in rows)
+    gn = geo_names(r[1] for r in rows)
+    return [{
+        "term": tn.get(r[0], ""),
+        "geo": gn.get(r[1], ""),
+        "wow_change": float(r[2]),
+        "z_score": float(r[3]),
+        "slope_7d": float(r[4]),
+        "latest": float(r[5]),
+        "severity": r[6],
+    } for r in rows]
+
+
 # ---------------------------
 # FEATURES
 # ---------------------------
@@ -19,7 +144,7 @@ def get_top_features(
 ) -> List[Dict[str, Any]]:
     if severities:
         q = text("""
-            SELECT term, geo, wow_change, z_score, slope_7d, latest, severity
+            SELECT term_id, geo_id, wow_change, z_score, slope_7d, latest, severity
             FROM trend_features
             WHERE as_of_date = :as_of_date
               AND severity = ANY(:severities)
@@ -45,7 +170,7 @@ def get_top_features(
         }
     else:
         q = text("""
-            SELECT term, geo, wow_change, z_score, slope_7d, latest, severity
+            SELECT term_id, geo_id, wow_change, z_score, slope_7d, latest, severity
             FROM trend_features
             WHERE as_of_date = :as_of_date
               AND latest >= :min_latest
@@ -68,18 +193,10 @@ def get_top_features(
             "limit": limit,
         }
 
-    with engine.begin() as conn:
+    with get_engine().begin() as conn:
         rows = conn.execute(q, params).fetchall()
 
-    return [{
-        "term": r[0],
-        "geo": r[1],
-        "wow_change": float(r[2]),
-        "z_score": float(r[3]),
-        "slope_7d": float(r[4]),
-        "latest": float(r[5]),
-        "severity": r[6],
-    } for r in rows]
+    return _feature_rows_with_names(rows)
 
 
 def upsert_trend_series(rows: Iterable[Tuple[str, str, str, float, str]]):
@@ -87,21 +204,65 @@ def upsert_trend_series(rows: Iterable[Tuple[str, str, str, float, str]]):
     rows: (term, geo, date_iso(YYYY-MM-DD), value, source)
     """
     q = text("""
-        INSERT INTO trend_series(term, geo, date, value, source)
-        VALUES (:term, :geo, :date, :value, :source)
-        ON CONFLICT (term, geo, date)
+        INSERT INTO trend_series(term_id, geo_id, date, value, source)
+        VALUES (:term_id, :geo_id, :date, :value, :source)
+        ON CONFLICT (term_id, geo_id, date)
         DO UPDATE SET value=EXCLUDED.value, collected_at=NOW();
     """)
 
+    rows = list(rows)
+    if not rows:
+        return
+
+    tids = resolve_term_ids({t for (t, _, _, _, _) in rows})
+    gids = resolve_geo_ids({g for (_, g, _, _, _) in rows})
+    rows = _skip_unresolved(rows, tids, gids, lambda r: (r[0], r[1]), "trend_series")
+    if not rows:
+        return
     payload = [
-        {"term": t, "geo": g, "date": d, "value": v, "source": s}
+        {"term_id": tids[t], "geo_id": gids[g], "date": d, "value": v, "source": s}
         for (t, g, d, v, s) in rows
     ]
-    if not payload:
-        return
+    # timeframe을 늘리면 과거 월이 들어올 수 있음 → 없는 월 파티션만 생성 (캐시 hit면 DB 왕복 X)
+    _write_partitioned("trend_series", {date.fromisoformat(str(d)[:10]) for (_, _, d, _, _) in rows}, q, payload)
 
-    with engine.begin() as conn:
-        conn.execute(q, payload)
+
+_FEATURE_UPSERT_CONFLICT_SQL = """
+    ON CONFLICT (term_id, geo_id, as_of_date)
+    DO UPDATE SET
+        wow_change=EXCLUDED.wow_change,
+        z_score=EXCLUDED.z_score,
+        slope_7d=EXCLUDED.slope_7d,
+        latest=EXCLUDED.latest,
+        severity=EXCLUDED.severity,
+        evidence_json=EXCLUDED.evidence_json,
+        computed_at=NOW();
+"""
+
+_UPSERT_FEATURE_SQL = """
+    INSERT INTO trend_features(
+        term_id, geo_id, as_of_date, wow_change, z_score, slope_7d, latest, severity, evidence_json
+    )
+    VALUES (
+        :term_id, :geo_id, :as_of_date, :wow, :z, :slope, :latest, :severity, CAST(:evidence AS jsonb)
+    )
+""" + _FEATURE_UPSERT_CONFLICT_SQL
+
+# ✅ 배치는 배열 파라미터 + unnest로 INSERT 문장 1개 (executemany면 행마다 문장 → statement trigger도 행마다)
+_UPSERT_FEATURES_BATCH_SQL = """
+    INSERT INTO trend_features(
+        term_id, geo_id, as_of_date, wow_change, z_score, slope_7d, latest, severity, evidence_json
+    )
+    SELECT * FROM unnest(
+        CAST(:term_ids AS int[]), CAST(:geo_ids AS smallint[]), CAST(:dates AS date[]),
+        CAST(:wows AS double precision[]), CAST(:zs AS double precision[]), CAST(:slopes AS double precision[]),
+        CAST(:latests AS double precision[]), CAST(:severities AS text[]), CAST(:evidences AS jsonb[])
+    )
+""" + _FEATURE_UPSERT_CONFLICT_SQL
+
+# LISTEN/NOTIFY 채널: geo 단위로 feature가 커밋되면 발행
+FEATURES_CHANNEL = "trend_features_committed"
+_NOTIFY_MAX_BYTES = 7000  # Postgres NOTIFY payload 한도(8000B)보다 여유 있게
 
 
 def upsert_feature(
@@ -119,27 +280,15 @@ def upsert_feature(
     trend_features에 severity/evidence까지 저장 (EMERGING 지원)
     evidence는 jsonb 컬럼(evidence_json)에 저장
     """
-    q = text("""
-        INSERT INTO trend_features(
-            term, geo, as_of_date, wow_change, z_score, slope_7d, latest, severity, evidence_json
-        )
-        VALUES (
-            :term, :geo, :as_of_date, :wow, :z, :slope, :latest, :severity, CAST(:evidence AS jsonb)
-        )
-        ON CONFLICT (term, geo, as_of_date)
-        DO UPDATE SET
-            wow_change=EXCLUDED.wow_change,
-            z_score=EXCLUDED.z_score,
-            slope_7d=EXCLUDED.slope_7d,
-            latest=EXCLUDED.latest,
-            severity=EXCLUDED.severity,
-            evidence_json=EXCLUDED.evidence_json,
-            computed_at=NOW();
-    """)
-    with engine.begin() as conn:
-        conn.execute(q, {
-            "term": term,
-            "geo": geo,
+    ids = _pair_ids(term, geo, create=True)
+    if ids is None:
+        print(f"[storage] trend_features: skipped blank term/geo ({term!r}, {geo!r})", file=sys.stderr)
+        return
+    term_id, geo_id = ids
+    with get_engine().begin() as conn:
+        conn.execute(text(_UPSERT_FEATURE_SQL), {
+            "term_id": term_id,
+            "geo_id": geo_id,
             "as_of_date": as_of_date,
             "wow": wow,
             "z": z,
@@ -150,18 +299,77 @@ def upsert_feature(
         })
 
 
+def upsert_features(rows: List[Dict[str, Any]], notify: bool = True):
+    """
+    rows: [{term, geo, as_of_date, wow, z, slope, latest, severity, evidence}, ...]
+    한 트랜잭션, INSERT 문장 1개로 저장. notify=True면 같은 트랜잭션에서 pg_notify → 커밋 시점에만 LISTEN 쪽에 전달됨
+    같은 (term, geo, as_of_date)가 여러 번 오면 마지막 행 (한 문장의 ON CONFLICT는 같은 행을 두 번 못 고침)
+    """
+    if not rows:
+        return
+
+    tids = resolve_term_ids({r["term"] for r in rows})
+    gids = resolve_geo_ids({r["geo"] for r in rows})
+    rows = _skip_unresolved(rows, tids, gids, lambda r: (r["term"], r["geo"]), "trend_features")
+    if not rows:
+        return
+    last = {(tids[r["term"]], gids[r["geo"]], str(r["as_of_date"])[:10]): r for r in rows}
+    batch = list(last.values())
+    payload = {
+        "term_ids": [tid for (tid, _, _) in last],
+        "geo_ids": [gid for (_, gid, _) in last],
+        "dates": [d for (_, _, d) in last],
+        "wows": [r["wow"] for r in batch],
+        "zs": [r["z"] for r in batch],
+        "slopes": [r["slope"] for r in batch],
+        "latests": [r["latest"] for r in batch],
+        "severities": [r["severity"] for r in batch],
+        "evidences": [json.dumps(r.get("evidence") or {}) for r in batch],
+    }
+    with get_engine().begin() as conn:
+        conn.execute(text(_UPSERT_FEATURES_BATCH_SQL), payload)
+        if notify:
+            for msg in _feature_notify_payloads(rows):
+                conn.execute(text("SELECT pg_notify(:ch, :msg);"), {"ch": FEATURES_CHANNEL, "msg": msg})
+
+
+def _feature_notify_payloads(rows: List[Dict[str, Any]]) -> List[str]:
+    """
+    (as_of_date, geo)별로 term 목록을 묶어 JSON payload 생성. 한도를 넘으면 여러 개로 쪼갬
+    """
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for r in rows:
+        groups.setdefault((str(r["as_of_date"]), r["geo"]), []).append(r["term"])
+
+    out: List[str] = []
+    for (d, geo), terms in groups.items():
+        chunk: List[str] = []
+        for t in terms:
+            msg = json.dumps({"as_of_date": d, "geo": geo, "terms": chunk + [t]}, ensure_ascii=False)
+            if chunk and len(msg.encode("utf-8")) > _NOTIFY_MAX_BYTES:
+                out.append(json.dumps({"as_of_date": d, "geo": geo, "terms": chunk}, ensure_ascii=False))
+                chunk = []
+            chunk.append(t)
+        if chunk:
+            out.append(json.dumps({"as_of_date": d, "geo": geo, "terms": chunk}, ensure_ascii=False))
+    return out
+
+
 # ---------------------------
 # ALERTS
 # ---------------------------
 
 def fired_recently(term: str, geo: str, severity: str, cooldown_hours: int = 72) -> bool:
+    ids = _pair_ids(term, geo)
+    if ids is None:
+        return False
     q = text("""
         SELECT fired_at FROM alerts
-        WHERE term=:term AND geo=:geo AND severity=:severity
+        WHERE term_id=:term_id AND geo_id=:geo_id AND severity=:severity
         ORDER BY fired_at DESC LIMIT 1
     """)
-    with engine.begin() as conn:
-        row = conn.execute(q, {"term": term, "geo": geo, "severity": severity}).fetchone()
+    with get_engine().begin() as conn:
+        row = conn.execute(q, {"term_id": ids[0], "geo_id": ids[1], "severity": severity}).fetchone()
     if not row:
         return False
     last = row[0].replace(tzinfo=None)
@@ -176,15 +384,20 @@ def log_alert(
     slack_ts: str | None = None,
     cooldown_hours: int = 72
 ):
+    ids = _pair_ids(term, geo, create=True)
+    if ids is None:
+        print(f"[storage] alerts: skipped blank term/geo ({term!r}, {geo!r})", file=sys.stderr)
+        return
+    term_id, geo_id = ids
     q = text("""
-        INSERT INTO alerts(term, geo, severity, slack_channel, slack_ts, cooldown_until)
-        VALUES (:term, :geo, :severity, :slack_channel, :slack_ts,
+        INSERT INTO alerts(term_id, geo_id, severity, slack_channel, slack_ts, cooldown_until)
+        VALUES (:term_id, :geo_id, :severity, :slack_channel, :slack_ts,
                 NOW() + (:cooldown || ' hours')::interval)
     """)
-    with engine.begin() as conn:
+    with get_engine().begin() as conn:
         conn.execute(q, {
-            "term": term,
-            "geo": geo,
+            "term_id": term_id,
+            "geo_id": geo_id,
             "severity": severity,
             "slack_channel": slack_channel,
             "slack_ts": slack_ts,
@@ -193,16 +406,19 @@ def log_alert(
 
 
 def was_rising_last_week(term: str, geo: str, as_of_date: str) -> bool:
+    ids = _pair_ids(term, geo)
+    if ids is None:
+        return False
     q = text("""
         SELECT 1 FROM alerts
-        WHERE term=:term AND geo=:geo
-        AND fired_at >= (:as_of_date::date - INTERVAL '14 days')
-        AND fired_at <  (:as_of_date::date)
+        WHERE term_id=:term_id AND geo_id=:geo_id
+        AND fired_at >= (CAST(:as_of_date AS date) - INTERVAL '14 days')
+        AND fired_at <  CAST(:as_of_date AS date)
         AND severity IN ('RISING','BREAKOUT')
         LIMIT 1
     """)
-    with engine.begin() as conn:
-        row = conn.execute(q, {"term": term, "geo": geo, "as_of_date": as_of_date}).fetchone()
+    with get_engine().begin() as conn:
+        row = conn.execute(q, {"term_id": ids[0], "geo_id": ids[1], "as_of_date": as_of_date}).fetchone()
     return row is not None
 
 
@@ -210,72 +426,177 @@ def was_rising_last_week(term: str, geo: str, as_of_date: str) -> bool:
 # HOURLY SNAPSHOTS
 # ---------------------------
 
-def upsert_hourly_snapshot(snapshot_at_iso: str, geo_count: int, term_count: int, timeframe: str) -> int:
+def snapshot_content_hash(rows: List[Dict[str, Any]]) -> str:
+    """
+    스냅샷 feature 행의 내용 해시 (순서 무관, float는 6자리 반올림)
+    """
+    canon = sorted(
+        (r["term"], r["geo"], round(float(r["wow_change"]), 6), round(float(r["z_score"]), 6),
+         round(float(r["slope_7d"]), 6), round(float(r["latest"]), 6), r["severity"])
+        for r in rows
+    )
+    return hashlib.sha256(json.dumps(canon, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def find_snapshot_source(snapshot_at_iso: str, content_hash: str) -> Optional[int]:
+    """
+    같은 KST 날짜의 직전 스냅샷이 같은 해시면 그 행을 가진 스냅샷 id 반환 (없으면 None)
+    - 날짜를 넘어서는 참조는 하지 않음 → 하루/한 달 파티션 단위로 독립적으로 집계·삭제 가능
+    """
+    at = datetime.fromisoformat(snapshot_at_iso)
+    day_start, _ = _kst_day_bounds(at.astimezone(_REPORT_TZ).date())
+    q = text("""
+      SELECT id, content_hash, source_snapshot_id
+      FROM hourly_snapshots
+      WHERE snapshot_at < :t AND snapshot_at >= :day_start
+      ORDER BY snapshot_at DESC
+      LIMIT 1;
+    """)
+    with get_engine().begin() as conn:
+        row = conn.execute(q, {"t": at, "day_start": day_start}).fetchone()
+    if not row or row[1] != content_hash:
+        return None
+    return int(row[2] or row[0])
+
+
+def upsert_hourly_snapshot(
+    snapshot_at_iso: str,
+    geo_count: int,
+    term_count: int,
+    timeframe: str,
+    content_hash: Optional[str] = None,
+    source_snapshot_id: Optional[int] = None,
+) -> int:
     """
     snapshot_at_iso: ISO8601 (예: 2025-12-20T16:00:00+09:00)
     같은 snapshot_at이면 이미 존재하는 id 반환
+    source_snapshot_id가 있으면 이 스냅샷은 자기 행 없이 source의 행을 참조
+    재실행으로 자기 행이 바뀌면(참조로 전환/내용 변경) 예전 행을 참조하던 뒤 스냅샷에 먼저 넘겨줌
     """
+    prev_q = text("""
+      SELECT content_hash, source_snapshot_id FROM hourly_snapshots WHERE snapshot_at = :snapshot_at FOR UPDATE;
+    """)
     q = text("""
-      INSERT INTO hourly_snapshots(snapshot_at, geo_count, term_count, timeframe)
-      VALUES (:snapshot_at, :geo_count, :term_count, :timeframe)
+      INSERT INTO hourly_snapshots(snapshot_at, geo_count, term_count, timeframe, content_hash, source_snapshot_id)
+      VALUES (:snapshot_at, :geo_count, :term_count, :timeframe, :content_hash, :source_snapshot_id)
       ON CONFLICT (snapshot_at) DO UPDATE SET
         geo_count=EXCLUDED.geo_count,
         term_count=EXCLUDED.term_count,
-        timeframe=EXCLUDED.timeframe
-      RETURNING id;
+        timeframe=EXCLUDED.timeframe,
+        content_hash=EXCLUDED.content_hash,
+        source_snapshot_id=EXCLUDED.source_snapshot_id
+      RETURNING id, snapshot_at;
     """)
-    with engine.begin() as conn:
-        sid = conn.execute(q, {
+    with get_engine().begin() as conn:
+        prev = conn.execute(prev_q, {"snapshot_at": snapshot_at_iso}).fetchone()
+        sid, snapshot_at = conn.execute(q, {
             "snapshot_at": snapshot_at_iso,
             "geo_count": geo_count,
             "term_count": term_count,
-            "timeframe": timeframe
-        }).scalar_one()
+            "timeframe": timeframe,
+            "content_hash": content_hash,
+            "source_snapshot_id": source_snapshot_id,
+        }).one()
+        # 같은 시각 재실행: 예전에 자기 행을 가졌고, 이번에 참조로 바뀌거나 내용이 달라졌으면 예전 행 정리
+        if prev is not None and prev[1] is None and (source_snapshot_id is not None or prev[0] != content_hash):
+            _hand_off_snapshot_rows(conn, sid, snapshot_at)
+            conn.execute(text("""
+              DELETE FROM hourly_snapshot_features WHERE snapshot_id = :sid AND snapshot_at = :at;
+            """), {"sid": sid, "at": snapshot_at})
     return int(sid)
 
 
+def _hand_off_snapshot_rows(conn, sid: int, snapshot_at: datetime):
+    """
+    sid의 행을 참조하던(내용이 같던) 뒤 스냅샷들이 있으면 가장 이른 것에 행을 복사해서 새 source로 만들고
+    나머지 참조도 그쪽으로 돌림 → sid 행을 지워도 참조 스냅샷이 빈 스냅샷이 되지 않음
+    (find_snapshot_source가 같은 KST 날짜만 참조 → 같은 파티션)
+    """
+    heir = conn.execute(text("""
+      SELECT id, snapshot_at FROM hourly_snapshots
+      WHERE source_snapshot_id = :sid
+      ORDER BY snapshot_at
+      LIMIT 1
+      FOR UPDATE;
+    """), {"sid": sid}).fetchone()
+    if heir is None:
+        return
+    conn.execute(text("""
+      INSERT INTO hourly_snapshot_features(
+        snapshot_id, snapshot_at, term_id, geo_id, wow_change, z_score, slope_7d, latest, severity
+      )
+      SELECT :heir, :heir_at, term_id, geo_id, wow_change, z_score, slope_7d, latest, severity
+      FROM hourly_snapshot_features
+      WHERE snapshot_id = :sid AND snapshot_at = :at
+      ON CONFLICT (snapshot_id, term_id, geo_id, snapshot_at) DO NOTHING;
+    """), {"heir": heir[0], "heir_at": heir[1], "sid": sid, "at": snapshot_at})
+    conn.execute(text("UPDATE hourly_snapshots SET source_snapshot_id = NULL WHERE id = :heir;"), {"heir": heir[0]})
+    conn.execute(text("""
+      UPDATE hourly_snapshots SET source_snapshot_id = :heir WHERE source_snapshot_id = :sid;
+    """), {"heir": heir[0], "sid": sid})
+
+
+def _effective_snapshot(conn, snapshot_id: int) -> Optional[Tuple[int, datetime]]:
+    """
+    실제 feature 행을 가진 (snapshot_id, snapshot_at) — 참조 스냅샷이면 source를 따라감
+    """
+    row = conn.execute(text("""
+      SELECT s.id, s.snapshot_at
+      FROM hourly_snapshots h
+      JOIN hourly_snapshots s ON s.id = COALESCE(h.source_snapshot_id, h.id)
+      WHERE h.id = :sid;
+    """), {"sid": snapshot_id}).fetchone()
+    return (int(row[0]), row[1]) if row else None
+
+
 def insert_hourly_snapshot_features(snapshot_id: int, rows: List[Dict[str, Any]]):
     """
     rows: [{term, geo, wow_change, z_score, slope_7d, latest, severity}, ...]
     """
     if not rows:
         return
+    with get_engine().begin() as conn:
+        snapshot_at = conn.execute(
+            text("SELECT snapshot_at FROM hourly_snapshots WHERE id=:sid;"), {"sid": snapshot_id}
+        ).scalar_one()
+
     q = text("""
       INSERT INTO hourly_snapshot_features(
-        snapshot_id, term, geo, wow_change, z_score, slope_7d, latest, severity
+        snapshot_id, snapshot_at, term_id, geo_id, wow_change, z_score, slope_7d, latest, severity
       ) VALUES (
-        :snapshot_id, :term, :geo, :wow_change, :z_score, :slope_7d, :latest, :severity
+        :snapshot_id, :snapshot_at, :term_id, :geo_id, :wow_change, :z_score, :slope_7d, :latest, :severity
       )
-      ON CONFLICT (snapshot_id, term, geo) DO UPDATE SET
+      ON CONFLICT (snapshot_id, term_id, geo_id, snapshot_at) DO UPDATE SET
         wow_change=EXCLUDED.wow_change,
         z_score=EXCLUDED.z_score,
         slope_7d=EXCLUDED.slope_7d,
         latest=EXCLUDED.latest,
         severity=EXCLUDED.severity;
     """)
-    payload = [{"snapshot_id": snapshot_id, **r} for r in rows]
-    with engine.begin() as conn:
-        conn.execute(q, payload)
-
-
-def get_previous_snapshot_id(snapshot_at_iso: str) -> Optional[int]:
-    q = text("""
-      SELECT id
-      FROM hourly_snapshots
-      WHERE snapshot_at < :t
-      ORDER BY snapshot_at DESC
-      LIMIT 1;
-    """)
-    with engine.begin() as conn:
-        row = conn.execute(q, {"t": snapshot_at_iso}).fetchone()
-    return int(row[0]) if row else None
+    tids = resolve_term_ids({r["term"] for r in rows})
+    gids = resolve_geo_ids({r["geo"] for r in rows})
+    rows = _skip_unresolved(rows, tids, gids, lambda r: (r["term"], r["geo"]), "hourly_snapshot_features")
+    if not rows:
+        return
+    payload = [{
+        "snapshot_id": snapshot_id,
+        "snapshot_at": snapshot_at,
+        "term_id": tids[r["term"]],
+        "geo_id": gids[r["geo"]],
+        "wow_change": r["wow_change"],
+        "z_score": r["z_score"],
+        "slope_7d": r["slope_7d"],
+        "latest": r["latest"],
+        "severity": r["severity"],
+    } for r in rows]
+    _write_partitioned("hourly_snapshot_features", [snapshot_at.astimezone(_REPORT_TZ).date()], q, payload)
 
 
 def get_snapshot_top_features(snapshot_id: int, limit: int = 10) -> List[Dict[str, Any]]:
     q = text("""
-      SELECT term, geo, wow_change, z_score, slope_7d, latest, severity
+      SELECT term_id, geo_id, wow_change, z_score, slope_7d, latest, severity
       FROM hourly_snapshot_features
-      WHERE snapshot_id = :sid
+      WHERE snapshot_id = :sid AND snapshot_at = :at
       ORDER BY
         CASE
           WHEN severity='BREAKOUT' THEN 4
@@ -286,43 +607,100 @@ def get_snapshot_top_features(snapshot_id: int, limit: int = 10) -> List[Dict[st
         z_score DESC
       LIMIT :limit;
     """)
-    with engine.begin() as conn:
-        rows = conn.execute(q, {"sid": snapshot_id, "limit": limit}).fetchall()
+    with get_engine().begin() as conn:
+        eff = _effective_snapshot(conn, snapshot_id)
+        if eff is None:
+            return []
+        rows = conn.execute(q, {"sid": eff[0], "at": eff[1], "limit": limit}).fetchall()
 
-    return [{
-        "term": r[0],
-        "geo": r[1],
-        "wow_change": float(r[2]),
-        "z_score": float(r[3]),
-        "slope_7d": float(r[4]),
-        "latest": float(r[5]),
-        "severity": r[6],
-    } for r in rows]
+    return _feature_rows_with_names(rows)
+
+
+DELTA_KINDS = ("ENTERED", "EXITED", "UPGRADED", "Z_JUMP")
 
 
-def get_snapshot_feature_map(snapshot_id: int) -> Dict[str, Dict[str, Any]]:
+def compute_snapshot_deltas(snapshot_id: int, z_jump: float = 1.0) -> int:
     """
-    key = term|geo
+    snapshot_id와 직전 스냅샷의 차이를 FULL JOIN 한 번으로 계산해 snapshot_deltas에 저장
+    - 둘 다 같은 source를 참조(내용 동일)하면 바로 0
+    - 재실행 시 해당 스냅샷 delta는 지우고 다시 씀
+    - 반환: delta 행 수
     """
+    with get_engine().begin() as conn:
+        cur = _effective_snapshot(conn, snapshot_id)
+        prev_id = conn.execute(text("""
+          SELECT id
+          FROM hourly_snapshots
+          WHERE snapshot_at < (SELECT snapshot_at FROM hourly_snapshots WHERE id = :sid)
+          ORDER BY snapshot_at DESC
+          LIMIT 1;
+        """), {"sid": snapshot_id}).scalar()
+        conn.execute(text("DELETE FROM snapshot_deltas WHERE snapshot_id = :sid;"), {"sid": snapshot_id})
+        if cur is None or prev_id is None:
+            return 0
+        prev = _effective_snapshot(conn, prev_id)
+        if prev == cur:
+            return 0
+
+        n = conn.execute(text("""
+          INSERT INTO snapshot_deltas(
+            snapshot_id, prev_snapshot_id, term_id, geo_id, kind,
+            severity_from, severity_to, z_from, z_to
+          )
+          SELECT :sid, :prev_sid, j.term_id, j.geo_id, d.kind, j.sev_from, j.sev_to, j.z_from, j.z_to
+          FROM (
+            SELECT
+              COALESCE(c.term_id, p.term_id) AS term_id,
+              COALESCE(c.geo_id, p.geo_id) AS geo_id,
+              p.severity AS sev_from, c.severity AS sev_to,
+              p.z_score AS z_from, c.z_score AS z_to
+            FROM (
+              SELECT term_id, geo_id, severity, z_score
+              FROM hourly_snapshot_features
+              WHERE snapshot_id = :cur_id AND snapshot_at = :cur_at
+            ) c
+            FULL OUTER JOIN (
+              SELECT term_id, geo_id, severity, z_score
+              FROM hourly_snapshot_features
+              WHERE snapshot_id = :prev_id AND snapshot_at = :prev_at
+            ) p ON p.term_id = c.term_id AND p.geo_id = c.geo_id
+          ) j
+          CROSS JOIN LATERAL (VALUES
+            ('ENTERED', j.sev_from IS NULL),
+            ('EXITED', j.sev_to IS NULL),
+            ('UPGRADED', j.sev_from IS NOT NULL AND severity_rank(j.sev_to) > severity_rank(j.sev_from)),
+            ('Z_JUMP', j.z_to - j.z_from >= :z_jump)
+          ) AS d(kind, hit)
+          WHERE d.hit;
+        """), {
+            "sid": snapshot_id, "prev_sid": prev_id,
+            "cur_id": cur[0], "cur_at": cur[1],
+            "prev_id": prev[0], "prev_at": prev[1],
+            "z_jump": z_jump,
+        }).rowcount
+    return int(n or 0)
+
+
+def get_snapshot_deltas(snapshot_id: int, kinds: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     q = text("""
-      SELECT term, geo, wow_change, z_score, slope_7d, latest, severity
-      FROM hourly_snapshot_features
-      WHERE snapshot_id = :sid;
+      SELECT term_id, geo_id, kind, severity_from, severity_to, z_from, z_to
+      FROM snapshot_deltas
+      WHERE snapshot_id = :sid
+        AND kind = ANY(:kinds)
+      ORDER BY severity_rank(severity_to) DESC, z_to DESC NULLS LAST;
     """)
-    with engine.begin() as conn:
-        rows = conn.execute(q, {"sid": snapshot_id}).fetchall()
-    m = {}
-    for r in rows:
-        key = f"{r[0]}|{r[1]}"
-        m[key] = {
-            "term": r[0], "geo": r[1],
-            "wow_change": float(r[2]),
-            "z_score": float(r[3]),
-            "slope_7d": float(r[4]),
-            "latest": float(r[5]),
-            "severity": r[6],
-        }
-    return m
+    with get_engine().begin() as conn:
+        rows = conn.execute(q, {"sid": snapshot_id, "kinds": list(kinds or DELTA_KINDS)}).fetchall()
+
+    tn = term_names(r[0] for r in rows)
+    gn = geo_names(r[1] for r in rows)
+    return [{
+        "term": tn.get(r[0], ""), "geo": gn.get(r[1], ""),
+        "kind": r[2],
+        "severity_from": r[3], "severity_to": r[4],
+        "z_from": None if r[5] is None else float(r[5]),
+        "z_to": None if r[6] is None else float(r[6]),
+    } for r in rows]
 
 
 # ---------------------------
@@ -337,54 +715,192 @@ def upsert_daily_rollup(report_date: str, payload: Dict[str, Any]):
         payload_json=EXCLUDED.payload_json,
         updated_at=NOW();
     """)
-    with engine.begin() as conn:
+    with get_engine().begin() as conn:
         conn.execute(q, {"d": report_date, "p": json.dumps(payload)})
 
 
+def upsert_daily_rollups(payloads: Dict[str, Dict[str, Any]]):
+    """
+    payloads: {report_date: payload} → 한 트랜잭션 executemany
+    """
+    if not payloads:
+        return
+    q = text("""
+      INSERT INTO daily_rollups(report_date, payload_json)
+      VALUES (:d, CAST(:p AS jsonb))
+      ON CONFLICT (report_date) DO UPDATE SET
+        payload_json=EXCLUDED.payload_json,
+        updated_at=NOW();
+    """)
+    with get_engine().begin() as conn:
+        conn.execute(q, [{"d": d, "p": json.dumps(p)} for d, p in payloads.items()])
+
+
 def get_daily_rollup(report_date: str) -> Optional[Dict[str, Any]]:
     q = text("SELECT payload_json FROM daily_rollups WHERE report_date=:d;")
-    with engine.begin() as conn:
+    with get_engine().begin() as conn:
         row = conn.execute(q, {"d": report_date}).fetchone()
     return row[0] if row else None
 
 
-def compute_daily_rollup(
-    report_date: str,
-    tz_offset: str = "+09:00",
+# hsf(source 스냅샷 1개) → daily_rollup_state 병합. 샘플은 (값, source id, 가중치 1)로 추가
+_STATE_AGG_SQL = """
+  INSERT INTO daily_rollup_state(
+    report_date, term_id, geo_id, support, max_z, max_latest,
+    breakout_hits, rising_hits, emerging_hits, wow_samples, slope_samples, sample_sids, sample_weights
+  )
+  SELECT
+    :report_date, term_id, geo_id,
+    COUNT(*), MAX(z_score), MAX(latest),
+    SUM(CASE WHEN severity='BREAKOUT' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN severity='RISING' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN severity='EMERGING' THEN 1 ELSE 0 END),
+    array_agg(wow_change), array_agg(slope_7d), array_agg(snapshot_id), array_agg(1)
+  FROM hourly_snapshot_features
+  WHERE snapshot_id = :sid AND snapshot_at = :at
+  GROUP BY term_id, geo_id
+  ON CONFLICT (report_date, term_id, geo_id) DO UPDATE SET
+    support = daily_rollup_state.support + EXCLUDED.support,
+    max_z = GREATEST(daily_rollup_state.max_z, EXCLUDED.max_z),
+    max_latest = GREATEST(daily_rollup_state.max_latest, EXCLUDED.max_latest),
+    breakout_hits = daily_rollup_state.breakout_hits + EXCLUDED.breakout_hits,
+    rising_hits = daily_rollup_state.rising_hits + EXCLUDED.rising_hits,
+    emerging_hits = daily_rollup_state.emerging_hits + EXCLUDED.emerging_hits,
+    wow_samples = daily_rollup_state.wow_samples || EXCLUDED.wow_samples,
+    slope_samples = daily_rollup_state.slope_samples || EXCLUDED.slope_samples,
+    sample_sids = daily_rollup_state.sample_sids || EXCLUDED.sample_sids,
+    sample_weights = daily_rollup_state.sample_weights || EXCLUDED.sample_weights,
+    updated_at = NOW();
+"""
+
+# 참조 스냅샷(내용 동일) 병합: source 행을 다시 넣지 않고 1시간만 가중 (support/hits +1, 해당 샘플 가중치 +1)
+_STATE_REF_SQL = """
+  UPDATE daily_rollup_state s
+  SET support = s.support + 1,
+      breakout_hits = s.breakout_hits + CASE WHEN f.severity='BREAKOUT' THEN 1 ELSE 0 END,
+      rising_hits = s.rising_hits + CASE WHEN f.severity='RISING' THEN 1 ELSE 0 END,
+      emerging_hits = s.emerging_hits + CASE WHEN f.severity='EMERGING' THEN 1 ELSE 0 END,
+      sample_weights[array_position(s.sample_sids, f.snapshot_id)]
+        = s.sample_weights[array_position(s.sample_sids, f.snapshot_id)] + 1,
+      updated_at = NOW()
+  FROM hourly_snapshot_features f
+  WHERE f.snapshot_id = :sid AND f.snapshot_at = :at
+    AND s.report_date = :report_date AND s.term_id = f.term_id AND s.geo_id = f.geo_id
+    AND array_position(s.sample_sids, f.snapshot_id) IS NOT NULL;
+"""
+
+# 가중 중앙값: (값, 가중치) 샘플을 가중치만큼 펼쳐서 PERCENTILE_CONT (반복 저장하던 때와 같은 값)
+# 하루 가중치 합 = support(≤ 24)라 펼쳐도 작음. top 행/압축 시에만 계산
+_WEIGHTED_MEDIAN_SQL = """(
+  SELECT PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY u.x)
+  FROM unnest({col}, sample_weights) AS u(x, w)
+  CROSS JOIN LATERAL generate_series(1, u.w) AS rep(n)
+)"""
+
+
+def _kst_day_bounds(report_date: date) -> Tuple[datetime, datetime]:
+    start_ts = datetime.combine(report_date, datetime.min.time(), tzinfo=_REPORT_TZ)
+    return start_ts, start_ts + timedelta(days=1)
+
+
+def apply_snapshot_to_daily_state(snapshot_id: int):
+    """
+    run_hourly 마지막에 호출: 이번 스냅샷 feature만 daily_rollup_state에 병합
+    - 내용이 같아 source를 참조하는 스냅샷은 source 샘플 가중치 +1 (행/배열은 늘지 않음)
+    - 같은 스냅샷이 재실행으로 다시 들어오면 그 날짜 상태를 hsf에서 다시 만듦 (중복 집계 방지)
+    """
+    with get_engine().begin() as conn:
+        snapshot_at = conn.execute(text("""
+          UPDATE hourly_snapshots SET rolled_up = TRUE
+          WHERE id = :sid AND NOT rolled_up
+          RETURNING snapshot_at;
+        """), {"sid": snapshot_id}).scalar()
+        if snapshot_at is not None:
+            src_id, src_at = _effective_snapshot(conn, snapshot_id)
+            params = {"sid": src_id, "at": src_at, "report_date": snapshot_at.astimezone(_REPORT_TZ).date()}
+            if src_id == snapshot_id:
+                conn.execute(text(_STATE_AGG_SQL), params)
+                return
+            # 참조 스냅샷: source 행 수만큼 갱신돼야 함. 아니면(source 미반영/옛 형식 행) 그 날짜를 다시 만듦
+            n_src = conn.execute(text(
+                "SELECT COUNT(*) FROM hourly_snapshot_features WHERE snapshot_id = :sid AND snapshot_at = :at;"
+            ), {"sid": src_id, "at": src_at}).scalar()
+            if conn.execute(text(_STATE_REF_SQL), params).rowcount == n_src:
+                return
+        snapshot_at = conn.execute(
+            text("SELECT snapshot_at FROM hourly_snapshots WHERE id = :sid;"), {"sid": snapshot_id}
+        ).scalar_one()
+
+    rebuild_daily_state(snapshot_at.astimezone(_REPORT_TZ).date())
+
+
+def rebuild_daily_state(start_date: date, end_date: Optional[date] = None):
+    """
+    [start_date, end_date] 날짜들의 daily_rollup_state를 hsf에서 한 번에 다시 계산 (재실행/복구용)
+    """
+    end_date = end_date or start_date
+    start_ts, _ = _kst_day_bounds(start_date)
+    _, end_ts = _kst_day_bounds(end_date)
+    with get_engine().begin() as conn:
+        conn.execute(text("DELETE FROM daily_rollup_state WHERE report_date >= :ds AND report_date <= :de;"),
+                     {"ds": start_date, "de": end_date})
+        conn.execute(text("""
+          INSERT INTO daily_rollup_state(
+            report_date, term_id, geo_id, support, max_z, max_latest,
+            breakout_hits, rising_hits, emerging_hits, wow_samples, slope_samples, sample_sids, sample_weights
+          )
+          WITH w AS (
+            -- source 스냅샷별 유효 시간 수 (자기 자신 + 참조한 스냅샷)
+            SELECT COALESCE(source_snapshot_id, id) AS sid, CAST(COUNT(*) AS INT) AS hours
+            FROM hourly_snapshots
+            WHERE snapshot_at >= :s AND snapshot_at < :e
+            GROUP BY 1
+          )
+          -- source 행마다 한 번만 집계, 개수/hit은 시간 수로 가중 → 중복 저장하던 때와 support/중앙값 동일
+          SELECT
+            (f.snapshot_at AT TIME ZONE 'Asia/Seoul')::date, f.term_id, f.geo_id,
+            SUM(w.hours), MAX(f.z_score), MAX(f.latest),
+            SUM(CASE WHEN f.severity='BREAKOUT' THEN w.hours ELSE 0 END),
+            SUM(CASE WHEN f.severity='RISING' THEN w.hours ELSE 0 END),
+            SUM(CASE WHEN f.severity='EMERGING' THEN w.hours ELSE 0 END),
+            array_agg(f.wow_change), array_agg(f.slope_7d), array_agg(f.snapshot_id), array_agg(w.hours)
+          FROM hourly_snapshot_features f
+          JOIN w ON w.sid = f.snapshot_id
+          WHERE f.snapshot_at >= :s AND f.snapshot_at < :e
+          GROUP BY 1, 2, 3;
+        """), {"s": start_ts, "e": end_ts})
+
+
+def compute_daily_rollups(
+    start_date: str,
+    end_date: str,
     min_support: int = 2,
     limit: int = 10
-) -> Dict[str, Any]:
+) -> Dict[str, Dict[str, Any]]:
     """
-    report_date: 'YYYY-MM-DD' (Asia/Seoul 기준)
-    tz_offset: '+09:00'
-    EMERGING까지 일간 severity_day로 반영
+    start_date~end_date (KST, 양끝 포함) 모든 날짜의 daily rollup을 쿼리 1번으로 계산
+    - daily_rollup_state + (압축된 달은) hourly_snapshot_daily
+    - 날짜별 ROW_NUMBER로 상위 limit개만 남기고 그 행들만 중앙값 계산
+    - 반환: {report_date: {report_date, top, min_support}} (신호 없는 날도 빈 top으로 포함)
     """
+    ds = date.fromisoformat(start_date)
+    de = date.fromisoformat(end_date)
+
     q = text(f"""
-    WITH bounds AS (
-      SELECT
-        (('{report_date}'::date)::timestamptz + TIME '00:00') AT TIME ZONE '{tz_offset}' AS start_ts,
-        (('{report_date}'::date + 1)::timestamptz + TIME '00:00') AT TIME ZONE '{tz_offset}' AS end_ts
-    ),
-    base AS (
-      SELECT hsf.term, hsf.geo, hsf.wow_change, hsf.z_score, hsf.slope_7d, hsf.latest, hsf.severity
-      FROM hourly_snapshot_features hsf
-      JOIN hourly_snapshots hs ON hs.id = hsf.snapshot_id
-      JOIN bounds b ON hs.snapshot_at >= b.start_ts AND hs.snapshot_at < b.end_ts
-    ),
-    agg AS (
-      SELECT
-        term,
-        geo,
-        COUNT(*) AS support,
-        MAX(z_score) AS max_z,
-        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY wow_change) AS median_wow,
-        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY slope_7d)  AS median_slope,
-        MAX(latest) AS max_latest,
-        SUM(CASE WHEN severity='BREAKOUT' THEN 1 ELSE 0 END) AS breakout_hits,
-        SUM(CASE WHEN severity='RISING' THEN 1 ELSE 0 END)   AS rising_hits,
-        SUM(CASE WHEN severity='EMERGING' THEN 1 ELSE 0 END) AS emerging_hits
-      FROM base
-      GROUP BY term, geo
+    WITH src AS (
+      SELECT report_date, term_id, geo_id, support, max_z, max_latest,
+             breakout_hits, rising_hits, emerging_hits, wow_samples, slope_samples, sample_weights,
+             CAST(NULL AS DOUBLE PRECISION) AS median_wow,
+             CAST(NULL AS DOUBLE PRECISION) AS median_slope
+      FROM daily_rollup_state
+      WHERE report_date >= :ds AND report_date <= :de
+      UNION ALL
+      SELECT report_date, term_id, geo_id, support, max_z, max_latest,
+             breakout_hits, rising_hits, emerging_hits,
+             CAST(NULL AS DOUBLE PRECISION[]), CAST(NULL AS DOUBLE PRECISION[]), CAST(NULL AS INT[]),
+             median_wow, median_slope
+      FROM hourly_snapshot_daily
+      WHERE report_date >= :ds AND report_date <= :de
     ),
     ranked AS (
       SELECT *,
@@ -393,43 +909,298 @@ def compute_daily_rollup(
           WHEN rising_hits >= 2 THEN 'RISING'
           WHEN emerging_hits >= 2 THEN 'EMERGING'
           ELSE 'WATCH'
-        END AS severity_day
-      FROM agg
+        END AS severity_day,
+        CASE
+          WHEN breakout_hits >= 1 THEN 4
+          WHEN rising_hits >= 2 THEN 3
+          WHEN emerging_hits >= 2 THEN 2
+          ELSE 1
+        END AS sev_rank
+      FROM src
       WHERE support >= :min_support
+    ),
+    top AS (
+      SELECT *,
+        ROW_NUMBER() OVER (PARTITION BY report_date ORDER BY sev_rank DESC, max_z DESC) AS rn
+      FROM ranked
     )
-    SELECT term, geo, support, max_z, median_wow, median_slope, max_latest, severity_day
-    FROM ranked
-    ORDER BY
-      CASE
-        WHEN severity_day='BREAKOUT' THEN 4
-        WHEN severity_day='RISING' THEN 3
-        WHEN severity_day='EMERGING' THEN 2
-        ELSE 1
-      END DESC,
-      max_z DESC
-    LIMIT :limit;
+    SELECT
+      report_date, term_id, geo_id, support, max_z,
+      COALESCE(median_wow, {_WEIGHTED_MEDIAN_SQL.format(col="wow_samples")}),
+      COALESCE(median_slope, {_WEIGHTED_MEDIAN_SQL.format(col="slope_samples")}),
+      max_latest,
+      severity_day
+    FROM top
+    WHERE rn <= :limit
+    ORDER BY report_date, rn;
     """)
 
-    with engine.begin() as conn:
-        rows = conn.execute(q, {"min_support": min_support, "limit": limit}).fetchall()
+    with get_engine().begin() as conn:
+        rows = conn.execute(q, {
+            "ds": ds,
+            "de": de,
+            "min_support": min_support,
+            "limit": limit,
+        }).fetchall()
+
+    tn = term_names(r[1] for r in rows)
+    gn = geo_names(r[2] for r in rows)
+
+    out: Dict[str, Dict[str, Any]] = {}
+    d = ds
+    while d <= de:
+        out[d.isoformat()] = {"report_date": d.isoformat(), "top": [], "min_support": min_support}
+        d += timedelta(days=1)
 
-    items = []
     for r in rows:
-        items.append({
-            "term": r[0], "geo": r[1],
-            "support": int(r[2]),
-            "max_z": float(r[3]),
-            "median_wow": float(r[4]),
-            "median_slope": float(r[5]),
-            "max_latest": float(r[6]),
-            "severity_day": r[7],
+        out[r[0].isoformat()]["top"].append({
+            "term": tn.get(r[1], ""), "geo": gn.get(r[2], ""),
+            "support": int(r[3]),
+            "max_z": float(r[4]),
+            "median_wow": float(r[5]),
+            "median_slope": float(r[6]),
+            "max_latest": float(r[7]),
+            "severity_day": r[8],
         })
+    return out
 
-    return {
-        "report_date": report_date,
-        "top": items,
-        "min_support": min_support,
-    }
+
+def compute_daily_rollup(
+    report_date: str,
+    min_support: int = 2,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """
+    report_date: 'YYYY-MM-DD' (Asia/Seoul 기준)
+    hourly가 갱신해 둔 daily_rollup_state만 읽음
+    EMERGING까지 일간 severity_day로 반영
+    """
+    return compute_daily_rollups(report_date, report_date, min_support=min_support, limit=limit)[report_date]
+
+
+# ---------------------------
+# PARTITIONS / RETENTION
+# ---------------------------
+# 월 RANGE 파티션 (migration 4). hourly_snapshot_features는 KST 월 경계
+_REPORT_TZ = timezone(timedelta(hours=9))
+_PARTITION_TZ = {"trend_series": "+00", "hourly_snapshot_features": "+09"}
+_PARTITION_NAME_RE = re.compile(r"_y(\d{4})m(\d{2})$")
+_known_partitions: set = set()
+
+
+def _month_floor(d: date) -> date:
+    return d.replace(day=1)
+
+
+def _add_months(d: date, n: int) -> date:
+    y, m = divmod(d.year * 12 + (d.month - 1) + n, 12)
+    return date(y, m + 1, 1)
+
+
+def ensure_partitions(table: str, days: Iterable[date]):
+    """
+    days가 속한 월 파티션이 없으면 생성. 이미 확인한 (table, 월)은 프로세스 캐시로 skip
+    """
+    months = sorted({_month_floor(d) for d in days} - {m for (t, m) in _known_partitions if t == table})
+    if not months:
+        return
+    with get_engine().begin() as conn:
+        for m in months:
+            conn.execute(
+                text("SELECT ensure_month_partition(:t, :m, :tz);"),
+                {"t": table, "m": m, "tz": _PARTITION_TZ[table]},
+            )
+    _known_partitions.update((table, m) for m in months)
+
+
+def _forget_partitions(table: str, days: Iterable[date]):
+    _known_partitions.difference_update((table, _month_floor(d)) for d in days)
+
+
+def _write_partitioned(table: str, days: Iterable[date], q, payload):
+    """
+    ensure_partitions 후 쓰기. 다른 프로세스(maintain)가 그 월을 drop/pack해서 캐시가 틀렸으면
+    ("no partition of relation ... found for row") 캐시를 버리고 파티션을 다시 만든 뒤 한 번 재시도
+    """
+    days = set(days)
+    ensure_partitions(table, days)
+    try:
+        with get_engine().begin() as conn:
+            conn.execute(q, payload)
+    except IntegrityError as e:
+        if getattr(e.orig, "pgcode", None) != "23514" or "no partition of relation" not in str(e.orig):
+            raise
+        _forget_partitions(table, days)
+        ensure_partitions(table, days)
+        with get_engine().begin() as conn:
+            conn.execute(q, payload)
+
+
+def ensure_future_partitions(months_ahead: int = 3):
+    this_month = _month_floor(datetime.now(_REPORT_TZ).date())
+    for table in _PARTITION_TZ:
+        ensure_partitions(table, [_add_months(this_month, i) for i in range(months_ahead + 1)])
+
+
+def list_partitions(table: str) -> List[Tuple[str, date]]:
+    """
+    [(partition_name, month_start), ...] 오래된 순
+    """
+    q = text("""
+      SELECT c.relname
+      FROM pg_inherits i
+      JOIN pg_class c ON c.oid = i.inhrelid
+      WHERE i.inhparent = CAST(:parent AS regclass);
+    """)
+    with get_engine().begin() as conn:
+        names = [r[0] for r in conn.execute(q, {"parent": table}).fetchall()]
+
+    out = []
+    for n in names:
+        m = _PARTITION_NAME_RE.search(n)
+        if m:
+            out.append((n, date(int(m.group(1)), int(m.group(2)), 1)))
+    return sorted(out, key=lambda x: x[1])
+
+
+def compact_hourly_partition(part: str, month_start: date) -> Optional[int]:
+    """
+    hourly_snapshot_features 파티션 1개(KST 한 달)를 daily_rollup_state 기준 일 집계로 hourly_snapshot_daily에 옮기고 DROP
+    - daily_rollups가 아직 안 만든 날이 있으면 건드리지 않고 None 반환
+    - 반환: 집계 행 수
+    """
+    start_ts = datetime(month_start.year, month_start.month, 1, tzinfo=_REPORT_TZ)
+    end_ts = datetime.combine(_add_months(month_start, 1), datetime.min.time(), tzinfo=_REPORT_TZ)
+
+    with get_engine().begin() as conn:
+        unconsumed = conn.execute(text("""
+          SELECT COUNT(*)
+          FROM (
+            SELECT DISTINCT (snapshot_at AT TIME ZONE 'Asia/Seoul')::date AS d
+            FROM hourly_snapshots
+            WHERE snapshot_at >= :s AND snapshot_at < :e
+          ) days
+          LEFT JOIN daily_rollups r ON r.report_date = days.d
+          WHERE r.report_date IS NULL;
+        """), {"s": start_ts, "e": end_ts}).scalar()
+        if unconsumed:
+            return None
+
+        n = conn.execute(text(f"""
+          INSERT INTO hourly_snapshot_daily(
+            report_date, term_id, geo_id, support, max_z, median_wow, median_slope, max_latest,
+            breakout_hits, rising_hits, emerging_hits
+          )
+          SELECT
+            report_date, term_id, geo_id, support, max_z,
+            {_WEIGHTED_MEDIAN_SQL.format(col="wow_samples")},
+            {_WEIGHTED_MEDIAN_SQL.format(col="slope_samples")},
+            max_latest, breakout_hits, rising_hits, emerging_hits
+          FROM daily_rollup_state
+          WHERE report_date >= :ds AND report_date < :de
+          ON CONFLICT (report_date, term_id, geo_id) DO NOTHING;
+        """), {"ds": month_start, "de": _add_months(month_start, 1)}).rowcount
+        conn.execute(text("DELETE FROM daily_rollup_state WHERE report_date >= :ds AND report_date < :de;"),
+                     {"ds": month_start, "de": _add_months(month_start, 1)})
+
+        # 파티션 DROP은 메타데이터 작업 → 대량 DELETE/VACUUM 없음
+        conn.execute(text(f'DROP TABLE IF EXISTS "{part}";'))
+        conn.execute(text("DELETE FROM hourly_snapshots WHERE snapshot_at >= :s AND snapshot_at < :e;"),
+                     {"s": start_ts, "e": end_ts})
+
+    _known_partitions.discard(("hourly_snapshot_features", month_start))
+    return int(n or 0)
+
+
+def pack_series_partition(part: str, month_start: date) -> int:
+    """
+    trend_series 월 파티션 1개 → trend_series_packed (term, geo, 월)당 1행으로 압축 후 DROP
+    - 같은 월이 이미 packed에 있으면(재수집 등) 먼저 hot으로 풀어서 합친 뒤 다시 압축 (hot 값 우선)
+    - 반환: packed 행 수
+    """
+    with get_engine().begin() as conn:
+        conn.execute(text("""
+          INSERT INTO trend_series(term_id, geo_id, date, value, source, collected_at)
+          SELECT p.term_id, p.geo_id, (p.start_date + (u.i - 1)::int), u.v, p.source, p.collected_at
+          FROM trend_series_packed p
+          CROSS JOIN LATERAL unnest(p.vals) WITH ORDINALITY AS u(v, i)
+          WHERE p.month = :m AND u.v IS NOT NULL
+          ON CONFLICT (term_id, geo_id, date) DO NOTHING;
+        """), {"m": month_start})
+        conn.execute(text("DELETE FROM trend_series_packed WHERE month = :m;"), {"m": month_start})
+
+        n = conn.execute(text(f"""
+          INSERT INTO trend_series_packed(term_id, geo_id, month, start_date, vals, source, collected_at)
+          SELECT b.term_id, b.geo_id, :m, b.lo,
+                 array_agg(s.value::real ORDER BY g.d),
+                 b.source, b.collected_at
+          FROM (
+            SELECT term_id, geo_id, MIN(date) AS lo, MAX(date) AS hi,
+                   MAX(source) AS source, MAX(collected_at) AS collected_at
+            FROM "{part}"
+            GROUP BY term_id, geo_id
+          ) b
+          CROSS JOIN LATERAL generate_series(b.lo, b.hi, INTERVAL '1 day') AS g(d)
+          LEFT JOIN "{part}" s
+            ON s.term_id = b.term_id AND s.geo_id = b.geo_id AND s.date = g.d::date
+          GROUP BY b.term_id, b.geo_id, b.lo, b.source, b.collected_at;
+        """), {"m": month_start}).rowcount
+
+        conn.execute(text(f'DROP TABLE IF EXISTS "{part}";'))
+
+    _known_partitions.discard(("trend_series", month_start))
+    return int(n or 0)
+
+
+def pack_cold_series(cold_months: int) -> List[Tuple[str, int]]:
+    """
+    현재 월 기준 cold_months 이전 trend_series 파티션을 모두 packed로 이동
+    """
+    if cold_months <= 0:
+        return []
+    cutoff = _add_months(_month_floor(datetime.now(_REPORT_TZ).date()), -cold_months)
+    return [
+        (part, pack_series_partition(part, m))
+        for part, m in list_partitions("trend_series")
+        if m < cutoff
+    ]
+
+
+def apply_retention(hourly_months: int, series_months: int = 0) -> Dict[str, Any]:
+    """
+    - hourly_months: 이보다 오래된 hourly_snapshot_features 월 파티션 → 일 집계로 compaction 후 DROP
+    - series_months: >0이면 이보다 오래된 trend_series 월 파티션 + packed 행 삭제 (0 = 보관)
+    현재 월 기준 N개월 이전 "완결된" 파티션만 대상
+    """
+    this_month = _month_floor(datetime.now(_REPORT_TZ).date())
+    report: Dict[str, Any] = {"compacted": [], "skipped": [], "dropped": []}
+
+    if hourly_months > 0:
+        cutoff = _add_months(this_month, -hourly_months)
+        for part, m in list_partitions("hourly_snapshot_features"):
+            if m >= cutoff:
+                continue
+            n = compact_hourly_partition(part, m)
+            if n is None:
+                report["skipped"].append(part)
+            else:
+                report["compacted"].append((part, n))
+
+    if series_months > 0:
+        cutoff = _add_months(this_month, -series_months)
+        for part, m in list_partitions("trend_series"):
+            if m >= cutoff:
+                continue
+            with get_engine().begin() as conn:
+                conn.execute(text(f'DROP TABLE IF EXISTS "{part}";'))
+            _known_partitions.discard(("trend_series", m))
+            report["dropped"].append(part)
+        with get_engine().begin() as conn:
+            n = conn.execute(text("DELETE FROM trend_series_packed WHERE month < :c;"), {"c": cutoff}).rowcount
+        if n:
+            report["dropped"].append(f"trend_series_packed (<{cutoff.isoformat()}): {n} rows")
+
+    return report
 
 
 # ---------------------------
@@ -444,9 +1215,9 @@ def upsert_discovered_terms(rows: List[Dict[str, Any]]):
         return
 
     q = text("""
-      INSERT INTO discovered_terms(term, geo, source_term, kind, rank, score, status)
-      VALUES (:term, :geo, :source_term, :kind, :rank, :score, :status)
-      ON CONFLICT (term, geo) DO UPDATE SET
+      INSERT INTO discovered_terms(term_id, geo_id, source_term, kind, rank, score, status)
+      VALUES (:term_id, :geo_id, :source_term, :kind, :rank, :score, :status)
+      ON CONFLICT (term_id, geo_id) DO UPDATE SET
         source_term=EXCLUDED.source_term,
         kind=EXCLUDED.kind,
         rank=EXCLUDED.rank,
@@ -454,8 +1225,27 @@ def upsert_discovered_terms(rows: List[Dict[str, Any]]):
         status=discovered_terms.status,  -- ✅ 기존 승인/거절 상태 유지
         last_seen=NOW();
     """)
-    with engine.begin() as conn:
-        conn.execute(q, rows)
+    tids = resolve_term_ids({r["term"] for r in rows})
+    gids = resolve_geo_ids({r["geo"] for r in rows})
+    rows = _skip_unresolved(rows, tids, gids, lambda r: (r["term"], r["geo"]), "discovered_terms")
+
+    # 정규화 후 같은 (term_id, geo_id)가 한 배치에 두 번 나오면 ON CONFLICT가 같은 행을 두 번 건드림 → 마지막 것만
+    payload: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for r in rows:
+        key = (tids[r["term"]], gids[r["geo"]])
+        payload[key] = {
+            "term_id": key[0],
+            "geo_id": key[1],
+            "source_term": r.get("source_term"),
+            "kind": r.get("kind"),
+            "rank": r.get("rank"),
+            "score": r.get("score"),
+            "status": r.get("status", "new"),
+        }
+    if not payload:
+        return
+    with get_engine().begin() as conn:
+        conn.execute(q, list(payload.values()))
 
 
 def get_approved_terms(geo: Optional[str] = None, limit: int = 500) -> List[str]:
@@ -463,17 +1253,20 @@ def get_approved_terms(geo: Optional[str] = None, limit: int = 500) -> List[str]
     status='approved'인 term 목록 반환 (geo 옵션)
     """
     if geo:
+        gid = resolve_geo_ids([geo], create=False).get(geo)
+        if gid is None:
+            return []
         q = text("""
-          SELECT term
+          SELECT term_id
           FROM discovered_terms
-          WHERE status='approved' AND geo=:geo
+          WHERE status='approved' AND geo_id=:geo_id
           ORDER BY last_seen DESC
           LIMIT :limit;
         """)
-        params = {"geo": geo, "limit": limit}
+        params = {"geo_id": gid, "limit": limit}
     else:
         q = text("""
-          SELECT term
+          SELECT term_id
           FROM discovered_terms
           WHERE status='approved'
           ORDER BY last_seen DESC
@@ -481,9 +1274,10 @@ def get_approved_terms(geo: Optional[str] = None, limit: int = 500) -> List[str]
         """)
         params = {"limit": limit}
 
-    with engine.begin() as conn:
+    with get_engine().begin() as conn:
         rows = conn.execute(q, params).fetchall()
-    return [r[0] for r in rows]
+    tn = term_names(r[0] for r in rows)
+    return [tn[r[0]] for r in rows if r[0] in tn]
 
 
 # saved db to slack
@@ -492,16 +1286,34 @@ def get_candidates_for_slack(
     severities: List[str],
     limit: int = 20,
     min_latest: float = 2.0,
+    pairs: Optional[List[Tuple[str, str]]] = None,
 ) -> List[Dict[str, Any]]:
     """
     trend_features에서 Slack 발송 후보를 severity/품질 기준으로 가져온다.
+    pairs: [(term, geo), ...] 가 주어지면 해당 조합만 평가 (NOTIFY 기반 dispatcher용)
     """
-    q = text("""
-      SELECT term, geo, wow_change, z_score, slope_7d, latest, severity, evidence_json
+    params = {"d": as_of_date, "sevs": severities, "min_latest": min_latest, "limit": limit}
+    pair_filter = ""
+    if pairs is not None:
+        tids = resolve_term_ids({t for t, _ in pairs}, create=False)
+        gids = resolve_geo_ids({g for _, g in pairs}, create=False)
+        id_pairs = [(tids[t], gids[g]) for t, g in pairs if t in tids and g in gids]
+        if not id_pairs:
+            return []
+        pair_filter = """
+        AND (term_id, geo_id) IN (
+          SELECT p.term_id, p.geo_id
+          FROM unnest(CAST(:p_terms AS int[]), CAST(:p_geos AS smallint[])) AS p(term_id, geo_id)
+        )"""
+        params["p_terms"] = [t for t, _ in id_pairs]
+        params["p_geos"] = [g for _, g in id_pairs]
+
+    q = text(f"""
+      SELECT term_id, geo_id, wow_change, z_score, slope_7d, latest, severity, evidence_json
       FROM trend_features
       WHERE as_of_date = :d
         AND severity = ANY(:sevs)
-        AND latest >= :min_latest
+        AND latest >= :min_latest{pair_filter}
       ORDER BY
         CASE
           WHEN severity='BREAKOUT' THEN 4
@@ -513,19 +1325,200 @@ def get_candidates_for_slack(
         z_score DESC
       LIMIT :limit;
     """)
-    with engine.begin() as conn:
-        rows = conn.execute(q, {"d": as_of_date, "sevs": severities, "min_latest": min_latest, "limit": limit}).fetchall()
+    with get_engine().begin() as conn:
+        rows = conn.execute(q, params).fetchall()
+
+    out = _feature_rows_with_names(rows)
+    for o, r in zip(out, rows):
+        o["evidence"] = r[7] or {}   # jsonb
+    return out
+
+
+# ---------------------------
+# DATA VERSION (dashboard 캐시 무효화)
+# ---------------------------
+def bump_data_version(reason: str = "") -> int:
+    """
+    화면에 보이는 데이터(trend_series / trend_features)를 커밋한 뒤 호출 → 새 버전 반환
+    """
+    with get_engine().begin() as conn:
+        v = conn.execute(text("""
+          UPDATE data_version SET version = version + 1, reason = :r, bumped_at = NOW()
+          WHERE id = 1
+          RETURNING version;
+        """), {"r": reason}).scalar()
+    return int(v or 0)
+
+
+# ---------------------------
+# WORK QUEUE (geo 샤딩)
+# ---------------------------
+def enqueue_work_units(run_date: str, timeframe: str, units: List[Tuple[str, int, List[str]]]) -> int:
+    """
+    units: [(geo, batch_no, terms), ...]
+    같은 (run_date, geo, batch_no)가 이미 있으면 다시 queued로 되돌림 (재실행)
+    """
+    if not units:
+        return 0
+    gids = resolve_geo_ids({u[0] for u in units})
+    units = _skip_unresolved(list(units), {}, gids, lambda u: (None, u[0]), "work_units")
+    if not units:
+        return 0
+    q = text("""
+      INSERT INTO work_units(run_date, geo_id, batch_no, terms, timeframe)
+      VALUES (:run_date, :geo_id, :batch_no, :terms, :timeframe)
+      ON CONFLICT (run_date, geo_id, batch_no) DO UPDATE SET
+        terms=EXCLUDED.terms,
+        timeframe=EXCLUDED.timeframe,
+        status='queued',
+        attempts=0,
+        lease_owner=NULL,
+        lease_expires_at=NULL,
+        result_json=NULL,
+        error=NULL,
+        enqueued_at=NOW(),
+        finished_at=NULL;
+    """)
+    payload = [{
+        "run_date": run_date,
+        "geo_id": gids[geo],
+        "batch_no": batch_no,
+        "terms": list(terms),
+        "timeframe": timeframe,
+    } for geo, batch_no, terms in units]
+    with get_engine().begin() as conn:
+        conn.execute(q, payload)
+    return len(payload)
+
+
+def claim_work_unit(worker_id: str, lease_sec: int, max_attempts: int = 3) -> Optional[Dict[str, Any]]:
+    """
+    queued 또는 lease 만료된 unit 1개를 잡음 (FOR UPDATE SKIP LOCKED → 워커끼리 대기 없음)
+    """
+    q = text("""
+      UPDATE work_units w SET
+        status='leased',
+        lease_owner=:worker,
+        lease_expires_at=NOW() + make_interval(secs => :lease_sec),
+        attempts=w.attempts + 1
+      WHERE w.id = (
+        SELECT id FROM work_units
+        WHERE (status = 'queued' OR (status = 'leased' AND lease_expires_at < NOW()))
+          AND attempts < :max_attempts
+        ORDER BY id
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1
+      )
+      RETURNING w.id, w.run_date, w.geo_id, w.terms, w.timeframe, w.attempts;
+    """)
+    with get_engine().begin() as conn:
+        row = conn.execute(q, {"worker": worker_id, "lease_sec": lease_sec, "max_attempts": max_attempts}).fetchone()
+    if not row:
+        return None
+    return {
+        "id": int(row[0]),
+        "run_date": row[1].isoformat(),
+        "geo": geo_names([row[2]]).get(row[2], ""),
+        "terms": list(row[3]),
+        "timeframe": row[4],
+        "attempts": int(row[5]),
+    }
+
+
+def heartbeat_work_unit(unit_id: int, worker_id: str, lease_sec: int) -> bool:
+    """
+    lease 연장. 이미 다른 워커가 가져갔으면 False
+    """
+    q = text("""
+      UPDATE work_units SET lease_expires_at = NOW() + make_interval(secs => :lease_sec)
+      WHERE id = :id AND status = 'leased' AND lease_owner = :worker;
+    """)
+    with get_engine().begin() as conn:
+        n = conn.execute(q, {"id": unit_id, "worker": worker_id, "lease_sec": lease_sec}).rowcount
+    return bool(n)
+
+
+def finish_work_unit(
+    unit_id: int,
+    worker_id: str,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+    max_attempts: int = 3,
+):
+    """
+    성공: done + result 저장 / 실패: 시도 횟수 남으면 queued로, 아니면 failed
+    """
+    if error is None:
+        q = text("""
+          UPDATE work_units SET
+            status='done', result_json=CAST(:r AS jsonb), error=NULL,
+            lease_owner=NULL, lease_expires_at=NULL, finished_at=NOW()
+          WHERE id = :id AND lease_owner = :worker;
+        """)
+        params = {"id": unit_id, "worker": worker_id, "r": json.dumps(result or {})}
+    else:
+        q = text("""
+          UPDATE work_units SET
+            status = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'queued' END,
+            error=:err, lease_owner=NULL, lease_expires_at=NULL,
+            finished_at = CASE WHEN attempts >= :max_attempts THEN NOW() ELSE NULL END
+          WHERE id = :id AND lease_owner = :worker;
+        """)
+        params = {"id": unit_id, "worker": worker_id, "err": error[:2000], "max_attempts": max_attempts}
+    with get_engine().begin() as conn:
+        conn.execute(q, params)
+
+
+def work_queue_status(run_date: str, max_attempts: int = 3) -> Dict[str, Any]:
+    """
+    run_date 큐 상태 + done unit 결과 합계
+    - lease 만료 + 시도 소진 unit은 여기서 failed로 정리
+    """
+    with get_engine().begin() as conn:
+        conn.execute(text("""
+          UPDATE work_units SET status='failed', error=COALESCE(error, 'lease expired'), finished_at=NOW()
+          WHERE run_date = :d AND status = 'leased'
+            AND lease_expires_at < NOW() AND attempts >= :max_attempts;
+        """), {"d": run_date, "max_attempts": max_attempts})
+        counts = dict(conn.execute(text("""
+          SELECT status, COUNT(*) FROM work_units WHERE run_date = :d GROUP BY status;
+        """), {"d": run_date}).fetchall())
+        results = [r[0] for r in conn.execute(text("""
+          SELECT result_json FROM work_units WHERE run_date = :d AND status = 'done';
+        """), {"d": run_date}).fetchall()]
+    return {"counts": {k: int(v) for k, v in counts.items()}, "results": results}
+
+
+# ---------------------------
+# RUN METRICS
+# ---------------------------
+def insert_run_metrics(m) -> int:
+    """
+    m: app.metrics.RunMetrics → run 1행 + stage/counter 행들
+    """
+    base = {
+        "run_id": m.run_id,
+        "command": m.command,
+        "started_at": m.started_at,
+        "finished_at": m.finished_at,
+        "ok": m.ok,
+    }
+    total = ((m.finished_at or m.started_at) - m.started_at).total_seconds()
+    rows = [{**base, "kind": "run", "name": "total", "seconds": total,
+             "calls": 1, "errors": int(not m.ok), "value": None}]
+    for name, st in m.stages.items():
+        rows.append({**base, "kind": "stage", "name": name, "seconds": st.seconds,
+                     "calls": st.calls, "errors": st.errors, "value": None})
+    for name, v in m.counters.items():
+        rows.append({**base, "kind": "counter", "name": name, "seconds": None,
+                     "calls": None, "errors": None, "value": float(v)})
+
+    q = text("""
+      INSERT INTO run_metrics(run_id, command, started_at, finished_at, ok, kind, name, seconds, calls, errors, value)
+      VALUES (:run_id, :command, :started_at, :finished_at, :ok, :kind, :name, :seconds, :calls, :errors, :value)
+      ON CONFLICT (run_id, kind, name) DO NOTHING;
+    """)
+    with get_engine().begin() as conn:
+        conn.execute(q, rows)
+    return len(rows)
 
-    out = []
-    for r in rows:
-        out.append({
-            "term": r[0],
-            "geo": r[1],
-            "wow_change": float(r[2]),
-            "z_score": float(r[3]),
-            "slope_7d": float(r[4]),
-            "latest": float(r[5]),
-            "severity": r[6],
-            "evidence": r[7] or {},   # jsonb
-        })
-    return out
\ No newline at end of file
@@ -0,0 +1,12 @@
+# app/terms.py
+from __future__ import annotations
+
+
+def normalize_term(t: str) -> str:
+    # "겹치지 않게"를 좀 더 강하게: 공백 정리 + 소문자
+    # ✅ terms 사전의 canonical 키 규칙 (DB 함수 normalize_term()과 동일하게 유지할 것)
+    return " ".join(t.strip().lower().split())
+
+
+def normalize_geo(g: str) -> str:
+    return (g or "").strip().upper()
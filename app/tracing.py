@@ -0,0 +1,160 @@
+from __future__ import annotations
+import json
+import os
+import secrets
+import threading
+import time
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+# ✅ stdlib만 사용하는 span 트레이서 (--trace / TRACE_DIR). 실행 1번 = trace 1개
+# - span 부모는 contextvar로 추적 → serve 잡 스레드끼리 섞이지 않음
+# - 끝나면 OTLP/JSON(resourceSpans) 형태로 파일 1개 export → 뷰어/collector에 그대로 넣을 수 있음
+# - trace 밖에서 span()은 no-op
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set(self, **attrs: Any):
+        self.attrs.update(attrs)
+
+
+class _NoopSpan:
+    def set(self, **attrs: Any):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+@dataclass
+class Trace:
+    command: str
+    trace_id: str = field(default_factory=lambda: secrets.token_hex(16))
+    spans: List[Span] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, sp: Span):
+        with self._lock:
+            self.spans.append(sp)
+
+
+_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("span", default=None)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Any]:
+    tr = _trace.get()
+    if tr is None:
+        yield _NOOP
+        return
+    parent = _span.get()
+    sp = Span(
+        name=name,
+        trace_id=tr.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        attrs=dict(attrs),
+    )
+    token = _span.set(sp)
+    try:
+        yield sp
+    except BaseException as e:
+        sp.error = f"{e.__class__.__name__}: {e}"
+        raise
+    finally:
+        sp.end_ns = time.time_ns()
+        _span.reset(token)
+        tr.add(sp)
+
+
+def set_attrs(**attrs: Any):
+    """
+    현재 span에 속성 추가 (trace 밖이면 무시)
+    """
+    sp = _span.get()
+    if sp is not None:
+        sp.set(**attrs)
+
+
+@contextmanager
+def trace(command: str, out_dir: str) -> Iterator[Trace]:
+    """
+    root span = command. 끝나면 out_dir/trace_<command>_<ts>_<trace_id 앞 8자>.json으로 export
+    """
+    tr = Trace(command=command)
+    t_token = _trace.set(tr)
+    try:
+        with span(command, command=command):
+            yield tr
+    finally:
+        _trace.reset(t_token)
+        try:
+            path = export(tr, out_dir)
+            print(f"[trace] {path}", flush=True)
+        except OSError as e:
+            print(f"[trace] export failed: {e}", flush=True)
+
+
+# ---------------------------
+# EXPORT (OTLP/JSON)
+# ---------------------------
+def _otlp_value(v: Any) -> Dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+def to_otlp(tr: Trace) -> Dict[str, Any]:
+    spans = []
+    for sp in sorted(tr.spans, key=lambda s: s.start_ns):
+        out = {
+            "traceId": sp.trace_id,
+            "spanId": sp.span_id,
+            "name": sp.name,
+            "kind": 1,
+            "startTimeUnixNano": str(sp.start_ns),
+            "endTimeUnixNano": str(sp.end_ns or sp.start_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in sp.attrs.items()],
+            "status": {"code": 2, "message": sp.error} if sp.error else {"code": 1},
+        }
+        if sp.parent_id:
+            out["parentSpanId"] = sp.parent_id
+        spans.append(out)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": "kb-trends-slack-agent"}},
+                {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+            ]},
+            "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+def export(tr: Trace, out_dir: str) -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(out_dir, f"trace_{tr.command}_{ts}_{tr.trace_id[:8]}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(to_otlp(tr), f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return path
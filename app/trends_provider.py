@@ -5,6 +5,8 @@ import pandas as pd
 import time
 import random
 
+from app import metrics, tracing
+
 @dataclass
 class TrendResult:
     term: str
@@ -23,8 +25,11 @@ class PyTrendsProvider(TrendsProvider):
         self.retries = retries
         self.base_sleep = base_sleep
 
-    def _sleep_jitter(self, seconds: float):
-        time.sleep(seconds + random.uniform(0.2, 0.9))
+    def _sleep_jitter(self, seconds: float, reason: str = "pacing"):
+        seconds = seconds + random.uniform(0.2, 0.9)
+        metrics.inc("fetch_sleep_seconds", seconds)
+        with tracing.span("provider.sleep", reason=reason, seconds=round(seconds, 3)):
+            time.sleep(seconds)
 
     def interest_over_time(self, terms: List[str], geo: str, timeframe: str) -> List[TrendResult]:
         out: List[TrendResult] = []
@@ -33,34 +38,39 @@ class PyTrendsProvider(TrendsProvider):
         for i in range(0, len(terms), batch_size):
             batch = terms[i:i + batch_size]
 
-            # ✅ 배치 사이 기본 딜레이
-            self._sleep_jitter(self.base_sleep)
+            with tracing.span("provider.batch", geo=geo, terms=len(batch), batch=i // batch_size) as sp:
+                # ✅ 배치 사이 기본 딜레이
+                self._sleep_jitter(self.base_sleep)
 
-            # ✅ 429 대응 재시도
-            attempt = 0
-            while True:
-                try:
-                    self.pytrends.build_payload(batch, timeframe=timeframe, geo=geo)
-                    df = self.pytrends.interest_over_time()
-                    break
-                except Exception as e:
-                    msg = str(e)
-                    is_429 = ("429" in msg) or ("TooManyRequests" in e.__class__.__name__)
-                    attempt += 1
-                    if (not is_429) or (attempt > self.retries):
-                        raise
+                # ✅ 429 대응 재시도
+                attempt = 0
+                while True:
+                    try:
+                        metrics.inc("fetch_requests")
+                        self.pytrends.build_payload(batch, timeframe=timeframe, geo=geo)
+                        df = self.pytrends.interest_over_time()
+                        break
+                    except Exception as e:
+                        msg = str(e)
+                        is_429 = ("429" in msg) or ("TooManyRequests" in e.__class__.__name__)
+                        attempt += 1
+                        if is_429:
+                            metrics.inc("fetch_429")
+                        if (not is_429) or (attempt > self.retries):
+                            raise
 
-                    # 지수 백오프: 2s, 4s, 8s, 16s...
-                    wait = (2 ** (attempt - 1)) * 4.0
-                    self._sleep_jitter(wait)
+                        # 지수 백오프: 2s, 4s, 8s, 16s...
+                        wait = (2 ** (attempt - 1)) * 4.0
+                        self._sleep_jitter(wait, reason="backoff_429")
 
-            if df is None or df.empty:
-                continue
-            if "isPartial" in df.columns:
-                df = df.drop(columns=["isPartial"])
+                sp.set(attempts=attempt + 1, points=0 if df is None else len(df))
+                if df is None or df.empty:
+                    continue
+                if "isPartial" in df.columns:
+                    df = df.drop(columns=["isPartial"])
 
-            for t in batch:
-                if t in df.columns:
-                    out.append(TrendResult(term=t, geo=geo, timeframe=timeframe, series=df[t]))
+                for t in batch:
+                    if t in df.columns:
+                        out.append(TrendResult(term=t, geo=geo, timeframe=timeframe, series=df[t]))
 
         return out
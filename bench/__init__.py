@@ -0,0 +1,2 @@
+# bench/__init__.py
+# 성능 벤치마크: python -m bench (README "Benchmarks" 참고)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from bench.cases import CASES, DB_CASES, cleanup_db
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return ""
+
+
+def run_cases(names: List[str], with_db: bool) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    cases = dict(CASES)
+    if with_db:
+        cases.update(DB_CASES)
+    for name, fn in cases.items():
+        if names and name not in names:
+            continue
+        print(f"[bench] {name} ...", file=sys.stderr, flush=True)
+        results.update(fn())
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "db": with_db,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Tuple[str, float, float, float, bool]]:
+    """
+    [(name, baseline, current, change, regressed)] — change는 '좋아진 방향'이 +
+    """
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("value"):
+            continue
+        b, c = float(base["value"]), float(cur["value"])
+        change = (c - b) / b if cur["better"] == "higher" else (b - c) / b
+        rows.append((name, b, c, change, change < -threshold))
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m bench", description="detector / backfill / storage benchmarks")
+    p.add_argument("cases", nargs="*", help=f"subset of: {', '.join(list(CASES) + list(DB_CASES))}")
+    p.add_argument("--db", action="store_true", help="also run storage/rollup cases against POSTGRES_DSN")
+    p.add_argument("--allow-writes", action="store_true",
+                   help="required with --db: writes bench rows and dictionary entries to POSTGRES_DSN (use a scratch DB)")
+    p.add_argument("--out", default="", help="write results JSON here")
+    p.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    p.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    p.add_argument("--threshold", type=float, default=0.20, help="fail if any metric is worse by more than this")
+    args = p.parse_args(argv)
+
+    if args.db and not args.allow_writes:
+        p.error("--db writes bench rows to POSTGRES_DSN; pass --allow-writes (scratch DB only)")
+
+    try:
+        current = run_cases(args.cases, args.db)
+    finally:
+        if args.db:
+            cleanup_db()
+
+    for name, r in sorted(current["results"].items()):
+        print(f"{name:<48} {r['value']:>14,.3f} {r['unit']}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"baseline saved → {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline} (run with --save-baseline)")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold)
+    regressed = [r for r in rows if r[4]]
+    print("")
+    for name, b, c, change, bad in rows:
+        print(f"{'REGRESSION' if bad else 'ok':<10} {name:<48} {b:>12,.3f} → {c:>12,.3f} ({change:+.1%})")
+    if regressed:
+        print(f"\n{len(regressed)} metric(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
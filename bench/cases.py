@@ -0,0 +1,197 @@
+from __future__ import annotations
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+from bench import datasets
+
+# 결과 1개 = {"value": float, "unit": str, "better": "higher" | "lower"}
+Result = Dict[str, Any]
+CASES: Dict[str, Callable[[], Dict[str, Result]]] = {}
+DB_CASES: Dict[str, Callable[[], Dict[str, Result]]] = {}
+
+BENCH_GEO = "ZZ"  # ISO user-assigned 코드 → 실제 geo와 안 겹침
+KST = timezone(timedelta(hours=9))
+
+
+def case(name: str, db: bool = False):
+    def deco(fn):
+        (DB_CASES if db else CASES)[name] = fn
+        return fn
+    return deco
+
+
+def _timeit(fn: Callable[[], Any], repeat: int = 5) -> List[float]:
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def higher(value: float, unit: str) -> Result:
+    return {"value": round(value, 3), "unit": unit, "better": "higher"}
+
+
+def lower(value: float, unit: str) -> Result:
+    return {"value": round(value, 3), "unit": unit, "better": "lower"}
+
+
+# ---------------------------
+# DETECTOR / BACKFILL (DB 불필요)
+# ---------------------------
+@case("detector")
+def bench_detector() -> Dict[str, Result]:
+    from app.detector import compute_signal
+
+    series = datasets.make_series(500, 90)
+    one = series[0][2]
+
+    per_call = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(200):
+            compute_signal(one, term="bench", geo=BENCH_GEO)
+        per_call.append((time.perf_counter() - t0) / 200)
+
+    def batch():
+        for term, geo, s in series:
+            compute_signal(s, term=term, geo=geo)
+
+    secs = min(_timeit(batch, repeat=3))
+    return {
+        "detector.per_call_us": lower(statistics.median(per_call) * 1e6, "us"),
+        "detector.batch_series_per_sec": higher(len(series) / secs, "series/s"),
+    }
+
+
+@case("backfill")
+def bench_backfill() -> Dict[str, Result]:
+    from app.backfill import scan_series_events
+
+    n_series, days = 50, 160
+    series = datasets.make_series(n_series, days)
+    report_start = datasets.END_DATE - timedelta(days=90)
+
+    def scan():
+        n = 0
+        for term, geo, s in series:
+            n += len(scan_series_events(s, term, geo, report_start, ["RISING", "BREAKOUT"]))
+        return n
+
+    secs = min(_timeit(scan, repeat=3))
+    return {
+        "backfill.series_days_per_sec": higher(n_series * 90 / secs, "series-days/s"),
+    }
+
+
+# ---------------------------
+# STORAGE (docker-compose Postgres, --db)
+# ---------------------------
+@case("storage_upsert", db=True)
+def bench_storage_upsert() -> Dict[str, Result]:
+    from app import storage_pg
+
+    rows = datasets.make_series_rows(100, 90, BENCH_GEO)  # 9,000 rows
+    t0 = time.perf_counter()
+    storage_pg.upsert_trend_series(rows)
+    series_secs = time.perf_counter() - t0
+
+    feats = datasets.make_feature_rows(200, datasets.END_DATE.isoformat(), BENCH_GEO)
+    t0 = time.perf_counter()
+    for f in feats:
+        storage_pg.upsert_feature(
+            term=f["term"], geo=f["geo"], as_of_date=f["as_of_date"], wow=f["wow"], z=f["z"],
+            slope=f["slope"], latest=f["latest"], severity=f["severity"], evidence=f["evidence"],
+        )
+    single_secs = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    storage_pg.upsert_features(feats, notify=False)
+    batch_secs = time.perf_counter() - t0
+
+    return {
+        "storage.upsert_trend_series_rows_per_sec": higher(len(rows) / series_secs, "rows/s"),
+        "storage.upsert_feature_rows_per_sec": higher(len(feats) / single_secs, "rows/s"),
+        "storage.upsert_features_batch_rows_per_sec": higher(len(feats) / batch_secs, "rows/s"),
+    }
+
+
+@case("daily_rollup", db=True)
+def bench_daily_rollup() -> Dict[str, Result]:
+    from app import storage_pg
+
+    days = datasets.bench_days(30)
+    t0 = time.perf_counter()
+    for d in days:
+        for hour in range(24):
+            at = datetime(d.year, d.month, d.day, hour, tzinfo=KST).isoformat()
+            rows = datasets.make_snapshot_rows(10, hour, BENCH_GEO)
+            sid = storage_pg.upsert_hourly_snapshot(at, geo_count=1, term_count=10, timeframe="bench")
+            storage_pg.insert_hourly_snapshot_features(sid, rows)
+            storage_pg.apply_snapshot_to_daily_state(sid)
+    hourly_secs = (time.perf_counter() - t0) / (len(days) * 24)
+
+    lat = []
+    for d in days:
+        t1 = time.perf_counter()
+        storage_pg.compute_daily_rollup(d.isoformat())
+        lat.append(time.perf_counter() - t1)
+
+    range_secs = min(_timeit(
+        lambda: storage_pg.compute_daily_rollups(days[0].isoformat(), days[-1].isoformat()), repeat=3
+    ))
+    return {
+        "rollup.hourly_write_ms": lower(hourly_secs * 1000, "ms"),
+        "rollup.compute_daily_rollup_p50_ms": lower(statistics.median(lat) * 1000, "ms"),
+        "rollup.compute_daily_rollups_30d_ms": lower(range_secs * 1000, "ms"),
+    }
+
+
+# terms / geos를 참조하는 테이블 (사전 행 삭제 전 남은 참조 확인용)
+_TERM_REFS = (
+    "trend_series", "trend_series_packed", "trend_features", "alerts", "discovered_terms",
+    "hourly_snapshot_features", "hourly_snapshot_daily", "daily_rollup_state", "snapshot_deltas",
+)
+_GEO_REFS = _TERM_REFS + ("work_units", "feature_day_stats")
+
+
+def cleanup_db():
+    """
+    벤치가 넣은 행 정리 (bench term*, geo ZZ, 2001년 스냅샷) + 사전(terms / geos)에 추가된 bench 항목
+    """
+    from sqlalchemy import text
+    from app.db import get_engine
+    from app import storage_pg
+
+    days = datasets.bench_days(30)
+    start = datetime(days[0].year, days[0].month, days[0].day, tzinfo=KST)
+    end = datetime(days[-1].year, days[-1].month, days[-1].day, tzinfo=KST) + timedelta(days=1)
+    with get_engine().begin() as conn:
+        conn.execute(text("DELETE FROM hourly_snapshots WHERE snapshot_at >= :s AND snapshot_at < :e;"),
+                     {"s": start, "e": end})
+        conn.execute(text("DELETE FROM daily_rollup_state WHERE report_date >= :s AND report_date <= :e;"),
+                     {"s": days[0], "e": days[-1]})
+        gid = conn.execute(text("SELECT id FROM geos WHERE geo = :g;"), {"g": BENCH_GEO}).scalar()
+        if gid is not None:
+            for table in ("trend_series", "trend_series_packed", "trend_features", "alerts",
+                          "discovered_terms", "hourly_snapshot_daily", "work_units"):
+                conn.execute(text(f"DELETE FROM {table} WHERE geo_id = :g;"), {"g": gid})
+
+    for part, m in storage_pg.list_partitions("hourly_snapshot_features"):
+        if m.year == days[0].year:
+            with get_engine().begin() as conn:
+                conn.execute(text(f'DROP TABLE IF EXISTS "{part}";'))
+
+    # 사전 항목: 다른 데이터가 아직 참조하지 않는 것만
+    term_unused = " AND ".join(f"NOT EXISTS (SELECT 1 FROM {t} x WHERE x.term_id = terms.id)" for t in _TERM_REFS)
+    geo_unused = " AND ".join(f"NOT EXISTS (SELECT 1 FROM {t} x WHERE x.geo_id = geos.id)" for t in _GEO_REFS)
+    with get_engine().begin() as conn:
+        n_terms = conn.execute(text(f"DELETE FROM terms WHERE term LIKE :pat AND {term_unused};"),
+                               {"pat": "bench term %"}).rowcount
+        n_geos = conn.execute(text(f"DELETE FROM geos WHERE geo = :g AND {geo_unused};"),
+                              {"g": BENCH_GEO}).rowcount
+    print(f"[bench] cleanup: removed {n_terms} bench terms, {n_geos} bench geo", file=sys.stderr)
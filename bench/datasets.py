@@ -0,0 +1,86 @@
+from __future__ import annotations
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ✅ 고정 seed 합성 데이터 → 실행마다 같은 입력 (결과 비교가 의미 있도록)
+SEED = 20251220
+END_DATE = date(2025, 12, 20)
+
+
+def make_series(n_series: int, days: int, seed: int = SEED) -> List[Tuple[str, str, pd.Series]]:
+    """
+    Google Trends 비슷한 0~100 일 단위 시계열 n_series개
+    - 주간 계절성 + 노이즈, 1/4은 마지막 2~3주에 상승(신호가 실제로 나오게)
+    """
+    rng = np.random.RandomState(seed)
+    idx = pd.date_range(end=pd.Timestamp(END_DATE), periods=days, freq="D")
+    t = np.arange(days, dtype=float)
+    out = []
+    for i in range(n_series):
+        base = rng.uniform(5, 40)
+        weekly = rng.uniform(0, 5) * np.sin(2 * np.pi * t / 7.0 + rng.uniform(0, 6.28))
+        noise = rng.normal(0, base * 0.15, size=days)
+        y = base + weekly + noise
+        if i % 4 == 0:
+            ramp_len = int(rng.randint(14, 22))
+            y[-ramp_len:] += np.linspace(0, rng.uniform(20, 60), ramp_len)
+        y = np.clip(np.round(y), 0, 100)
+        out.append((f"bench term {i:05d}", "KR", pd.Series(y, index=idx, dtype=float)))
+    return out
+
+
+def make_series_rows(n_terms: int, days: int, geo: str, seed: int = SEED) -> List[Tuple[str, str, str, float, str]]:
+    """
+    upsert_trend_series 입력 형태: (term, geo, 'YYYY-MM-DD', value, source)
+    """
+    rows = []
+    for term, _, s in make_series(n_terms, days, seed):
+        for ts, v in s.items():
+            rows.append((term, geo, ts.strftime("%Y-%m-%d"), float(v), "bench"))
+    return rows
+
+
+def make_feature_rows(n: int, as_of_date: str, geo: str, seed: int = SEED) -> List[Dict[str, Any]]:
+    """
+    upsert_feature(s) 입력 형태
+    """
+    rng = np.random.RandomState(seed)
+    sev = ["WATCH", "EMERGING", "RISING", "BREAKOUT"]
+    return [{
+        "term": f"bench term {i:05d}",
+        "geo": geo,
+        "as_of_date": as_of_date,
+        "wow": float(rng.uniform(-0.5, 2.0)),
+        "z": float(rng.uniform(-1, 5)),
+        "slope": float(rng.uniform(-2, 4)),
+        "latest": float(rng.uniform(0, 100)),
+        "severity": sev[i % 4],
+        "evidence": {"bench": True},
+    } for i in range(n)]
+
+
+def make_snapshot_rows(n_terms: int, hour: int, geo: str, seed: int = SEED) -> List[Dict[str, Any]]:
+    """
+    hourly 스냅샷 top 행 (insert_hourly_snapshot_features 입력). 시간마다 값이 조금씩 바뀜
+    """
+    rng = np.random.RandomState(seed + hour)
+    sev = ["WATCH", "EMERGING", "RISING", "BREAKOUT"]
+    return [{
+        "term": f"bench term {i:05d}",
+        "geo": geo,
+        "wow_change": float(rng.uniform(-0.5, 2.0)),
+        "z_score": float(rng.uniform(-1, 5)),
+        "slope_7d": float(rng.uniform(-2, 4)),
+        "latest": float(rng.uniform(0, 100)),
+        "severity": sev[(i + hour) % 4],
+    } for i in range(n_terms)]
+
+
+def bench_days(n: int, start: date = date(2001, 1, 1)) -> List[date]:
+    """
+    DB 벤치용 날짜: 실제 데이터와 겹치지 않는 과거 구간
+    """
+    return [start + timedelta(days=i) for i in range(n)]
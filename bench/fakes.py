@@ -0,0 +1,58 @@
+from __future__ import annotations
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, List
+
+from app import metrics
+from app.trends_provider import TrendResult, TrendsProvider
+from bench.synthetic import generate_series
+
+
+class FakeProvider(TrendsProvider):
+    """
+    네트워크 없이 합성 시계열을 돌려주는 provider (PyTrendsProvider와 같은 배치 단위/카운터)
+    - batch_latency_ms: 배치마다 Google 응답 시간 흉내
+    """
+
+    def __init__(self, days: int = 90, end: date | None = None, seed: int = 0,
+                 batch_size: int = 3, batch_latency_ms: float = 0.0):
+        self.days = days
+        self.end = end or date.today()
+        self.seed = seed
+        self.batch_size = batch_size
+        self.batch_latency_ms = batch_latency_ms
+
+    def interest_over_time(self, terms: List[str], geo: str, timeframe: str) -> List[TrendResult]:
+        out: List[TrendResult] = []
+        for i in range(0, len(terms), self.batch_size):
+            metrics.inc("fetch_requests")
+            if self.batch_latency_ms:
+                time.sleep(self.batch_latency_ms / 1000.0)
+            for t in terms[i:i + self.batch_size]:
+                _, s = generate_series(t, geo, self.days, self.end, self.seed)
+                out.append(TrendResult(term=t, geo=geo, timeframe=timeframe, series=s))
+        return out
+
+
+class FakeSlack:
+    """
+    slack_notifier.post_webhook 대체: payload만 모아 둠
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.payloads: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def post_webhook(self, webhook_url: str, payload: Dict[str, Any]) -> None:
+        with metrics.stage("slack_send"):
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000.0)
+            with self._lock:
+                self.payloads.append(payload)
+        metrics.inc("slack_messages")
+
+    def count(self, channel: str | None = None) -> int:
+        with self._lock:
+            return sum(1 for p in self.payloads if channel is None or p.get("channel") == channel)
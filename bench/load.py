@@ -0,0 +1,218 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterator, List
+from urllib.parse import quote
+
+from app import metrics
+from bench.fakes import FakeProvider, FakeSlack
+from bench.synthetic import iter_rows, synthetic_geos, synthetic_terms
+
+# ✅ 규모 end-to-end 하네스: 합성 데이터 적재 → run → hourly → daily → slack (→ dashboard GET)
+# provider/Slack은 fake, DB는 진짜 → 반드시 scratch(docker-compose) DB에서만 (--allow-writes)
+# hourly/daily는 "오늘" 스냅샷/rollup을 실제로 씀. 합성 term은 terms 사전에 남음 (--cleanup은 geo별 행만 정리)
+
+_GEO_TABLES = (
+    "trend_series", "trend_series_packed", "trend_features", "alerts", "discovered_terms", "work_units",
+    "hourly_snapshot_features", "hourly_snapshot_daily", "daily_rollup_state", "snapshot_deltas",
+)
+
+
+def _max_rss_mb() -> float:
+    # linux: KiB, macOS: bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+@contextmanager
+def _measure(report: Dict[str, Any], name: str, items: int | None = None) -> Iterator[Dict[str, Any]]:
+    """
+    단계 1개: wall time, items/s, tracemalloc peak, 하위 stage/counter (app.metrics)
+    """
+    out: Dict[str, Any] = {"items": items}
+    print(f"[load] {name} ...", file=sys.stderr, flush=True)
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    try:
+        with metrics.run(f"load_{name}") as m:
+            yield out
+    finally:
+        secs = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        n = out.get("items")
+        out.update({
+            "seconds": round(secs, 3),
+            "items_per_sec": round(n / secs, 1) if n and secs > 0 else None,
+            "peak_mb": round(peak / (1024 * 1024), 1),
+            "max_rss_mb": round(_max_rss_mb(), 1),
+            "stages": {k: {"seconds": round(st.seconds, 3), "calls": st.calls, "errors": st.errors}
+                       for k, st in sorted(m.stages.items())},
+            "counters": dict(sorted(m.counters.items())),
+        })
+        report["stages"][name] = out
+
+
+def _patch_pipeline(provider: FakeProvider, slack: FakeSlack, cfg: Dict[str, Any]):
+    """
+    app.main이 보는 provider / seeds / Slack 전송만 바꿈 (나머지 코드 경로는 그대로)
+    """
+    import app.main as main
+    import app.slack_notifier as slack_notifier
+
+    main._provider = provider
+    main.load_seeds = lambda path="app/seeds.yaml": cfg
+    slack_notifier.post_webhook = slack.post_webhook
+
+
+def _dashboard(base_url: str, terms: List[str], geos: List[str], repeat: int) -> Dict[str, Any]:
+    import requests
+
+    term, geo = quote(terms[0]), geos[0]
+    paths = [
+        "/",
+        "/trends/",
+        f"/term/{term}/",
+        f"/api/term-series/?term={term}&geo={geo}&days=365",
+        f"/api/term-series-all-geo/?term={term}&days=365",
+    ]
+    out = {}
+    with requests.Session() as s:
+        for p in paths:
+            lat, status, size = [], 0, 0
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                r = s.get(base_url.rstrip("/") + p, timeout=60)
+                lat.append((time.perf_counter() - t0) * 1000)
+                status, size = r.status_code, len(r.content)
+            out[p] = {"status": status, "bytes": size, "p50_ms": round(statistics.median(lat), 1),
+                      "max_ms": round(max(lat), 1)}
+    return out
+
+
+def cleanup(geos: List[str]):
+    from sqlalchemy import text
+    from app.db import get_engine
+
+    with get_engine().begin() as conn:
+        gids = [int(r[0]) for r in conn.execute(
+            text("SELECT id FROM geos WHERE geo = ANY(:g);"), {"g": geos}
+        ).fetchall()]
+        if not gids:
+            return
+        for table in _GEO_TABLES:
+            conn.execute(text(f"DELETE FROM {table} WHERE geo_id = ANY(:g);"), {"g": gids})
+
+
+def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    from app import storage_pg
+    import app.main as main
+
+    terms = synthetic_terms(args.terms)
+    geos = synthetic_geos(args.geos)
+    end = date.today()
+    cfg = {"geos": geos, "timeframe": args.timeframe, "seed_groups": {"synthetic": terms}}
+    provider = FakeProvider(days=args.fetch_days, end=end, seed=args.seed,
+                            batch_latency_ms=args.provider_latency_ms)
+    slack = FakeSlack(latency_ms=args.slack_latency_ms)
+    _patch_pipeline(provider, slack, cfg)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "terms": len(terms), "geos": len(geos), "days": args.days, "seed": args.seed,
+            "provider_latency_ms": args.provider_latency_ms, "slack_latency_ms": args.slack_latency_ms,
+        },
+        "stages": {},
+    }
+
+    tracemalloc.start()
+    try:
+        if not args.skip_load:
+            with _measure(report, "load") as st:
+                n = 0
+                for chunk in iter_rows(terms, geos, args.days, end, args.seed):
+                    with metrics.stage("series_upsert"):
+                        storage_pg.upsert_trend_series(chunk)
+                    n += len(chunk)
+                st["items"] = n
+
+        with _measure(report, "run", len(terms) * len(geos)):
+            main.run(queue=args.queue)
+        with _measure(report, "hourly"):
+            main.run_hourly()
+        with _measure(report, "daily"):
+            main.run_daily(slack=True)
+        with _measure(report, "slack") as st:
+            before = slack.count()
+            main.send_slack_from_db()
+            st["items"] = slack.count() - before
+
+        if args.dashboard_url:
+            with _measure(report, "dashboard") as st:
+                st["requests"] = _dashboard(args.dashboard_url, terms, geos, args.dashboard_repeat)
+    finally:
+        tracemalloc.stop()
+        if args.cleanup:
+            cleanup(geos)
+
+    report["meta"]["slack_messages"] = slack.count()
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    meta = report["meta"]
+    print(f"\n{meta['terms']} terms x {meta['geos']} geos x {meta['days']} days")
+    print(f"{'stage':<12} {'seconds':>10} {'items':>12} {'items/s':>12} {'peak MB':>9} {'rss MB':>9}")
+    for name, st in report["stages"].items():
+        ips = f"{st['items_per_sec']:,.1f}" if st["items_per_sec"] else "-"
+        items = f"{st['items']:,}" if st["items"] is not None else "-"
+        print(f"{name:<12} {st['seconds']:>10.3f} {items:>12} {ips:>12} {st['peak_mb']:>9.1f} {st['max_rss_mb']:>9.1f}")
+        for sub, s in st["stages"].items():
+            print(f"  · {sub:<22} {s['seconds']:>10.3f}s  calls {s['calls']:<6} errors {s['errors']}")
+        for path, r in st.get("requests", {}).items():
+            print(f"  · GET {path:<52} {r['status']} {r['bytes']:>9,} B  p50 {r['p50_ms']:.1f} ms  max {r['max_ms']:.1f} ms")
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m bench.load",
+                                description="end-to-end load test on synthetic data (fake provider / fake Slack)")
+    p.add_argument("--terms", type=int, default=1000)
+    p.add_argument("--geos", type=int, default=10)
+    p.add_argument("--days", type=int, default=365, help="history loaded into trend_series per series")
+    p.add_argument("--fetch-days", type=int, default=90, help="points per series returned by the fake provider")
+    p.add_argument("--timeframe", default="today 3-m")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--provider-latency-ms", type=float, default=0.0, help="sleep per fake provider batch")
+    p.add_argument("--slack-latency-ms", type=float, default=0.0, help="sleep per fake Slack post")
+    p.add_argument("--queue", action="store_true", help="run through the work queue (run --queue)")
+    p.add_argument("--skip-load", action="store_true", help="reuse series loaded by a previous run")
+    p.add_argument("--dashboard-url", default="", help="also time dashboard GETs, e.g. http://127.0.0.1:8000")
+    p.add_argument("--dashboard-repeat", type=int, default=5)
+    p.add_argument("--cleanup", action="store_true", help="delete synthetic-geo rows afterwards")
+    p.add_argument("--out", default="", help="write the report JSON here")
+    p.add_argument("--allow-writes", action="store_true",
+                   help="required: writes to POSTGRES_DSN (use a scratch / docker-compose DB)")
+    args = p.parse_args(argv)
+
+    if not args.allow_writes:
+        p.error("writes synthetic data and today's hourly/daily rows to POSTGRES_DSN; pass --allow-writes")
+
+    report = run_load(args)
+    print_report(report)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from app import metrics
+from bench.slack_stub import SlackStub, add_stub_arguments, config_from_args
+from bench.synthetic import synthetic_geos, synthetic_terms
+
+# ✅ alert dispatcher 부하 테스트: 합성 trend_features N개(오늘 날짜, 합성 geo) → send_slack_from_db → 로컬 stub
+# 메시지/초, 메시지별 전달 지연(429 재시도 대기 포함) 분위수, 상태코드별 응답 수
+# trend_features / alerts에 쓰므로 scratch DB 전용 (--allow-writes). 합성 geo 행은 끝나면 지움
+
+KST = timezone(timedelta(hours=9))
+_SEVS = ["BREAKOUT", "RISING", "EMERGING"]
+
+
+def _pct(xs: List[float], q: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(math.ceil(q * len(xs))) - 1)]
+
+
+def make_alert_features(n: int, n_geos: int, as_of_date: str) -> List[Dict[str, Any]]:
+    geos = synthetic_geos(n_geos)
+    terms = synthetic_terms(int(math.ceil(n / n_geos)))
+    out = []
+    for i in range(n):
+        sev = _SEVS[i % len(_SEVS)]
+        out.append({
+            "term": terms[i // n_geos],
+            "geo": geos[i % n_geos],
+            "as_of_date": as_of_date,
+            "wow": 0.5 + (i % 7) * 0.1,
+            "z": 3.0 + (i % 11) * 0.2,
+            "slope": 1.0 + (i % 5) * 0.3,
+            "latest": 20.0 + (i % 50),
+            "severity": sev,
+            "evidence": {"synthetic": True, "last3_avg": 30.0, "spike_3v14": 1.2, "nonzero_streak_14d": 14},
+        })
+    return out
+
+
+def _clear(geos: List[str], with_features: bool):
+    from sqlalchemy import text
+    from app.db import get_engine
+
+    tables = ["alerts"] + (["trend_features"] if with_features else [])
+    with get_engine().begin() as conn:
+        gids = [int(r[0]) for r in conn.execute(
+            text("SELECT id FROM geos WHERE geo = ANY(:g);"), {"g": geos}
+        ).fetchall()]
+        for table in tables:
+            if gids:
+                conn.execute(text(f"DELETE FROM {table} WHERE geo_id = ANY(:g);"), {"g": gids})
+
+
+def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    import app.main as main
+    import app.slack_notifier as slack_notifier
+    from app import storage_pg
+    from app.config import settings
+
+    stub = None
+    url = args.webhook_url
+    if not url:
+        stub = SlackStub(config_from_args(args)).start()
+        url = stub.url
+
+    today = datetime.now(KST).date().isoformat()
+    geos = synthetic_geos(args.geos)
+    feats = make_alert_features(args.alerts, args.geos, today)
+    _clear(geos, with_features=True)
+    storage_pg.upsert_features(feats, notify=False)
+
+    # 메시지별 전달 지연: post_webhook 1회(= 429 재시도 포함) 시간
+    latencies: List[float] = []
+    lock = threading.Lock()
+    orig_post = slack_notifier.post_webhook
+
+    def timed_post(webhook_url: str, payload: Dict[str, Any]) -> None:
+        t0 = time.perf_counter()
+        try:
+            orig_post(webhook_url, payload)
+        finally:
+            with lock:
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+    saved = (settings.slack_webhook_url, settings.slack_alert_limit, settings.slack_max_retries)
+    settings.slack_webhook_url = url
+    settings.slack_alert_limit = args.alerts
+    settings.slack_max_retries = args.max_retries
+    slack_notifier.post_webhook = timed_post
+    try:
+        t0 = time.perf_counter()
+        with metrics.run("slack_load") as m:
+            main.send_slack_from_db(today)
+        wall = time.perf_counter() - t0
+    finally:
+        slack_notifier.post_webhook = orig_post
+        settings.slack_webhook_url, settings.slack_alert_limit, settings.slack_max_retries = saved
+        if stub is not None:
+            stub.stop()
+        if not args.keep:
+            _clear(geos, with_features=True)
+
+    sent = int(m.counters.get("alerts_sent", 0))
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "alerts": args.alerts, "geos": args.geos, "webhook": "stub" if stub else url,
+            "max_retries": args.max_retries,
+        },
+        "wall_seconds": round(wall, 3),
+        "delivered": sent,
+        "messages_per_sec": round(sent / wall, 2) if wall > 0 else None,
+        "latency_ms": {
+            "p50": round(_pct(latencies, 0.50), 1),
+            "p90": round(_pct(latencies, 0.90), 1),
+            "p99": round(_pct(latencies, 0.99), 1),
+            "max": round(max(latencies), 1) if latencies else 0.0,
+            "mean": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+        },
+        "counters": dict(sorted(m.counters.items())),
+        "stages": {k: {"seconds": round(st.seconds, 3), "calls": st.calls, "errors": st.errors}
+                   for k, st in sorted(m.stages.items())},
+        "stub": stub.stats() if stub else None,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m bench.slack_load",
+                                description="push N synthetic alerts through send_slack_from_db into a local Slack stub")
+    p.add_argument("--alerts", type=int, default=200)
+    p.add_argument("--geos", type=int, default=4, help="spread alerts over this many synthetic geos")
+    p.add_argument("--max-retries", type=int, default=3, help="SLACK_MAX_RETRIES for this run")
+    p.add_argument("--webhook-url", default="", help="post to an already running stub instead of an in-process one")
+    p.add_argument("--keep", action="store_true", help="keep the synthetic features/alerts afterwards")
+    p.add_argument("--out", default="", help="write the report JSON here")
+    p.add_argument("--allow-writes", action="store_true",
+                   help="required: writes trend_features/alerts to POSTGRES_DSN (use a scratch DB)")
+    add_stub_arguments(p)
+    args = p.parse_args(argv)
+
+    if not args.allow_writes:
+        p.error("writes synthetic trend_features/alerts to POSTGRES_DSN; pass --allow-writes")
+
+    report = run_load(args)
+    lat = report["latency_ms"]
+    print(f"delivered {report['delivered']}/{args.alerts} in {report['wall_seconds']:.2f}s "
+          f"→ {report['messages_per_sec']} msg/s")
+    print(f"latency ms  p50 {lat['p50']}  p90 {lat['p90']}  p99 {lat['p99']}  max {lat['max']}")
+    c = report["counters"]
+    print(f"429 retries {int(c.get('slack_429', 0))} (slept {c.get('slack_retry_sleep_seconds', 0):.1f}s), "
+          f"send errors {int(c.get('slack_errors', 0))}")
+    if report["stub"]:
+        print(f"stub responses {report['stub']['status_counts']}")
+    for name, st in report["stages"].items():
+        print(f"  · {name:<14} {st['seconds']:>9.3f}s  calls {st['calls']:<6} errors {st['errors']}")
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+from __future__ import annotations
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# ✅ 로컬 Slack incoming-webhook 대역 (production Slack에 보내지 않고 dispatcher 처리량 튜닝)
+# 계약: POST JSON → 200 "ok" / 400 invalid_payload|no_text|msg_too_long|invalid_blocks / 429 rate_limited(+Retry-After) / 500
+# GET /stats → 상태코드별 카운트, 수신 메시지 수, 서버 측 처리 시간
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 50.0        # 응답 전 대기 (평균)
+    jitter_ms: float = 20.0         # ± 균등 분포
+    error_rate: float = 0.0         # 500 비율
+    rate_limit_rate: float = 0.0    # 무작위 429 비율
+    rate_per_sec: float = 0.0       # token bucket 한도 (0 = 없음). 넘으면 429 + Retry-After
+    burst: int = 5
+    retry_after: int = 1            # 무작위 429의 Retry-After(초)
+    max_blocks: int = 50
+    max_text: int = 40000
+    max_block_text: int = 3000
+    max_header_text: int = 150
+    seed: int = 0
+
+
+def validate(payload: Any, cfg: StubConfig) -> Optional[str]:
+    """
+    None이면 통과, 아니면 Slack이 돌려주는 에러 문자열
+    """
+    if not isinstance(payload, dict):
+        return "invalid_payload"
+    text = payload.get("text")
+    blocks = payload.get("blocks")
+    if not text and not blocks:
+        return "no_text"
+    if text is not None and (not isinstance(text, str) or len(text) > cfg.max_text):
+        return "msg_too_long"
+    if blocks is None:
+        return None
+    if not isinstance(blocks, list) or not blocks or len(blocks) > cfg.max_blocks:
+        return "invalid_blocks"
+    for b in blocks:
+        if not isinstance(b, dict) or not b.get("type"):
+            return "invalid_blocks"
+        t = b["type"]
+        if t == "header":
+            txt = (b.get("text") or {})
+            if txt.get("type") != "plain_text" or len(txt.get("text", "")) > cfg.max_header_text:
+                return "invalid_blocks"
+        elif t == "section":
+            txt = b.get("text")
+            fields = b.get("fields") or []
+            if txt is None and not fields:
+                return "invalid_blocks"
+            if txt is not None and len(txt.get("text", "")) > cfg.max_block_text:
+                return "invalid_blocks"
+            if len(fields) > 10 or any(len(f.get("text", "")) > 2000 for f in fields):
+                return "invalid_blocks"
+        elif t == "context":
+            els = b.get("elements") or []
+            if not els or len(els) > 10:
+                return "invalid_blocks"
+    return None
+
+
+class _Bucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.t = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        """
+        0이면 통과, 아니면 토큰이 생길 때까지 남은 초
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.t) * self.rate)
+            self.t = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            return (1.0 - self.tokens) / self.rate
+
+
+class SlackStub:
+    def __init__(self, cfg: StubConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.cfg = cfg or StubConfig()
+        self._rng = random.Random(self.cfg.seed)
+        self._bucket = _Bucket(self.cfg.rate_per_sec, self.cfg.burst) if self.cfg.rate_per_sec > 0 else None
+        self._lock = threading.Lock()
+        self.status_counts: Dict[str, int] = {}
+        self.received: List[Tuple[float, str]] = []   # (monotonic, channel) — 200으로 받은 것만
+        self.server_ms: List[float] = []
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/services/stub"
+
+    def start(self) -> "SlackStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="slack-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "config": asdict(self.cfg),
+                "status_counts": dict(sorted(self.status_counts.items())),
+                "accepted": len(self.received),
+                "server_ms_total": round(sum(self.server_ms), 1),
+            }
+
+    def _decide(self, payload: Any) -> Tuple[int, str, Dict[str, str]]:
+        cfg = self.cfg
+        if self._bucket is not None:
+            wait = self._bucket.take()
+            if wait > 0:
+                return 429, "rate_limited", {"Retry-After": str(max(1, int(wait + 0.999)))}
+        with self._lock:
+            roll = self._rng.random()
+        if roll < cfg.rate_limit_rate:
+            return 429, "rate_limited", {"Retry-After": str(cfg.retry_after)}
+        if roll < cfg.rate_limit_rate + cfg.error_rate:
+            return 500, "internal_error", {}
+        try:
+            err = validate(payload, cfg)
+        except (AttributeError, TypeError):
+            err = "invalid_blocks"
+        if err:
+            return 400, err, {}
+        return 200, "ok", {}
+
+    def _record(self, status: int, started: float, channel: str):
+        with self._lock:
+            self.status_counts[str(status)] = self.status_counts.get(str(status), 0) + 1
+            self.server_ms.append((time.monotonic() - started) * 1000)
+            if status == 200:
+                self.received.append((time.monotonic(), channel))
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                pass
+
+            def _reply(self, status: int, body: str, headers: Dict[str, str] | None = None,
+                       ctype: str = "text/plain; charset=utf-8"):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/stats":
+                    self._reply(200, json.dumps(stub.stats()), ctype="application/json")
+                else:
+                    self._reply(404, "not_found")
+
+            def do_POST(self):
+                started = time.monotonic()
+                raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                try:
+                    payload = json.loads(raw.decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    payload = None
+                cfg = stub.cfg
+                delay = max(0.0, cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms))
+                if delay:
+                    time.sleep(delay / 1000.0)
+                status, body, headers = stub._decide(payload)
+                channel = str(payload.get("channel", "")) if isinstance(payload, dict) else ""
+                self._reply(status, body, headers)
+                stub._record(status, started, channel)
+
+        return Handler
+
+
+def add_stub_arguments(p: argparse.ArgumentParser):
+    d = StubConfig()
+    p.add_argument("--latency-ms", type=float, default=d.latency_ms)
+    p.add_argument("--jitter-ms", type=float, default=d.jitter_ms)
+    p.add_argument("--error-rate", type=float, default=d.error_rate, help="fraction of 500 responses")
+    p.add_argument("--rate-limit-rate", type=float, default=d.rate_limit_rate, help="fraction of random 429s")
+    p.add_argument("--rate-per-sec", type=float, default=d.rate_per_sec,
+                   help="token-bucket limit; excess requests get 429 + Retry-After (0 = off)")
+    p.add_argument("--burst", type=int, default=d.burst)
+    p.add_argument("--retry-after", type=int, default=d.retry_after, help="Retry-After seconds for random 429s")
+    p.add_argument("--max-blocks", type=int, default=d.max_blocks)
+    p.add_argument("--max-text", type=int, default=d.max_text)
+    p.add_argument("--seed", type=int, default=d.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, rate_per_sec=args.rate_per_sec, burst=args.burst,
+        retry_after=args.retry_after, max_blocks=args.max_blocks, max_text=args.max_text, seed=args.seed,
+    )
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m bench.slack_stub", description="local Slack incoming-webhook stand-in")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8089)
+    add_stub_arguments(p)
+    args = p.parse_args(argv)
+
+    stub = SlackStub(config_from_args(args), host=args.host, port=args.port)
+    print(f"SLACK_WEBHOOK_URL={stub.url}  (GET /stats)", file=sys.stderr)
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+        print(json.dumps(stub.stats(), indent=2), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
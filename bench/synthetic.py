@@ -0,0 +1,90 @@
+from __future__ import annotations
+import zlib
+from datetime import date
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ✅ 규모 테스트용 합성 Google Trends 시계열
+# (term, geo)마다 seed가 고정 → 같은 크기로 다시 돌리면 같은 데이터
+# 유형: steady / seasonal / spike / revival / sparse(0이 대부분인 long tail)
+
+KINDS = ["steady", "seasonal", "spike", "revival", "sparse"]
+KIND_WEIGHTS = [0.25, 0.20, 0.15, 0.10, 0.30]
+
+# ISO 3166 user-assigned 코드만 사용 → 실제 geo와 안 겹침
+_GEO_POOL = [f"X{c}" for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"] + [f"Q{c}" for c in "MNOPQRSTUVWXYZ"]
+
+
+def synthetic_geos(n: int) -> List[str]:
+    if n > len(_GEO_POOL):
+        raise ValueError(f"at most {len(_GEO_POOL)} synthetic geos")
+    return _GEO_POOL[:n]
+
+
+def synthetic_terms(n: int) -> List[str]:
+    return [f"synthetic term {i:05d}" for i in range(n)]
+
+
+def _rng(term: str, geo: str, seed: int) -> np.random.RandomState:
+    return np.random.RandomState(zlib.crc32(f"{seed}|{term}|{geo}".encode()) & 0x7FFFFFFF)
+
+
+def generate_series(term: str, geo: str, days: int, end: date, seed: int = 0) -> Tuple[str, pd.Series]:
+    """
+    (kind, 0~100 정수 일 시계열) — Trends처럼 구간 최대값이 100이 되도록 정규화
+    """
+    rng = _rng(term, geo, seed)
+    kind = KINDS[rng.choice(len(KINDS), p=KIND_WEIGHTS)]
+    t = np.arange(days, dtype=float)
+    base = rng.uniform(3, 30)
+
+    weekly = rng.uniform(0, 0.25) * base * np.sin(2 * np.pi * t / 7.0 + rng.uniform(0, 6.28))
+    y = base + weekly + rng.normal(0, base * 0.12, size=days)
+
+    if kind == "seasonal":
+        y += rng.uniform(0.3, 0.8) * base * np.sin(2 * np.pi * t / rng.uniform(60, 365) + rng.uniform(0, 6.28))
+    elif kind == "spike":
+        at = int(rng.randint(max(1, days - 30), days))
+        width = int(rng.randint(2, 8))
+        y[at:at + width] += rng.uniform(3, 10) * base
+    elif kind == "revival":
+        # 한동안 거의 0 → 최근 다시 상승
+        quiet = int(rng.randint(days // 3, max(days // 3 + 1, days - 21)))
+        y[:quiet] *= rng.uniform(0.0, 0.15)
+        ramp = days - quiet
+        y[quiet:] += np.linspace(0, rng.uniform(1, 4) * base, ramp)
+    elif kind == "sparse":
+        mask = rng.uniform(size=days) < rng.uniform(0.75, 0.95)
+        y = np.where(mask, 0.0, rng.uniform(1, 3) * base)
+
+    y = np.clip(y, 0, None)
+    peak = y.max()
+    y = np.round(y / peak * 100.0) if peak > 0 else y
+    idx = pd.date_range(end=pd.Timestamp(end), periods=days, freq="D")
+    return kind, pd.Series(y, index=idx, dtype=float)
+
+
+def iter_series(terms: List[str], geos: List[str], days: int, end: date, seed: int = 0
+                ) -> Iterator[Tuple[str, str, str, pd.Series]]:
+    for geo in geos:
+        for term in terms:
+            kind, s = generate_series(term, geo, days, end, seed)
+            yield term, geo, kind, s
+
+
+def iter_rows(terms: List[str], geos: List[str], days: int, end: date, seed: int = 0,
+              chunk: int = 50_000) -> Iterator[List[Tuple[str, str, str, float, str]]]:
+    """
+    upsert_trend_series 입력 청크 (메모리 일정하게)
+    """
+    buf: List[Tuple[str, str, str, float, str]] = []
+    for term, geo, _, s in iter_series(terms, geos, days, end, seed):
+        for ts, v in s.items():
+            buf.append((term, geo, ts.strftime("%Y-%m-%d"), float(v), "synthetic"))
+        if len(buf) >= chunk:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
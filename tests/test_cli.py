@@ -0,0 +1,31 @@
+import unittest
+
+from app.main import build_parser
+
+
+class CommonFlagTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = build_parser()
+
+    def test_flags_before_subcommand(self):
+        args = self.parser.parse_args(["--timing", "--trace", "--profile-sql", "--profile", "cpu", "slack"])
+        self.assertEqual((args.cmd, args.timing, args.trace, args.profile_sql, args.profile),
+                         ("slack", True, True, True, "cpu"))
+
+    def test_flags_after_subcommand(self):
+        args = self.parser.parse_args(["run", "--timing", "--trace", "--profile-sql", "--profile", "mem", "--queue"])
+        self.assertEqual((args.cmd, args.timing, args.trace, args.profile_sql, args.profile, args.queue),
+                         ("run", True, True, True, "mem", True))
+
+    def test_mixed_positions(self):
+        args = self.parser.parse_args(["--profile", "cpu", "daily", "--timing"])
+        self.assertEqual((args.profile, args.timing, args.trace), ("cpu", True, False))
+
+    def test_defaults(self):
+        for argv in ([], ["serve"]):
+            args = self.parser.parse_args(argv)
+            self.assertEqual((args.timing, args.trace, args.profile_sql, args.profile), (False, False, False, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import json
+import os
+import signal
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from app import dbprofile
+
+
+class ReportTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        st = dbprofile.QueryStat(sql="SELECT 1")
+        st.observe(3.0, 1, False)
+        patches = [
+            mock.patch.object(dbprofile, "_enabled", True),
+            mock.patch.object(dbprofile, "_stats", {"SELECT 1": st}),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_latest_overwrites_one_file(self):
+        for _ in range(2):
+            path = dbprofile.report("serve", self.dir, latest=True)
+        self.assertEqual(os.path.basename(path), "sql_serve_latest.json")
+        self.assertEqual(os.listdir(self.dir), ["sql_serve_latest.json"])
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["statements"][0]["count"], 1)
+
+    def test_dumper_writes_on_wake(self):
+        if hasattr(signal, "SIGUSR1"):
+            self.addCleanup(signal.signal, signal.SIGUSR1, signal.getsignal(signal.SIGUSR1))
+        wake = dbprofile.start_dumper("worker", self.dir, 0)
+        wake.set()
+        path = os.path.join(self.dir, "sql_worker_latest.json")
+        for _ in range(100):
+            if os.path.exists(path):
+                break
+            time.sleep(0.01)
+        self.assertTrue(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from unittest import mock
+
+from app import storage_pg
+
+
+def _row(term, z, d="2024-05-01"):
+    return {"term": term, "geo": "KR", "as_of_date": d, "wow": 0.1, "z": z, "slope": 0.0,
+            "latest": 1.0, "severity": "WATCH", "evidence": {"k": term}}
+
+
+class UpsertFeaturesTests(unittest.TestCase):
+    def test_single_statement_last_row_wins(self):
+        conn = mock.MagicMock()
+        engine = mock.MagicMock()
+        engine.begin.return_value.__enter__.return_value = conn
+        with mock.patch.object(storage_pg, "get_engine", return_value=engine), \
+                mock.patch.object(storage_pg, "resolve_term_ids", return_value={"a": 1, "b": 2}), \
+                mock.patch.object(storage_pg, "resolve_geo_ids", return_value={"KR": 5}):
+            storage_pg.upsert_features([_row("a", 1.0), _row("b", 2.0), _row("a", 3.0)], notify=False)
+
+        conn.execute.assert_called_once()
+        sql, params = conn.execute.call_args.args
+        self.assertIn("unnest", str(sql))
+        self.assertEqual(params["term_ids"], [1, 2])
+        self.assertEqual(params["geo_ids"], [5, 5])
+        self.assertEqual(params["dates"], ["2024-05-01", "2024-05-01"])
+        self.assertEqual(params["zs"], [3.0, 2.0])
+        self.assertEqual(params["evidences"], ['{"k": "a"}', '{"k": "b"}'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from datetime import date
+from unittest import mock
+
+from sqlalchemy.exc import IntegrityError
+
+from app import storage_pg
+
+
+class _PgError(Exception):
+    def __init__(self, pgcode, msg):
+        super().__init__(msg)
+        self.pgcode = pgcode
+
+
+def _missing_partition():
+    return IntegrityError("INSERT ...", {}, _PgError(
+        "23514", 'no partition of relation "trend_series" found for row'))
+
+
+class WritePartitionedTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = mock.MagicMock()
+        engine = mock.MagicMock()
+        engine.begin.return_value.__enter__.return_value = self.conn
+        patches = [
+            mock.patch.object(storage_pg, "get_engine", return_value=engine),
+            mock.patch.object(storage_pg, "_known_partitions", set()),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_stale_cache_recreates_partition_and_retries(self):
+        # 다른 프로세스가 5월 파티션을 drop → 캐시는 있다고 믿음
+        storage_pg._known_partitions.add(("trend_series", date(2024, 5, 1)))
+        self.conn.execute.side_effect = [_missing_partition(), None, None]
+
+        storage_pg._write_partitioned("trend_series", [date(2024, 5, 20)], "Q", [{"x": 1}])
+
+        calls = [c.args for c in self.conn.execute.call_args_list]
+        self.assertEqual(calls[0], ("Q", [{"x": 1}]))
+        self.assertIn("ensure_month_partition", str(calls[1][0]))
+        self.assertEqual(calls[2], ("Q", [{"x": 1}]))
+        self.assertIn(("trend_series", date(2024, 5, 1)), storage_pg._known_partitions)
+
+    def test_other_integrity_errors_propagate(self):
+        storage_pg._known_partitions.add(("trend_series", date(2024, 5, 1)))
+        err = IntegrityError("INSERT ...", {}, _PgError("23503", "violates foreign key constraint"))
+        self.conn.execute.side_effect = [err]
+        with self.assertRaises(IntegrityError):
+            storage_pg._write_partitioned("trend_series", [date(2024, 5, 20)], "Q", [])
+        self.assertEqual(self.conn.execute.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from types import SimpleNamespace
+
+from app import profiling
+
+MAIN = ("app/main.py", 10, "main")
+FETCH = ("app/trends_provider.py", 20, "fetch")
+DETECT = ("app/detector.py", 30, "detect")
+SLEEP = ("~", 0, "<built-in method time.sleep>")
+
+
+def _stats(table):
+    # pstats.Stats.stats 형태: func -> (cc, nc, tt, ct, callers{caller: (cc, nc, tt, ct)})
+    return SimpleNamespace(stats=table)
+
+
+class CollapsedStacksTests(unittest.TestCase):
+    def test_self_time_per_stack(self):
+        st = _stats({
+            MAIN: (1, 1, 0.1, 3.1, {}),
+            FETCH: (2, 2, 0.5, 2.5, {MAIN: (2, 2, 0.5, 2.5)}),
+            SLEEP: (2, 2, 2.0, 2.0, {FETCH: (2, 2, 2.0, 2.0)}),
+            DETECT: (1, 1, 0.5, 0.5, {MAIN: (1, 1, 0.5, 0.5)}),
+        })
+        out = profiling.collapsed_stacks(st)
+        m = "main (main.py:10)"
+        f = "fetch (trends_provider.py:20)"
+        self.assertEqual(set(out), {m, f"{m};{f}", f"{m};{f};<built-in method time.sleep>",
+                                    f"{m};detect (detector.py:30)"})
+        self.assertAlmostEqual(out[f"{m};{f};<built-in method time.sleep>"], 2.0)
+        self.assertAlmostEqual(sum(out.values()), 3.1)
+
+    def test_shared_callee_split_by_edge_time(self):
+        # detect가 main(0.3s)과 fetch(0.1s) 양쪽에서 불림 → self time을 간선 cumtime 비율로 나눔
+        st = _stats({
+            MAIN: (1, 1, 0.0, 1.0, {}),
+            FETCH: (1, 1, 0.5, 0.6, {MAIN: (1, 1, 0.5, 0.6)}),
+            DETECT: (2, 2, 0.4, 0.4, {MAIN: (1, 1, 0.3, 0.3), FETCH: (1, 1, 0.1, 0.1)}),
+        })
+        out = profiling.collapsed_stacks(st)
+        self.assertAlmostEqual(out["main (main.py:10);detect (detector.py:30)"], 0.3)
+        self.assertAlmostEqual(out["main (main.py:10);fetch (trends_provider.py:20);detect (detector.py:30)"], 0.1)
+
+    def test_recursion_and_label_escaping(self):
+        weird = ("app/x.py", 1, "a;b")
+        st = _stats({
+            MAIN: (1, 1, 0.1, 1.1, {}),
+            weird: (3, 1, 1.0, 1.0, {MAIN: (1, 1, 0.5, 1.0), weird: (2, 2, 0.5, 0.5)}),
+        })
+        out = profiling.collapsed_stacks(st)
+        self.assertEqual(set(out), {"main (main.py:10)", "main (main.py:10);a,b (x.py:1)"})
+
+
+if __name__ == "__main__":
+    unittest.main()
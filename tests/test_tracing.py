@@ -0,0 +1,52 @@
+import unittest
+
+from app import tracing
+
+
+class ToOtlpTests(unittest.TestCase):
+    def _trace(self) -> tracing.Trace:
+        tr = tracing.Trace(command="run")
+        root = tracing.Span(name="run", trace_id=tr.trace_id, span_id="a" * 16, parent_id=None,
+                            start_ns=100, end_ns=900, attrs={"command": "run"})
+        child = tracing.Span(name="fetch", trace_id=tr.trace_id, span_id="b" * 16, parent_id=root.span_id,
+                             start_ns=200, end_ns=None,
+                             attrs={"geo": "KR", "terms": 25, "ok": True, "wait_s": 1.5},
+                             error="HTTPError: 429")
+        tr.add(child)  # 끝난 순서(자식 먼저)로 들어와도 시작 시각 순으로 export
+        tr.add(root)
+        return tr
+
+    def test_structure_and_order(self):
+        out = tracing.to_otlp(self._trace())
+        rs = out["resourceSpans"]
+        self.assertEqual(len(rs), 1)
+        res_keys = {a["key"] for a in rs[0]["resource"]["attributes"]}
+        self.assertEqual(res_keys, {"service.name", "process.pid"})
+        spans = rs[0]["scopeSpans"][0]["spans"]
+        self.assertEqual([s["name"] for s in spans], ["run", "fetch"])
+        self.assertNotIn("parentSpanId", spans[0])
+        self.assertEqual(spans[1]["parentSpanId"], "a" * 16)
+
+    def test_times_status_and_attribute_types(self):
+        root, child = tracing.to_otlp(self._trace())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        self.assertEqual((root["startTimeUnixNano"], root["endTimeUnixNano"]), ("100", "900"))
+        # 안 끝난 span은 end = start
+        self.assertEqual(child["endTimeUnixNano"], "200")
+        self.assertEqual(root["status"], {"code": 1})
+        self.assertEqual(child["status"], {"code": 2, "message": "HTTPError: 429"})
+        attrs = {a["key"]: a["value"] for a in child["attributes"]}
+        self.assertEqual(attrs, {
+            "geo": {"stringValue": "KR"},
+            "terms": {"intValue": "25"},
+            "ok": {"boolValue": True},
+            "wait_s": {"doubleValue": 1.5},
+        })
+
+    def test_span_outside_trace_is_noop(self):
+        with tracing.span("orphan", x=1) as sp:
+            sp.set(y=2)
+        tracing.set_attrs(z=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
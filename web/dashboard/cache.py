@@ -0,0 +1,127 @@
+# web/dashboard/cache.py
+"""
+dashboard 응답 캐시 (settings.CACHES["dashboard"])
+
+key = view 이름 + 요청 파라미터 + htmx 여부 + 오늘 날짜 + data_version
+- data_version은 파이프라인(run / hourly / maintain)이 커밋 후 +1 → 새 데이터가 들어오면 옛 key는 더 안 쓰이고 TTL로 사라짐
+- data_version 자체도 DASHBOARD_DATA_VERSION_TTL초 동안 캐시 → 반복 조회는 DB를 전혀 안 탐
+- hit/miss는 프로세스 단위 카운트 (worker가 여러 개면 worker별)
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from datetime import date
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+
+_VERSION_KEY = "kbt:data_version"
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "bypass": 0}
+
+
+def _cache():
+    return caches["dashboard"]
+
+
+def _count(kind: str):
+    with _lock:
+        _stats[kind] += 1
+
+
+def data_version() -> int | None:
+    """
+    None이면 (테이블 없음 등) 캐시하지 않고 그대로 DB 조회
+    """
+    c = _cache()
+    v = c.get(_VERSION_KEY)
+    if v is not None:
+        return v
+    try:
+        with connection.cursor() as cur:
+            cur.execute("SELECT version FROM data_version WHERE id = 1;")
+            row = cur.fetchone()
+    except DatabaseError:
+        return None
+    v = int(row[0]) if row else 0
+    c.set(_VERSION_KEY, v, settings.DASHBOARD_DATA_VERSION_TTL)
+    return v
+
+
+def _key(name: str, request, version: int) -> str:
+    params = sorted((k, v) for k in request.GET for v in request.GET.getlist(k))
+    raw = repr((request.path, params, bool(getattr(request, "htmx", False))))
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return f"kbt:{name}:{version}:{date.today().isoformat()}:{digest}"
+
+
+def cached_view(name: str):
+    """
+    GET 200 응답(body + content-type)만 저장. X-Cache: HIT/MISS 헤더로 확인 가능
+    """
+    def deco(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            version = data_version() if request.method == "GET" else None
+            if version is None:
+                _count("bypass")
+                return view(request, *args, **kwargs)
+
+            c = _cache()
+            key = _key(name, request, version)
+            hit = c.get(key)
+            if hit is not None:
+                _count("hits")
+                content_type, body = hit
+                resp = HttpResponse(body, content_type=content_type)
+                resp["X-Cache"] = "HIT"
+                return resp
+
+            _count("misses")
+            resp = view(request, *args, **kwargs)
+            if resp.status_code == 200 and not getattr(resp, "streaming", False):
+                c.set(key, (resp.get("Content-Type", "text/html; charset=utf-8"), resp.content))
+            resp["X-Cache"] = "MISS"
+            return resp
+        return wrapper
+    return deco
+
+
+def memo(name: str, parts: tuple, fn):
+    """
+    data_version 동안 fn() 결과 재사용 (ETag 계산용 집계 등). version을 모르면 그냥 fn()
+    """
+    version = data_version()
+    if version is None:
+        return fn()
+    c = _cache()
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    key = f"kbt:memo:{name}:{version}:{date.today().isoformat()}:{digest}"
+    hit = c.get(key)
+    if hit is not None:
+        return hit[0]
+    v = fn()
+    c.set(key, (v,))
+    return v
+
+
+def invalidate():
+    """
+    명시적 무효화: dashboard 캐시 전체 삭제 (data_version 캐시 포함 → 다음 요청에서 DB 재확인)
+    """
+    _cache().clear()
+
+
+def stats() -> dict:
+    with _lock:
+        s = dict(_stats)
+    looked = s["hits"] + s["misses"]
+    s["hit_rate"] = round(s["hits"] / looked, 4) if looked else 0.0
+    s["data_version"] = _cache().get(_VERSION_KEY)
+    s["backend"] = settings.CACHES["dashboard"]["BACKEND"].rsplit(".", 1)[-1]
+    return s
@@ -0,0 +1,97 @@
+# web/dashboard/dictionary.py
+"""
+terms / geos 사전 캐시 (프로세스 단위)
+
+- 이름 -> id : 필터용 (term_id=..., geo_id=...)
+- id -> 이름 : .values() 결과 행에 term/geo 이름 붙이기
+사전 행은 삭제/변경되지 않으므로 hit만 캐시하고, miss는 DB 재확인 (파이프라인이 새 term을 추가할 수 있음)
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from .models import Geo, Term
+
+_term_id_by_name: dict[str, int] = {}
+_term_name_by_id: dict[int, str] = {}
+_geo_id_by_name: dict[str, int] = {}
+_geo_name_by_id: dict[int, str] = {}
+
+
+def normalize_term(t: str) -> str:
+    # app.terms.normalize_term 과 동일한 규칙 (공백 정리 + 소문자)
+    return " ".join((t or "").strip().lower().split())
+
+
+def normalize_geo(g: str) -> str:
+    return (g or "").strip().upper()
+
+
+def _load_geos():
+    for gid, name in Geo.objects.values_list("id", "geo"):
+        _geo_id_by_name[name] = gid
+        _geo_name_by_id[gid] = name
+
+
+def term_id(name: str) -> int | None:
+    key = normalize_term(name)
+    if not key:
+        return None
+    if key not in _term_id_by_name:
+        tid = Term.objects.filter(term=key).values_list("id", flat=True).first()
+        if tid is None:
+            return None
+        _term_id_by_name[key] = tid
+        _term_name_by_id[tid] = key
+    return _term_id_by_name[key]
+
+
+def term_ids(names: Iterable[str]) -> dict[str, int]:
+    """
+    names -> {원문: id} (사전에 없는 term은 빠짐)
+    """
+    canon = {n: normalize_term(n) for n in names}
+    missing = {c for c in canon.values() if c and c not in _term_id_by_name}
+    if missing:
+        for tid, name in Term.objects.filter(term__in=missing).values_list("id", "term"):
+            _term_id_by_name[name] = tid
+            _term_name_by_id[tid] = name
+    return {n: _term_id_by_name[c] for n, c in canon.items() if c in _term_id_by_name}
+
+
+def geo_id(name: str) -> int | None:
+    key = normalize_geo(name)
+    if key and key not in _geo_id_by_name:
+        _load_geos()
+    return _geo_id_by_name.get(key)
+
+
+def term_names(ids: Iterable[int]) -> dict[int, str]:
+    ids = set(ids)
+    missing = [i for i in ids if i not in _term_name_by_id]
+    if missing:
+        for tid, name in Term.objects.filter(id__in=missing).values_list("id", "term"):
+            _term_id_by_name[name] = tid
+            _term_name_by_id[tid] = name
+    return {i: _term_name_by_id[i] for i in ids if i in _term_name_by_id}
+
+
+def geo_names(ids: Iterable[int]) -> dict[int, str]:
+    ids = set(ids)
+    if any(i not in _geo_name_by_id for i in ids):
+        _load_geos()
+    return {i: _geo_name_by_id[i] for i in ids if i in _geo_name_by_id}
+
+
+def attach_names(rows: list[dict]) -> list[dict]:
+    """
+    .values(..., "term_id", "geo_id") 결과에 row["term"], row["geo"] 이름을 채워 넣음 (템플릿 호환)
+    """
+    tn = term_names(r["term_id"] for r in rows if "term_id" in r)
+    gn = geo_names(r["geo_id"] for r in rows if "geo_id" in r)
+    for r in rows:
+        if "term_id" in r:
+            r["term"] = tn.get(r["term_id"], "")
+        if "geo_id" in r:
+            r["geo"] = gn.get(r["geo_id"], "")
+    return rows
@@ -0,0 +1,89 @@
+# web/dashboard/downsample.py
+"""
+차트용 서버 측 downsampling (Largest-Triangle-Three-Buckets)
+
+- 첫/마지막 점은 항상 유지, 가운데 점들을 (max_points - 2)개 bucket으로 나눠 bucket마다 1점
+- 원래 LTTB는 "직전 bucket에서 고른 점"을 기준으로 삼아 순차적이지만,
+  여기서는 직전 bucket 평균을 기준으로 써서 모든 bucket을 numpy 한 번에 계산 (Python 루프 없음)
+  → 삼각형 넓이 최대 점을 고르는 건 같아서 spike(튀는 점)는 그대로 남음
+"""
+from __future__ import annotations
+
+import numpy as np
+
+MIN_POINTS = 3
+
+
+def lttb_indices(y, max_points: int, x=None) -> np.ndarray:
+    """
+    남길 점의 index (오름차순). max_points >= len(y)면 전부
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if max_points >= n or n <= MIN_POINTS:
+        return np.arange(n)
+    max_points = max(int(max_points), MIN_POINTS)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # bucket i = [edges[i], edges[i+1]) — 가운데 n-2점을 max_points-2개로 (크기 차이 최대 1)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    m = len(starts)
+    width = int((ends - starts).max())
+
+    idx = starts[:, None] + np.arange(width)[None, :]          # (m, width)
+    valid = idx < ends[:, None]
+    idx = np.minimum(idx, n - 1)
+    bx, by = x[idx], y[idx]
+
+    cnt = valid.sum(axis=1)
+    avg_x = np.where(valid, bx, 0.0).sum(axis=1) / cnt
+    avg_y = np.where(valid, by, 0.0).sum(axis=1) / cnt
+
+    # a: 직전 bucket 평균 (첫 bucket은 첫 점), c: 다음 bucket 평균 (마지막 bucket은 마지막 점)
+    ax = np.concatenate(([x[0]], avg_x[:-1]))[:, None]
+    ay = np.concatenate(([y[0]], avg_y[:-1]))[:, None]
+    cx = np.concatenate((avg_x[1:], [x[-1]]))[:, None]
+    cy = np.concatenate((avg_y[1:], [y[-1]]))[:, None]
+
+    area = np.abs((ax - cx) * (by - ay) - (ax - bx) * (cy - ay))
+    area = np.where(valid, area, -1.0)
+    picked = idx[np.arange(m), area.argmax(axis=1)]
+    return np.concatenate(([0], picked, [n - 1]))
+
+
+def lttb(xs: list, ys: list, max_points: int | None) -> tuple[list, list]:
+    """
+    (x 라벨, y 값) 리스트 그대로 받아서 줄인 리스트 반환. max_points가 없으면 원본
+    """
+    if not max_points or len(ys) <= max_points:
+        return xs, ys
+    keep = lttb_indices(ys, max_points)
+    return [xs[i] for i in keep], [ys[i] for i in keep]
+
+
+def envelope_indices(columns: list[list], max_points: int | None) -> np.ndarray | None:
+    """
+    columnar(공유 날짜 축)용: geo별 값의 일별 최대값(envelope)으로 LTTB → 모든 geo에 같은 index 적용
+    어느 geo의 spike든 남음. None이면 downsampling 안 함
+    """
+    if not max_points or not columns:
+        return None
+    n = len(columns[0])
+    if n <= max_points:
+        return None
+    mat = np.array([[np.nan if v is None else v for v in col] for col in columns], dtype=float)
+    env = np.nan_to_num(np.fmax.reduce(mat, axis=0), nan=0.0)
+    return lttb_indices(env, max_points)
+
+
+def parse_max_points(raw: str | None) -> int | None:
+    """
+    GET 파라미터 → None(안 함) 또는 >= MIN_POINTS 정수. 잘못된 값은 ValueError
+    """
+    if raw in (None, "", "0"):
+        return None
+    v = int(raw)
+    if v < MIN_POINTS:
+        raise ValueError(f"max_points must be >= {MIN_POINTS}")
+    return v
@@ -0,0 +1,79 @@
+# web/dashboard/keyset.py
+"""
+keyset(cursor) 페이지네이션
+
+- 정렬 key = (정렬 컬럼, ...PK 나머지) → 행 순서가 항상 유일
+- cursor = 마지막 행의 key 값들 (urlsafe base64 JSON). 다음 페이지는 "key > cursor" (desc면 <)
+- OFFSET이 없어서 몇 페이지를 넘겨도 인덱스 범위 스캔 비용이 같음
+"""
+from __future__ import annotations
+
+import base64
+import json
+import math
+from datetime import date
+
+from django.db.models import Q
+
+# 날짜 컬럼은 JSON에 isoformat 문자열로
+_DATE_KEYS = {"as_of_date", "date"}
+# 나머지 key 컬럼별 허용 타입 (bool은 int의 subclass라 따로 막음), id는 bigint 범위
+_NUMBER_KEYS = {"z_score", "wow_change"}
+_INT_KEYS = {"term_id", "geo_id"}
+_STR_KEYS = {"term__term"}
+_BIGINT = 2 ** 63
+
+
+def encode_cursor(row: dict, keys: tuple) -> str:
+    vals = [row[k].isoformat() if k in _DATE_KEYS else row[k] for k in keys]
+    return base64.urlsafe_b64encode(json.dumps(vals).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _check(k: str, v):
+    if k in _DATE_KEYS:
+        if not isinstance(v, str):
+            raise ValueError(k)
+        return date.fromisoformat(v)
+    if isinstance(v, bool):
+        raise ValueError(k)
+    if k in _INT_KEYS and not (isinstance(v, int) and -_BIGINT <= v < _BIGINT):
+        raise ValueError(k)
+    if k in _NUMBER_KEYS and not (isinstance(v, (int, float)) and math.isfinite(v)):
+        raise ValueError(k)
+    if k in _STR_KEYS and not (isinstance(v, str) and "\x00" not in v):
+        raise ValueError(k)
+    return v
+
+
+def decode_cursor(raw: str, keys: tuple) -> list | None:
+    """
+    빈 cursor면 None (→ 첫 페이지). keys와 맞지 않는 cursor(base64/JSON/개수/타입)는 ValueError (→ view가 400)
+    """
+    if not raw:
+        return None
+    try:
+        vals = json.loads(base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("malformed cursor") from e
+    if not isinstance(vals, list) or len(vals) != len(keys):
+        raise ValueError("cursor does not match sort keys")
+    return [_check(k, v) for k, v in zip(keys, vals)]
+
+
+def after(keys: tuple, vals: list, desc: bool) -> Q:
+    """
+    (k1, k2, ...) > (v1, v2, ...) 를 Q로 (desc면 <)
+    맨 앞 컬럼 범위 조건(k1 >= v1)을 따로 붙여서 planner가 인덱스 범위 스캔을 쓰게 함
+    """
+    op = "lt" if desc else "gt"
+    bound = Q(**{f"{keys[0]}__{'lte' if desc else 'gte'}": vals[0]})
+    cond = Q()
+    for i in range(len(keys)):
+        eq = {k: v for k, v in zip(keys[:i], vals[:i])}
+        cond |= Q(**eq, **{f"{keys[i]}__{op}": vals[i]})
+    return bound & cond
+
+
+def order_by(keys: tuple, desc: bool) -> list[str]:
+    prefix = "-" if desc else ""
+    return [f"{prefix}{k}" for k in keys]
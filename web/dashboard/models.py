@@ -2,20 +2,40 @@
 from django.db import models
 
 
+class Term(models.Model):
+    # canonical term (app.terms.normalize_term 규칙)
+    term = models.TextField(unique=True)
+
+    class Meta:
+        db_table = "terms"
+        managed = False
+
+
+class Geo(models.Model):
+    id = models.SmallAutoField(primary_key=True)
+    geo = models.TextField(unique=True)
+
+    class Meta:
+        db_table = "geos"
+        managed = False
+
+
 class TrendSeries(models.Model):
-    term = models.TextField()
-    geo = models.TextField()
+    term = models.ForeignKey(Term, db_column="term_id", on_delete=models.DO_NOTHING, related_name="+")
+    geo = models.ForeignKey(Geo, db_column="geo_id", on_delete=models.DO_NOTHING, related_name="+")
     date = models.DateField()
     value = models.FloatField()
+    collected_at = models.DateTimeField()
 
     class Meta:
-        db_table = "trend_series"
+        # 읽기 전용 뷰: hot trend_series + trend_series_packed(월 단위 real[]) 풀어서 합침
+        db_table = "trend_series_all"
         managed = False
 
 
 class DiscoveredTerm(models.Model):
-    term = models.TextField(primary_key=False)
-    geo = models.TextField(primary_key=False)
+    term = models.ForeignKey(Term, db_column="term_id", on_delete=models.DO_NOTHING, related_name="+")
+    geo = models.ForeignKey(Geo, db_column="geo_id", on_delete=models.DO_NOTHING, related_name="+")
 
     source_term = models.TextField(null=True)
     kind = models.TextField()
@@ -33,8 +53,8 @@ class DiscoveredTerm(models.Model):
         unique_together = (("term", "geo"),)
 
 class Alert(models.Model):
-    term = models.TextField()
-    geo = models.TextField()
+    term = models.ForeignKey(Term, db_column="term_id", on_delete=models.DO_NOTHING, related_name="+")
+    geo = models.ForeignKey(Geo, db_column="geo_id", on_delete=models.DO_NOTHING, related_name="+")
     severity = models.TextField()
     fired_at = models.DateTimeField()
     slack_channel = models.TextField(null=True, blank=True)
@@ -48,8 +68,8 @@ class Alert(models.Model):
 
 
 class TrendFeature(models.Model):
-    term = models.TextField()
-    geo = models.TextField()
+    term = models.ForeignKey(Term, db_column="term_id", on_delete=models.DO_NOTHING, related_name="+")
+    geo = models.ForeignKey(Geo, db_column="geo_id", on_delete=models.DO_NOTHING, related_name="+")
     as_of_date = models.DateField()
     wow_change = models.FloatField()
     z_score = models.FloatField()
@@ -64,3 +84,14 @@ class TrendFeature(models.Model):
         db_table = "trend_features"
         unique_together = ("term", "geo", "as_of_date")
 
+
+class FeatureDayStats(models.Model):
+    # (as_of_date, geo, severity)별 trend_features 행 수. DB 트리거가 갱신 (읽기 전용, .values()로만 조회)
+    as_of_date = models.DateField()
+    geo = models.ForeignKey(Geo, db_column="geo_id", on_delete=models.DO_NOTHING, related_name="+")
+    severity = models.TextField()
+    n = models.IntegerField()
+
+    class Meta:
+        db_table = "feature_day_stats"
+        managed = False
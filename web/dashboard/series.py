@@ -0,0 +1,60 @@
+# web/dashboard/series.py
+"""
+series API 응답 인코딩 (columnar)
+
+- 날짜 축은 start + step(일) + n 으로 한 번만 보냄
+- geo별 값은 축 길이에 맞춘 dense 배열 (빠진 날 = null / NaN)
+- enc: float(그대로) | delta(첫 값 + 직전 non-null 대비 차이, 0~100 정수 위주라 gzip 후 매우 작음)
+       | b64(little-endian float32 → base64, 빠진 날은 NaN)
+"""
+from __future__ import annotations
+
+import base64
+import math
+import struct
+from datetime import date, timedelta
+from typing import Iterable
+
+ENCODINGS = ("float", "delta", "b64")
+
+
+def dense(rows: Iterable[dict], start: date, n: int, key: str | tuple = "geo_id") -> dict:
+    """
+    rows: .values(key, "date", "value") → {key: [값 or None] * n}
+    key가 tuple이면 (r[k1], r[k2], ...)로 묶음 (예: ("term_id", "geo_id"))
+    """
+    out: dict = {}
+    for r in rows:
+        i = (r["date"] - start).days
+        if not 0 <= i < n:
+            continue
+        k = tuple(r[c] for c in key) if isinstance(key, tuple) else r[key]
+        arr = out.get(k)
+        if arr is None:
+            arr = out[k] = [None] * n
+        arr[i] = float(r["value"])
+    return out
+
+
+def encode(values: list, enc: str):
+    if enc == "float":
+        return values
+    if enc == "delta":
+        out = []
+        prev = 0.0
+        for v in values:
+            if v is None:
+                out.append(None)
+                continue
+            d = round(v - prev, 4)
+            out.append(int(d) if d == int(d) else d)
+            prev = v
+        return out
+    if enc == "b64":
+        packed = struct.pack(f"<{len(values)}f", *(math.nan if v is None else v for v in values))
+        return base64.b64encode(packed).decode("ascii")
+    raise ValueError(f"unknown encoding: {enc}")
+
+
+def axis(start: date, n: int) -> dict:
+    return {"start": start.isoformat(), "step_days": 1, "n": n, "end": (start + timedelta(days=n - 1)).isoformat()}
@@ -1,3 +1,323 @@
-from django.test import TestCase
+import base64
+import json
+import struct
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.db.models import Q
+from django.test import RequestFactory, SimpleTestCase
+
+from app import terms as app_terms
+from . import dictionary, downsample, keyset, views
+from . import series as series_codec
+
+
+# DB 없이 돌도록 (SimpleTestCase는 쿼리를 막음): 사전/캐시/ORM은 patch
+
+
+class NormalizeTests(SimpleTestCase):
+    CASES = ["  Kimchi  Jjigae ", "BTS", "bts\tjimin\n", "", "   ", "Ünïcode  Ä", "k-pop"]
+
+    def test_dictionary_matches_app_terms(self):
+        # dashboard 사전 캐시 key와 파이프라인 terms 사전 key가 어긋나면 조회가 조용히 빗나감
+        for t in self.CASES:
+            self.assertEqual(dictionary.normalize_term(t), app_terms.normalize_term(t), t)
+            self.assertEqual(dictionary.normalize_geo(t), app_terms.normalize_geo(t), t)
+
+    def test_rules(self):
+        self.assertEqual(app_terms.normalize_term("  Kimchi \t Jjigae "), "kimchi jjigae")
+        self.assertEqual(app_terms.normalize_term("   "), "")
+        self.assertEqual(app_terms.normalize_geo(" us "), "US")
+        self.assertEqual(app_terms.normalize_geo(None), "")
+        self.assertEqual(dictionary.normalize_term(None), "")
+
+
+class SeriesCodecTests(SimpleTestCase):
+    start = date(2024, 1, 1)
+
+    def test_dense_places_values_by_day_and_drops_out_of_range(self):
+        rows = [
+            {"geo_id": 1, "date": date(2024, 1, 1), "value": 5},
+            {"geo_id": 1, "date": date(2024, 1, 3), "value": 7},
+            {"geo_id": 2, "date": date(2024, 1, 2), "value": 1},
+            {"geo_id": 2, "date": date(2023, 12, 31), "value": 9},
+            {"geo_id": 2, "date": date(2024, 1, 4), "value": 9},
+        ]
+        self.assertEqual(series_codec.dense(rows, self.start, 3), {1: [5.0, None, 7.0], 2: [None, 1.0, None]})
+
+    def test_dense_tuple_key(self):
+        rows = [{"term_id": 7, "geo_id": 1, "date": date(2024, 1, 2), "value": 3}]
+        self.assertEqual(series_codec.dense(rows, self.start, 2, key=("term_id", "geo_id")), {(7, 1): [None, 3.0]})
+
+    def test_encode_delta_skips_nulls(self):
+        self.assertEqual(series_codec.encode([10.0, None, 12.0, 11.5], "delta"), [10, None, 2, -0.5])
+
+    def test_encode_b64_roundtrip(self):
+        raw = base64.b64decode(series_codec.encode([1.0, None, 2.5], "b64"))
+        a, b, c = struct.unpack("<3f", raw)
+        self.assertEqual((a, c), (1.0, 2.5))
+        self.assertTrue(np.isnan(b))
+
+    def test_encode_float_and_unknown(self):
+        self.assertEqual(series_codec.encode([1.0, None], "float"), [1.0, None])
+        with self.assertRaises(ValueError):
+            series_codec.encode([1.0], "zip")
+
+    def test_axis(self):
+        self.assertEqual(series_codec.axis(self.start, 3),
+                         {"start": "2024-01-01", "step_days": 1, "n": 3, "end": "2024-01-03"})
+
+
+class DownsampleTests(SimpleTestCase):
+    def test_short_series_untouched(self):
+        self.assertEqual(downsample.lttb_indices([1, 2, 3, 4], 10).tolist(), [0, 1, 2, 3])
+        xs, ys = ["a", "b"], [1.0, 2.0]
+        self.assertEqual(downsample.lttb(xs, ys, None), (xs, ys))
+
+    def test_size_order_and_endpoints(self):
+        y = np.sin(np.arange(1000) / 20.0)
+        idx = downsample.lttb_indices(y, 100)
+        self.assertEqual(len(idx), 100)
+        self.assertEqual(idx[0], 0)
+        self.assertEqual(idx[-1], 999)
+        self.assertTrue(np.all(np.diff(idx) > 0))
+
+    def test_spike_preserved(self):
+        y = np.zeros(730)
+        y[417] = 100.0
+        self.assertIn(417, downsample.lttb_indices(y, 50).tolist())
+
+    def test_lttb_keeps_labels_aligned(self):
+        ys = [float(i % 7) for i in range(200)]
+        xs = [f"d{i}" for i in range(200)]
+        kx, ky = downsample.lttb(xs, ys, 20)
+        self.assertEqual(len(kx), 20)
+        self.assertEqual([ys[int(x[1:])] for x in kx], ky)
+
+    def test_envelope_keeps_spike_from_any_column(self):
+        a = [0.0] * 300
+        b = [None] * 300
+        b[123] = 50.0
+        idx = downsample.envelope_indices([a, b], 30)
+        self.assertEqual(len(idx), 30)
+        self.assertIn(123, idx.tolist())
+        self.assertIsNone(downsample.envelope_indices([a, b], 400))
+        self.assertIsNone(downsample.envelope_indices([], 30))
+
+    def test_parse_max_points(self):
+        self.assertIsNone(downsample.parse_max_points(None))
+        self.assertIsNone(downsample.parse_max_points(""))
+        self.assertIsNone(downsample.parse_max_points("0"))
+        self.assertEqual(downsample.parse_max_points("400"), 400)
+        for bad in ("2", "-5", "abc"):
+            with self.assertRaises(ValueError):
+                downsample.parse_max_points(bad)
+
+
+def _eval_q(q, row: dict) -> bool:
+    # keyset.after()가 만든 Q를 dict 행에 적용 (exact / gt / gte / lt / lte만)
+    ops = {
+        "exact": lambda a, b: a == b, "gt": lambda a, b: a > b, "gte": lambda a, b: a >= b,
+        "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b,
+    }
+    results = []
+    for child in q.children:
+        if isinstance(child, Q):
+            results.append(_eval_q(child, row))
+            continue
+        lookup, value = child
+        field, _, op = lookup.partition("__")
+        results.append(ops[op or "exact"](row[field], value))
+    out = any(results) if q.connector == Q.OR else all(results)
+    return not out if q.negated else out
+
+
+class KeysetTests(SimpleTestCase):
+    keys = ("z_score", "term_id", "geo_id", "as_of_date")
+
+    def test_cursor_roundtrip(self):
+        row = {"z_score": 2.5, "term_id": 7, "geo_id": 3, "as_of_date": date(2024, 5, 1), "severity": "RISING"}
+        cur = keyset.encode_cursor(row, self.keys)
+        self.assertNotIn("=", cur)
+        self.assertEqual(keyset.decode_cursor(cur, self.keys), [2.5, 7, 3, date(2024, 5, 1)])
+
+    def test_empty_cursor_is_first_page(self):
+        self.assertIsNone(keyset.decode_cursor("", self.keys))
+
+    def test_bad_cursor_rejected(self):
+        def enc(vals):
+            return base64.urlsafe_b64encode(json.dumps(vals).encode()).decode().rstrip("=")
+
+        bad = [
+            "!!not-base64!!",
+            base64.urlsafe_b64encode(b"{not json").decode(),
+            enc({"z_score": 1}),
+            keyset.encode_cursor({"z_score": 1.0}, ("z_score",)),
+            enc(["x", 7, 3, "2024-05-01"]),
+            enc([1.0, "7", 3, "2024-05-01"]),
+            enc([1.0, True, 3, "2024-05-01"]),
+            enc([1.0, 2 ** 70, 3, "2024-05-01"]),
+            enc([1.0, 7, 3, "2024-13-45"]),
+            enc([1.0, 7, 3, 20240501]),
+            enc([float("nan"), 7, 3, "2024-05-01"]),
+        ]
+        term_keys = ("term__term", "geo_id", "as_of_date")
+        for vals in ([1, 3, "2024-05-01"], ["a\x00b", 3, "2024-05-01"]):
+            with self.assertRaises(ValueError, msg=vals):
+                keyset.decode_cursor(enc(vals), term_keys)
+        for raw in bad:
+            with self.assertRaises(ValueError, msg=raw):
+                keyset.decode_cursor(raw, self.keys)
+
+    def test_trends_bad_cursor_400(self):
+        with mock.patch.object(views.view_cache, "data_version", return_value=None):
+            resp = views.trends(RequestFactory().get("/trends/", {"sort": "z", "cursor": "!!not-base64!!"}))
+        self.assertEqual(resp.status_code, 400)
+
+    def test_order_by(self):
+        self.assertEqual(keyset.order_by(("a", "b"), True), ["-a", "-b"])
+        self.assertEqual(keyset.order_by(("a", "b"), False), ["a", "b"])
+
+    def test_after_matches_tuple_comparison(self):
+        keys = ("z_score", "term_id", "geo_id")
+        rows = [{"z_score": z, "term_id": t, "geo_id": g} for z in (1.0, 2.0, 3.0) for t in (1, 2) for g in (1, 2)]
+        cursor = [2.0, 1, 2]
+        for desc in (False, True):
+            q = keyset.after(keys, cursor, desc)
+            for r in rows:
+                tup = (r["z_score"], r["term_id"], r["geo_id"])
+                expect = tup < tuple(cursor) if desc else tup > tuple(cursor)
+                self.assertEqual(_eval_q(q, r), expect, (desc, tup))
+
+    def test_pages_cover_every_row_once(self):
+        keys = ("z_score", "term_id")
+        rows = [{"z_score": float(i % 3), "term_id": i} for i in range(10)]
+        ordered = sorted(rows, key=lambda r: (r["z_score"], r["term_id"]), reverse=True)
+        seen, after = [], None
+        while True:
+            page = [r for r in ordered if after is None or _eval_q(keyset.after(keys, after, True), r)][:3]
+            if not page:
+                break
+            seen.extend(page)
+            after = keyset.decode_cursor(keyset.encode_cursor(page[-1], keys), keys)
+        self.assertEqual(seen, ordered)
+
+
+class _FakeQS(list):
+    # TrendSeries.objects.filter(...).order_by(...).values(...) 체인 → 고정 행
+    def filter(self, *a, **kw):
+        return self
+
+    def order_by(self, *a):
+        return self
+
+    def values(self, *a):
+        return self
+
+
+class SeriesApiTests(SimpleTestCase):
+    def setUp(self):
+        self.rf = RequestFactory()
+        today = date.today()
+        self.rows = _FakeQS([
+            {"geo_id": 1, "date": today - timedelta(days=2), "value": 10.0},
+            {"geo_id": 1, "date": today, "value": 12.0},
+            {"geo_id": 2, "date": today - timedelta(days=1), "value": 4.0},
+        ])
+        self.stamp = (datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc), len(self.rows))
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        stack.enter_context(mock.patch.object(views.view_cache, "data_version", return_value=None))
+        stack.enter_context(mock.patch.object(views, "_series_stamp", return_value=self.stamp))
+        stack.enter_context(mock.patch.object(views, "term_id", return_value=7))
+        stack.enter_context(mock.patch.object(views, "geo_id", return_value=1))
+        stack.enter_context(mock.patch.object(views, "geo_names", return_value={1: "KR", 2: "US"}))
+        ts = stack.enter_context(mock.patch.object(views, "TrendSeries"))
+        ts.objects = self.rows
+
+    def test_missing_params_400(self):
+        resp = views.api_term_series(self.rf.get("/api/term-series/", {"term": "kimchi"}))
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("error", json.loads(resp.content))
+
+    def test_bad_max_points_400(self):
+        for bad in ("abc", "2"):
+            resp = views.api_term_series(self.rf.get("/api/term-series/", {"term": "k", "geo": "KR", "max_points": bad}))
+            self.assertEqual(resp.status_code, 400, bad)
+
+    def test_bad_format_400(self):
+        resp = views.api_term_series_all_geo(self.rf.get("/api/term-series-all-geo/", {"term": "k", "format": "csv"}))
+        self.assertEqual(resp.status_code, 400)
+
+    def test_etag_revalidation_304(self):
+        url, params = "/api/term-series/", {"term": "kimchi", "geo": "KR", "days": "30"}
+        first = views.api_term_series(self.rf.get(url, params))
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.has_header("ETag"))
+        self.assertTrue(first.has_header("Last-Modified"))
+
+        again = views.api_term_series(self.rf.get(url, params, HTTP_IF_NONE_MATCH=first["ETag"]))
+        self.assertEqual(again.status_code, 304)
+
+        changed = views.api_term_series(self.rf.get(url, {**params, "days": "60"}, HTTP_IF_NONE_MATCH=first["ETag"]))
+        self.assertEqual(changed.status_code, 200)
+
+    def test_bad_days_has_no_validator(self):
+        req = self.rf.get("/api/term-series/", {"term": "k", "geo": "KR", "days": "abc"}, HTTP_IF_NONE_MATCH="*")
+        self.assertIsNone(views._series_etag(req))
+        self.assertIsNone(views._series_last_modified(req))
+        self.assertEqual(views.api_term_series(req).status_code, 400)
+
+    def test_etag_includes_window(self):
+        req = self.rf.get("/api/term-series/", {"term": "k", "geo": "KR"})
+        with mock.patch.object(views, "_series_window", return_value=(7, 1, date(2024, 1, 1))):
+            a = views._series_etag(req)
+        with mock.patch.object(views, "_series_window", return_value=(7, 1, date(2024, 1, 2))):
+            b = views._series_etag(req)
+        self.assertNotEqual(a, b)
+
+    def test_columnar_shared_axis(self):
+        resp = views.api_term_series_all_geo(self.rf.get(
+            "/api/term-series-all-geo/", {"term": "kimchi", "days": "3", "format": "columnar", "enc": "float"}))
+        self.assertEqual(resp.status_code, 200)
+        data = json.loads(resp.content)
+        today = date.today()
+        self.assertEqual(data["axis"], series_codec.axis(today - timedelta(days=3), 4))
+        self.assertEqual(data["geos"], ["KR", "US"])
+        self.assertEqual(data["values"], [[None, 10.0, None, 12.0], [None, None, 4.0, None]])
+
+    def test_columnar_delta_and_max_points(self):
+        resp = views.api_term_series_all_geo(self.rf.get(
+            "/api/term-series-all-geo/",
+            {"term": "kimchi", "days": "3", "format": "columnar", "enc": "delta", "max_points": "3"}))
+        data = json.loads(resp.content)
+        self.assertEqual(len(data["axis"]["idx"]), 3)
+        self.assertEqual(data["axis"]["idx"][0], 0)
+        self.assertEqual(data["axis"]["idx"][-1], 3)
+        self.assertTrue(all(len(v) == 3 for v in data["values"]))
+
+    def test_series_days_bounds_400(self):
+        for bad in ("0", "abc", str(views.SERIES_MAX_DAYS + 1), "100000000"):
+            resp = views.api_term_series(self.rf.get("/api/term-series/", {"term": "k", "geo": "KR", "days": bad}))
+            self.assertEqual(resp.status_code, 400, bad)
+            for fmt in ("traces", "columnar"):
+                resp = views.api_term_series_all_geo(self.rf.get(
+                    "/api/term-series-all-geo/", {"term": "k", "format": fmt, "days": bad}))
+                self.assertEqual(resp.status_code, 400, (fmt, bad))
+
+    def test_compare_etag_window(self):
+        req = self.rf.get("/api/term-series-compare/", {"terms": "a", "geos": "KR", "days": "abc"})
+        self.assertIsNone(views._compare_etag(req))
+        with mock.patch.object(views, "term_ids", return_value={"a": 7}), \
+                mock.patch.object(views, "_compare_stamp", return_value=self.stamp):
+            tags = {views._compare_etag(self.rf.get("/api/term-series-compare/", {"terms": "a", "geos": "KR", **d}))
+                    for d in ({}, {"days": "90"}, {"days": "30"})}
+        self.assertEqual(len(tags), 3)
+
+    def test_compare_days_bounds_400(self):
+        for bad in ("0", "-5", "99999", "abc"):
+            resp = views.api_term_series_compare(self.rf.get(
+                "/api/term-series-compare/", {"terms": "a", "geos": "KR", "days": bad}))
+            self.assertEqual(resp.status_code, 400, bad)
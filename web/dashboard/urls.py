@@ -10,9 +10,13 @@ urlpatterns = [
 
     path("api/term-series/", views.api_term_series, name="api_term_series"),
     path("api/term-series-all-geo/", views.api_term_series_all_geo, name="api_term_series_all_geo"),
+    path("api/term-series-compare/", views.api_term_series_compare, name="api_term_series_compare"),
+    path("api/term-autocomplete/", views.api_term_autocomplete, name="api_term_autocomplete"),
     path("api/term-ai/", views.api_term_ai, name="api_term_ai"),
     path("api/term-ai-slack/", views.api_term_ai_slack, name="api_term_ai_slack"),
     path("api/term-has-today-event/", views.api_term_has_today_event, name="api_term_has_today_event"),
+    path("api/cache-stats/", views.api_cache_stats, name="api_cache_stats"),
+    path("api/cache-invalidate/", views.api_cache_invalidate, name="api_cache_invalidate"),
 
     # partials (htmx)
     path("events-table/", views.events_table, name="events_table"),
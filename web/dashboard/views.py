@@ -1,12 +1,20 @@
+import hashlib
 import json
 from datetime import date, timedelta
-from django.db.models import Count, Max
+from django.db.models import Count, Max, Sum
 from django.http import HttpResponse, HttpResponseBadRequest,JsonResponse
 from django.shortcuts import render
 from django.utils import timezone
 from django.views.decorators.http import require_POST
-from django.views.decorators.http import require_GET
-from .models import TrendFeature, TrendSeries, DiscoveredTerm, Alert
+from django.views.decorators.http import require_GET, condition
+from django.views.decorators.gzip import gzip_page
+from django.db import connection
+from .models import TrendFeature, TrendSeries, DiscoveredTerm, Alert, FeatureDayStats, Term
+from .dictionary import attach_names, geo_id, geo_names, normalize_geo, normalize_term, term_id, term_ids
+from . import cache as view_cache
+from . import series as series_codec
+from . import downsample
+from . import keyset
 from django.views.decorators.csrf import csrf_exempt
 from .gemini_client import analyze_term
 from datetime import date, timedelta
@@ -14,12 +22,23 @@ from django.db.models import Count, Max
 
 import traceback
 ALERT_WINDOW_DAYS = 7
+DASHBOARD_SEVERITIES = ["EMERGING", "WATCH", "RISING", "BREAKOUT"]
 ALLOWED_SORTS = {
     "date": "as_of_date",
     "z": "z_score",
     "wow": "wow_change",
-    "term": "term",
+    "term": "term__term",
 }
+# keyset 정렬 key = 정렬 컬럼 + PK(term_id, geo_id, as_of_date) 나머지 (term은 unique라 term_id 불필요)
+_SORT_TIEBREAK = ("term_id", "geo_id", "as_of_date")
+TRENDS_PAGE_SIZE = 100
+TRENDS_MAX_PAGE_SIZE = 500
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+COMPARE_MAX_TERMS = 10
+COMPARE_MAX_GEOS = 30
+COMPARE_MAX_DAYS = 3650
+SERIES_MAX_DAYS = 3650  # columnar는 (days+1) × geo dense 배열이라 상한 필요
 
 def severity_from_feature(*, z: float, has_alert: bool) -> str:
     if z >= 2.5:
@@ -33,6 +52,24 @@ def severity_from_feature(*, z: float, has_alert: bool) -> str:
     return "NONE"
 
 
+def _bounded_int(raw: str | None, default: int, lo: int, hi: int) -> int:
+    """
+    GET 정수 파라미터: 없으면 default, 숫자가 아니거나 [lo, hi] 밖이면 ValueError
+    """
+    if raw in (None, ""):
+        return default
+    v = int(raw)
+    if not lo <= v <= hi:
+        raise ValueError(f"must be between {lo} and {hi}")
+    return v
+
+
+def _sort_keys(sort_col: str) -> tuple:
+    skip = {"term_id"} if sort_col == "term__term" else set()
+    return (sort_col,) + tuple(k for k in _SORT_TIEBREAK if k != sort_col and k not in skip)
+
+
+@view_cache.cached_view("trends")
 def trends(request):
     days = int(request.GET.get("days", "14"))
     start = date.today() - timedelta(days=days)
@@ -43,14 +80,19 @@ def trends(request):
 
     sort = request.GET.get("sort", "date")
     direction = request.GET.get("dir", "desc")
+    try:
+        limit = _bounded_int(request.GET.get("limit"), TRENDS_PAGE_SIZE, 1, TRENDS_MAX_PAGE_SIZE)
+    except ValueError:
+        limit = TRENDS_PAGE_SIZE
 
     base = TrendFeature.objects.filter(as_of_date__gte=start)
 
     if geo:
-        base = base.filter(geo=geo)
+        base = base.filter(geo_id=geo_id(geo))
 
+    # ✅ terms는 소문자 정규화돼 있으므로 LIKE '%q%' (ILIKE 아님) → terms(term gin_trgm_ops) 인덱스로 term id 먼저
     if q:
-        base = base.filter(term__icontains=q)
+        base = base.filter(term_id__in=Term.objects.filter(term__contains=normalize_term(q)).values("id"))
 
     #   이제 severity는 DB 컬럼 그대로 필터
     # severity가 비어있으면 전체
@@ -58,13 +100,24 @@ def trends(request):
         base = base.filter(severity=severity)
 
     sort_col = ALLOWED_SORTS.get(sort, "as_of_date")
-    prefix = "" if direction == "asc" else "-"
-    order = f"{prefix}{sort_col}"
+    desc = direction != "asc"
+    keys = _sort_keys(sort_col)
+
+    # ✅ keyset 페이지네이션: cursor(직전 페이지 마지막 행 key) 뒤부터 limit+1행 → 다음 페이지 유무
+    try:
+        after = keyset.decode_cursor(request.GET.get("cursor", ""), keys)
+    except ValueError:
+        return HttpResponseBadRequest("invalid cursor")
+    if after is not None:
+        base = base.filter(keyset.after(keys, after, desc))
 
     rows = list(
-        base.order_by(order)
-            .values("as_of_date", "geo", "term", "z_score", "wow_change", "severity")[:300]
+        base.order_by(*keyset.order_by(keys, desc))
+            .values("as_of_date", "geo_id", "term_id", "z_score", "wow_change", "severity",
+                    *(k for k in keys if k == "term__term"))[:limit + 1]
     )
+    next_cursor = keyset.encode_cursor(rows[limit - 1], keys) if len(rows) > limit else ""
+    rows = attach_names(rows[:limit])
 
     ctx = {
         "days": days,
@@ -74,6 +127,9 @@ def trends(request):
         "sort": sort,
         "dir": direction,
         "rows": rows,  #   이미 severity 포함
+        "limit": limit,
+        "cursor": request.GET.get("cursor", ""),
+        "next_cursor": next_cursor,
     }
 
     if request.htmx:
@@ -89,20 +145,22 @@ def dashboard(request):
 
     qs = TrendFeature.objects.filter(as_of_date__gte=start)
 
-    # trend_features에는 severity 컬럼이 없으므로 z_score 구간으로 계산
-    counts = {
-        # "EMERGING": 
-        "WATCH": qs.filter(z_score__gte=1.0, z_score__lt=2.0).count(),
-        "RISING": qs.filter(z_score__gte=2.0, z_score__lt=2.5).count(),
-        "BREAKOUT": qs.filter(z_score__gte=2.5).count(),
-    }
-
-    top_terms = (
+    # ✅ severity 컬럼 기준, feature_day_stats(일×geo×severity 행 수) 범위 합 1번
+    #    → trend_features 크기와 무관하게 (days × geo × severity)행만 읽음
+    counts = {s: 0 for s in DASHBOARD_SEVERITIES}
+    for r in (
+        FeatureDayStats.objects.filter(as_of_date__gte=start, severity__in=DASHBOARD_SEVERITIES)
+        .values("severity")
+        .annotate(n=Sum("n"))
+    ):
+        counts[r["severity"]] = int(r["n"] or 0)
+
+    top_terms = attach_names(list(
         qs.filter(z_score__gte=1.0)
-        .values("term")
-        .annotate(cnt=Count("term"), last=Max("as_of_date"), max_z=Max("z_score"))
+        .values("term_id")
+        .annotate(cnt=Count("term_id"), last=Max("as_of_date"), max_z=Max("z_score"))
         .order_by("-max_z", "-cnt", "-last")[:10]
-    )
+    ))
 
     # emerging_terms = (
 
@@ -115,18 +173,20 @@ def dashboard(request):
         # "emerging_terms": emerging_terms,
     })
 
+@view_cache.cached_view("term_detail")
 def term_detail(request, term: str):
     # 기본 90일
     start = date.today() - timedelta(days=90)
     today = date.today()
+    tid = term_id(term)
     # term에 실제 존재하는 geo 목록
-    series_geos = (
+    series_geo_ids = (
         TrendSeries.objects
-        .filter(term=term, date__gte=start)
-        .values_list("geo", flat=True)
+        .filter(term_id=tid, date__gte=start)
+        .values_list("geo_id", flat=True)
         .distinct()
     )
-    geo_list = sorted({g.strip().upper() for g in series_geos if g and g.strip()})
+    geo_list = sorted(geo_names(series_geo_ids).values())
     
     #   기본 geo는 ALL
     geo = (request.GET.get("geo") or "ALL").strip().upper()
@@ -134,7 +194,7 @@ def term_detail(request, term: str):
         geo = "ALL"
 
     qs_today = TrendFeature.objects.filter(
-        term=term,
+        term_id=tid,
         as_of_date=today,
     )
 
@@ -150,20 +210,24 @@ def term_detail(request, term: str):
     if geo != "ALL":
         series = (
             TrendSeries.objects
-            .filter(term=term, geo=geo, date__gte=start)
+            .filter(term_id=tid, geo_id=geo_id(geo), date__gte=start)
             .order_by("date")
             .values("date", "value")
         )
         labels = [s["date"].isoformat() for s in series]
         values = [float(s["value"]) for s in series]
+        try:
+            labels, values = downsample.lttb(labels, values, downsample.parse_max_points(request.GET.get("max_points")))
+        except ValueError:
+            pass
 
     #   Events 점용 feature rows: DB severity를 그대로 포함해서 가져오기
-    feats_events = list(
+    feats_events = attach_names(list(
         TrendFeature.objects
-        .filter(term=term, as_of_date__gte=start)
+        .filter(term_id=tid, as_of_date__gte=start)
         .order_by("-as_of_date", "-z_score")
-        .values("as_of_date", "geo", "z_score", "wow_change", "severity")[:500]
-    )
+        .values("as_of_date", "geo_id", "z_score", "wow_change", "severity")[:500]
+    ))
 
     #   events payload 구성 (severity 재계산 X)
     events = []
@@ -189,24 +253,24 @@ def term_detail(request, term: str):
 
 def discovery_inbox(request):
     # new 후보를 term 단위로 묶어서 보여주기
-    rows = (
+    rows = attach_names(list(
         DiscoveredTerm.objects.filter(status="new")
-        .values("term")
+        .values("term_id")
         .annotate(
-            geo_cnt=Count("geo", distinct=True),
+            geo_cnt=Count("geo_id", distinct=True),
             max_score=Max("score"),
             last_seen=Max("last_seen"),
         )
         .order_by("-geo_cnt", "-max_score", "-last_seen")[:200]
-    )
+    ))
 
     return render(request, "dashboard/discovery.html", {"rows": rows})
 
 def _get_latest_metrics(term: str, geo: str) -> dict:
-    qs = TrendFeature.objects.filter(term=term)
+    qs = TrendFeature.objects.filter(term_id=term_id(term))
 
     if geo != "ALL":
-        qs = qs.filter(geo=geo)
+        qs = qs.filter(geo_id=geo_id(geo))
 
     row = (
         qs.order_by("-as_of_date")
@@ -224,61 +288,356 @@ def _get_latest_metrics(term: str, geo: str) -> dict:
     }
 
 
+def _series_days(request) -> int:
+    """
+    series API의 ?days= (기본 90, 1..SERIES_MAX_DAYS). 잘못된 값이면 ValueError
+    """
+    return _bounded_int(request.GET.get("days"), 90, 1, SERIES_MAX_DAYS)
+
+
+def _series_window(request) -> tuple[int | None, int | None, date] | None:
+    """
+    series 요청 → (term id, geo id, start). days가 잘못됐으면 None (view가 400을 돌려줌)
+    """
+    try:
+        days = _series_days(request)
+    except ValueError:
+        return None
+    term = request.GET.get("term", "").strip()
+    geo = (request.GET.get("geo", "") or "").strip().upper()
+    return term_id(term), (geo_id(geo) if geo else None), date.today() - timedelta(days=days)
+
+
+def _series_stamp(window: tuple) -> tuple:
+    """
+    (max collected_at, 행 수) — series API의 ETag / Last-Modified 기준. data_version 동안 캐시
+    """
+    tid, gid, start = window
+
+    def load():
+        qs = TrendSeries.objects.filter(term_id=tid, date__gte=start)
+        if gid is not None:
+            qs = qs.filter(geo_id=gid)
+        agg = qs.aggregate(last=Max("collected_at"), n=Count("date"))
+        return agg["last"], agg["n"]
+
+    if tid is None:
+        return None, 0
+    return view_cache.memo("series_stamp", (tid, gid, start), load)
+
+
+def _stamp_etag(request, stamp: tuple, window: tuple) -> str:
+    """
+    ETag = 경로 + 정규화된 조회 범위(ids, start) + 나머지 GET 파라미터(format/enc/max_points 등) + stamp
+    """
+    last, n = stamp
+    raw = repr((
+        request.path, window,
+        sorted((k, v) for k in request.GET for v in request.GET.getlist(k)),
+        last.isoformat() if last else "", n,
+    ))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# ✅ 파라미터가 잘못된 요청은 validator 없음(None) → 304 없이 view가 400
+def _series_etag(request, *args, **kwargs) -> str | None:
+    window = _series_window(request)
+    return None if window is None else _stamp_etag(request, _series_stamp(window), window)
+
+
+def _series_last_modified(request, *args, **kwargs):
+    window = _series_window(request)
+    return None if window is None else _series_stamp(window)[0]
+
+
+def _max_points(request):
+    """
+    ?max_points=N (>= 3) → LTTB downsampling 점 수. 없으면 None(전체), 잘못된 값이면 ValueError
+    """
+    return downsample.parse_max_points(request.GET.get("max_points"))
+
+
+# ✅ If-None-Match / If-Modified-Since가 맞으면 304 (view/캐시 안 거침), 응답은 gzip
 @require_GET
+@gzip_page
+@condition(etag_func=_series_etag, last_modified_func=_series_last_modified)
+@view_cache.cached_view("api_term_series")
 def api_term_series(request):
     term = request.GET.get("term", "").strip()
     geo = (request.GET.get("geo", "") or "").strip().upper()
-    days = int(request.GET.get("days", "90"))
 
     if not term or not geo:
         return JsonResponse({"error": "term and geo are required"}, status=400)
+    try:
+        days = _series_days(request)
+    except ValueError:
+        return JsonResponse({"error": f"days must be an integer between 1 and {SERIES_MAX_DAYS}"}, status=400)
+    try:
+        max_points = _max_points(request)
+    except ValueError:
+        return JsonResponse({"error": f"max_points must be an integer >= {downsample.MIN_POINTS}"}, status=400)
 
     start = date.today() - timedelta(days=days)
 
     qs = (
         TrendSeries.objects
-        .filter(term=term, geo=geo, date__gte=start)
+        .filter(term_id=term_id(term), geo_id=geo_id(geo), date__gte=start)
         .order_by("date")
         .values("date", "value")
     )
 
     x = [r["date"].isoformat() for r in qs]
     y = [float(r["value"]) for r in qs]
+    n_raw = len(y)
+    x, y = downsample.lttb(x, y, max_points)
 
-    return JsonResponse({"term": term, "geo": geo, "days": days, "x": x, "y": y})
+    return JsonResponse({"term": term, "geo": geo, "days": days, "x": x, "y": y, "n_raw": n_raw})
 
 @require_GET
+@gzip_page
+@condition(etag_func=_series_etag, last_modified_func=_series_last_modified)
+@view_cache.cached_view("api_term_series_all_geo")
 def api_term_series_all_geo(request):
+    """
+    format=traces(기본, geo별 x/y) | columnar(공유 날짜 축 + geo별 dense 배열, enc=float|delta|b64)
+    max_points: traces는 geo별 LTTB, columnar는 geo 일별 최대값(envelope) 기준 공유 index → axis.idx
+    """
     term = request.GET.get("term", "").strip()
-    days = int(request.GET.get("days", "90"))
+    fmt = request.GET.get("format", "traces")
+    enc = request.GET.get("enc", "float")
 
     if not term:
         return JsonResponse({"error": "term is required"}, status=400)
+    if fmt not in ("traces", "columnar") or enc not in series_codec.ENCODINGS:
+        return JsonResponse({"error": f"format must be traces|columnar, enc one of {series_codec.ENCODINGS}"},
+                            status=400)
+    try:
+        days = _series_days(request)
+    except ValueError:
+        return JsonResponse({"error": f"days must be an integer between 1 and {SERIES_MAX_DAYS}"}, status=400)
+    try:
+        max_points = _max_points(request)
+    except ValueError:
+        return JsonResponse({"error": f"max_points must be an integer >= {downsample.MIN_POINTS}"}, status=400)
 
     start = date.today() - timedelta(days=days)
 
     qs = (
         TrendSeries.objects
-        .filter(term=term, date__gte=start)
-        .order_by("geo", "date")
-        .values("geo", "date", "value")
+        .filter(term_id=term_id(term), date__gte=start)
+        .order_by("geo_id", "date")
+        .values("geo_id", "date", "value")
     )
 
+    rows = list(qs)
+    gn = geo_names(r["geo_id"] for r in rows)
+
+    if fmt == "columnar":
+        n = days + 1  # start ~ today
+        cols = series_codec.dense(rows, start, n)
+        geos = sorted((gn[g], g) for g in cols if g in gn)
+        columns = [cols[g] for _, g in geos]
+        ax = series_codec.axis(start, n)
+        keep = downsample.envelope_indices(columns, max_points)
+        if keep is not None:
+            idx = [int(i) for i in keep]
+            columns = [[col[i] for i in idx] for col in columns]
+            ax["idx"] = idx  # 남은 점의 day offset (start 기준)
+        return JsonResponse({
+            "term": term,
+            "days": days,
+            "axis": ax,
+            "enc": enc,
+            "geos": [name for name, _ in geos],
+            "values": [series_codec.encode(col, enc) for col in columns],
+        })
+
     m = {}
-    for r in qs:
-        g = (r["geo"] or "").strip().upper()
+    for r in rows:
+        g = gn.get(r["geo_id"])
         if not g:
             continue
         m.setdefault(g, {"x": [], "y": []})
         m[g]["x"].append(r["date"].isoformat())
         m[g]["y"].append(float(r["value"]))
 
-    traces = [{"geo": g, "x": v["x"], "y": v["y"]} for g, v in m.items()]
+    traces = []
+    for g, v in m.items():
+        tx, ty = downsample.lttb(v["x"], v["y"], max_points)
+        traces.append({"geo": g, "x": tx, "y": ty})
     traces.sort(key=lambda t: t["geo"])
 
     return JsonResponse({"term": term, "days": days, "traces": traces})
 
 
+def _list_param(request, name: str) -> list[str]:
+    """
+    ?terms=a,b&terms=c → ["a", "b", "c"] (공백/중복 제거, 순서 유지)
+    """
+    out: list[str] = []
+    for raw in request.GET.getlist(name):
+        for v in raw.split(","):
+            v = v.strip()
+            if v and v not in out:
+                out.append(v)
+    return out
+
+
+def _compare_ids(request) -> tuple[list[int], list[int], date] | None:
+    """
+    compare 요청 → (term ids, geo ids, start). 파라미터가 잘못됐으면 None (view가 400을 돌려줌)
+    """
+    terms = _list_param(request, "terms")
+    geos = _list_param(request, "geos")
+    try:
+        days = _bounded_int(request.GET.get("days"), 90, 1, COMPARE_MAX_DAYS)
+    except ValueError:
+        return None
+    if not terms or not geos or len(terms) > COMPARE_MAX_TERMS or len(geos) > COMPARE_MAX_GEOS:
+        return None
+    tids = sorted(set(term_ids(terms).values()))
+    gids = sorted({g for g in (geo_id(x) for x in geos) if g is not None})
+    return tids, gids, date.today() - timedelta(days=days)
+
+
+def _compare_stamp(ids: tuple) -> tuple:
+    """
+    compare API의 ETag / Last-Modified 기준: 요청한 (terms × geos) 범위의 (max collected_at, 행 수)
+    """
+    tids, gids, start = ids
+    if not tids or not gids:
+        return None, 0
+
+    def load():
+        agg = (
+            TrendSeries.objects
+            .filter(term_id__in=tids, geo_id__in=gids, date__gte=start)
+            .aggregate(last=Max("collected_at"), n=Count("date"))
+        )
+        return agg["last"], agg["n"]
+
+    return view_cache.memo("compare_stamp", (tuple(tids), tuple(gids), start), load)
+
+
+def _compare_etag(request, *args, **kwargs) -> str | None:
+    ids = _compare_ids(request)
+    return None if ids is None else _stamp_etag(request, _compare_stamp(ids), (tuple(ids[0]), tuple(ids[1]), ids[2]))
+
+
+def _compare_last_modified(request, *args, **kwargs):
+    ids = _compare_ids(request)
+    return None if ids is None else _compare_stamp(ids)[0]
+
+
+# ✅ 비교용 bulk API: (terms × geos) 전부를 PK(term_id, geo_id, date) 범위 쿼리 1번으로
+@require_GET
+@gzip_page
+@condition(etag_func=_compare_etag, last_modified_func=_compare_last_modified)
+@view_cache.cached_view("api_term_series_compare")
+def api_term_series_compare(request):
+    """
+    terms=a,b&geos=US,KR&days=90 → 공유 날짜 축 + values[term][geo] dense 배열 (빠진 조합/날은 null)
+    enc / max_points는 columnar all-geo와 동일 (max_points면 모든 조합의 일별 최대값 기준 axis.idx)
+    """
+    terms = _list_param(request, "terms")
+    geos = [normalize_geo(g) for g in _list_param(request, "geos")]
+    enc = request.GET.get("enc", "float")
+    try:
+        days = _bounded_int(request.GET.get("days"), 90, 1, COMPARE_MAX_DAYS)
+    except ValueError:
+        return JsonResponse({"error": f"days must be an integer between 1 and {COMPARE_MAX_DAYS}"}, status=400)
+
+    if not terms or not geos:
+        return JsonResponse({"error": "terms and geos are required"}, status=400)
+    if len(terms) > COMPARE_MAX_TERMS or len(geos) > COMPARE_MAX_GEOS:
+        return JsonResponse({"error": f"at most {COMPARE_MAX_TERMS} terms and {COMPARE_MAX_GEOS} geos"},
+                            status=400)
+    if enc not in series_codec.ENCODINGS:
+        return JsonResponse({"error": f"enc must be one of {series_codec.ENCODINGS}"}, status=400)
+    try:
+        max_points = _max_points(request)
+    except ValueError:
+        return JsonResponse({"error": f"max_points must be an integer >= {downsample.MIN_POINTS}"}, status=400)
+
+    tids = term_ids(terms)
+    gids = {g: geo_id(g) for g in geos}
+    found_terms = [t for t in terms if t in tids]
+    found_geos = [g for g in geos if gids[g] is not None]
+
+    start = date.today() - timedelta(days=days)
+    n = days + 1  # start ~ today
+
+    rows = []
+    if found_terms and found_geos:
+        rows = list(
+            TrendSeries.objects
+            .filter(
+                term_id__in=[tids[t] for t in found_terms],
+                geo_id__in=[gids[g] for g in found_geos],
+                date__gte=start,
+            )
+            .values("term_id", "geo_id", "date", "value")
+        )
+    cols = series_codec.dense(rows, start, n, key=("term_id", "geo_id"))
+
+    empty = [None] * n
+    matrix = [[cols.get((tids[t], gids[g]), empty) for g in found_geos] for t in found_terms]
+    ax = series_codec.axis(start, n)
+    keep = downsample.envelope_indices([c for row in matrix for c in row], max_points)
+    if keep is not None:
+        idx = [int(i) for i in keep]
+        matrix = [[[c[i] for i in idx] for c in row] for row in matrix]
+        ax["idx"] = idx
+
+    return JsonResponse({
+        "days": days,
+        "axis": ax,
+        "enc": enc,
+        "terms": found_terms,
+        "geos": found_geos,
+        "missing": {"terms": [t for t in terms if t not in tids], "geos": [g for g in geos if gids[g] is None]},
+        "values": [[series_codec.encode(c, enc) for c in row] for row in matrix],
+    })
+
+
+def _like_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# ✅ term 자동완성: 접두어 일치 먼저(terms(term text_pattern_ops)), 그다음 부분 일치를 trigram 유사도 순(gin_trgm_ops)
+@require_GET
+@view_cache.cached_view("api_term_autocomplete")
+def api_term_autocomplete(request):
+    q = normalize_term(request.GET.get("q", ""))
+    try:
+        limit = _bounded_int(request.GET.get("limit"), AUTOCOMPLETE_LIMIT, 1, AUTOCOMPLETE_MAX_LIMIT)
+    except ValueError:
+        return JsonResponse({"error": f"limit must be an integer between 1 and {AUTOCOMPLETE_MAX_LIMIT}"}, status=400)
+    if not q:
+        return JsonResponse({"q": q, "terms": []})
+
+    pat = _like_escape(q)
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            (SELECT term, 1 AS rk, 1.0::real AS sim FROM terms
+              WHERE term LIKE %s
+              ORDER BY term
+              LIMIT %s)
+            UNION ALL
+            (SELECT term, 2 AS rk, similarity(term, %s) AS sim FROM terms
+              WHERE term LIKE %s AND term NOT LIKE %s
+              ORDER BY sim DESC, term
+              LIMIT %s)
+            ORDER BY rk, sim DESC, term
+            LIMIT %s;
+            """,
+            [pat + "%", limit, q, "%" + pat + "%", pat + "%", limit, limit],
+        )
+        terms = [r[0] for r in cur.fetchall()]
+    return JsonResponse({"q": q, "terms": terms})
+
+
 @require_POST
 def discovery_approve(request):
     term = request.POST.get("term", "").strip()
@@ -287,7 +646,7 @@ def discovery_approve(request):
 
     now = timezone.now()
     # term 전체 geo row 승인 + approved_at 찍기
-    DiscoveredTerm.objects.filter(term=term).update(
+    DiscoveredTerm.objects.filter(term_id=term_id(term)).update(
         status="approved",
         approved_at=now,
     )
@@ -304,7 +663,7 @@ def discovery_reject(request):
     if not term:
         return HttpResponseBadRequest("missing term")
 
-    DiscoveredTerm.objects.filter(term=term).update(status="rejected")
+    DiscoveredTerm.objects.filter(term_id=term_id(term)).update(status="rejected")
 
     if request.htmx:
         return HttpResponse("")
@@ -312,6 +671,7 @@ def discovery_reject(request):
 
 
 @require_GET
+@view_cache.cached_view("events_table")
 def events_table(request):
     term = request.GET.get("term", "").strip()
     geo = (request.GET.get("geo") or "ALL").strip().upper()
@@ -319,15 +679,15 @@ def events_table(request):
 
     start = date.today() - timedelta(days=days)
 
-    qs = TrendFeature.objects.filter(term=term, as_of_date__gte=start)
+    qs = TrendFeature.objects.filter(term_id=term_id(term), as_of_date__gte=start)
     if geo != "ALL":
-        qs = qs.filter(geo=geo)
+        qs = qs.filter(geo_id=geo_id(geo))
 
     #   DB severity 포함해서 그대로 가져오기
-    feats = list(
+    feats = attach_names(list(
         qs.order_by("-as_of_date", "-z_score")
-          .values("as_of_date", "geo", "z_score", "wow_change", "severity")[:200]
-    )
+          .values("as_of_date", "geo_id", "z_score", "wow_change", "severity")[:200]
+    ))
 
     # 템플릿 편의를 위해 정규화만 해줌 (재계산 X)
     for f in feats:
@@ -348,9 +708,9 @@ def api_term_has_today_event(request):
     if not term:
         return JsonResponse({"error": "term is required"}, status=400)
 
-    qs = TrendFeature.objects.filter(term=term, as_of_date=date.today())
+    qs = TrendFeature.objects.filter(term_id=term_id(term), as_of_date=date.today())
     if geo != "ALL":
-        qs = qs.filter(geo=geo)
+        qs = qs.filter(geo_id=geo_id(geo))
 
     # severity 컬럼이 DB에 있다면 이게 정답
     has_event = qs.exclude(severity="NONE").exists()
@@ -427,4 +787,19 @@ def api_term_ai_slack(request):
     except Exception as e:
         return JsonResponse({"ok": False, "error": str(e)}, status=500)
 
-    return JsonResponse({"ok": True})
\ No newline at end of file
+    return JsonResponse({"ok": True})
+
+
+@require_GET
+def api_cache_stats(request):
+    return JsonResponse(view_cache.stats())
+
+
+@csrf_exempt
+@require_POST
+def api_cache_invalidate(request):
+    # 운영용: 같은 호스트에서만 (예: curl -X POST localhost:8000/api/cache-invalidate/)
+    if request.META.get("REMOTE_ADDR") not in ("127.0.0.1", "::1"):
+        return JsonResponse({"ok": False, "error": "local requests only"}, status=403)
+    view_cache.invalidate()
+    return JsonResponse({"ok": True})
@@ -89,6 +89,35 @@ DATABASES = {
 }
 
 
+# dashboard 응답 캐시 (dashboard/cache.py): DASHBOARD_CACHE=locmem(기본, 프로세스별) | file(worker 간 공유) | off
+# key에 파이프라인 data_version이 들어가므로 TTL은 길어도 됨
+_DASHBOARD_CACHE = os.getenv("DASHBOARD_CACHE", "locmem")
+_DASHBOARD_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "kbtrends-dashboard",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("DASHBOARD_CACHE_DIR", str(BASE_DIR / ".cache" / "dashboard")),
+    },
+    "off": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    },
+}
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "dashboard": {
+        **_DASHBOARD_BACKENDS[_DASHBOARD_CACHE],
+        "TIMEOUT": int(os.getenv("DASHBOARD_CACHE_TTL", "3600")),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", "5000"))},
+    },
+}
+# data_version 조회 결과를 캐시하는 시간(초): 파이프라인 커밋 후 최대 이만큼 옛 화면이 보일 수 있음
+DASHBOARD_DATA_VERSION_TTL = int(os.getenv("DASHBOARD_DATA_VERSION_TTL", "5"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators